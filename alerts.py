@@ -1,11 +1,12 @@
-import pandas as pd
+from price_store import load_prices
+from indicator_engine import compute_indicators
 import plotly.graph_objects as go
 
 def plot_trends(symbol):
     print(f"📊 Affichage des tendances pour {symbol}...")
 
     try:
-        df = pd.read_csv(f"data/{symbol}.csv", index_col=0, parse_dates=True)
+        df = load_prices(symbol)
     except FileNotFoundError:
         print(f"❌ Erreur : Fichier {symbol}.csv introuvable.")
         return None
@@ -14,8 +15,8 @@ def plot_trends(symbol):
         print(f"❌ Erreur : La colonne 'Close' est absente dans {symbol}.csv.")
         return None
 
-    df["SMA_20"] = df["Close"].rolling(window=20).mean()
-    df["Diff"] = (df["Close"] - df["SMA_20"]) / df["SMA_20"] * 100
+    # Moyenne mobile 20j et écart en % par rapport à celle-ci
+    df = compute_indicators(df, [("DEVIATION", {"window": 20})])
 
     # Séparer les périodes de forte hausse/baisse
     df["Trend"] = "Stable"
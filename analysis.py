@@ -1,28 +1,20 @@
-import pandas as pd
-import numpy as np
+from price_store import load_prices
+import metrics
 
 def compute_ratios(symbol):
-    df = pd.read_csv(f"data/{symbol}.csv", index_col=0, parse_dates=True)
+    df = load_prices(symbol)
 
     if "Close" not in df.columns:
         print(f"❌ Erreur : La colonne 'Close' n'existe pas dans {symbol}.csv.")
         return None
 
-    df["Returns"] = df["Close"].pct_change()
-
-    # Ratio de Sharpe
-    sharpe_ratio = np.mean(df["Returns"]) / np.std(df["Returns"]) * np.sqrt(252)
-
-    # Volatilité annuelle
-    volatility = np.std(df["Returns"]) * np.sqrt(252)
-
-    # Rendement annuel moyen
-    annual_return = (1 + df["Returns"].mean())**252 - 1
+    # Sharpe, volatilité et rendement annuel calculés par la couche metrics
+    result = metrics.ratios(metrics.daily_returns(df["Close"]))
 
     return {
-        "Sharpe Ratio": round(sharpe_ratio, 2),
-        "Volatilité": round(volatility * 100, 2),
-        "Rendement Annuel": round(annual_return * 100, 2)
+        "Sharpe Ratio": round(result["sharpe_ratio"], 2),
+        "Volatilité": round(result["volatility"] * 100, 2),
+        "Rendement Annuel": round(result["annual_return"] * 100, 2)
     }
 
  
@@ -1,5 +1,8 @@
 import backtrader as bt
-import pandas as pd
+import numpy as np
+from price_store import load_prices
+from vector_backtest import INITIAL_CASH, STAKE, backtest_result, run_vectorized, trades_frame
+from backtest_store import cached_run
 
 class MovingAverageStrategy(bt.Strategy):
     params = (("short_window", 20), ("long_window", 50))
@@ -14,20 +17,66 @@ class MovingAverageStrategy(bt.Strategy):
         elif self.sma_short[0] < self.sma_long[0] and self.position:
             self.sell()
 
-def run_backtest(symbol):
-    df = pd.read_csv(f"data/{symbol}.csv", index_col=0, parse_dates=True)
+class FillRecorder(bt.Analyzer):
+    """Enregistre barre par barre la valeur du portefeuille, la position et les barres d'exécution"""
+
+    def start(self):
+        self.equity, self.position, self.fills = [], [], []
+
+    def notify_order(self, order):
+        if order.status != order.Completed:
+            return
+        bar = len(self.data) - 1
+        if order.isbuy():
+            self.fills.append((bar, None))
+        else:
+            self.fills[-1] = (self.fills[-1][0], bar)
+
+    def next(self):
+        self.equity.append(self.strategy.broker.getvalue())
+        self.position.append(self.strategy.position.size)
+
+def run_backtest(symbol, vectorized=True, short_window=20, long_window=50, plot=False, use_store=False):
+    """Backtest du croisement de moyennes mobiles.
+
+    Par défaut, moteur vectorisé (vector_backtest) : mêmes trades que
+    backtrader. vectorized=False exécute la boucle événementielle de
+    backtrader ; plot=True ouvre alors le graphique matplotlib de cerebro.
+    Les deux moteurs renvoient le même dictionnaire (equity, positions,
+    trades, stats). Avec use_store=True (moteur vectorisé), le résultat est
+    relu depuis backtest_store si la même configuration a déjà tourné sur
+    les mêmes données, sinon il y est écrit.
+    """
+    df = load_prices(symbol)
 
     if "Close" not in df.columns:
         print(f"❌ Erreur : La colonne 'Close' n'existe pas dans {symbol}.csv.")
         return None
 
+    if vectorized:
+        if not use_store:
+            return run_vectorized(df, short_window, long_window)
+        params = {"short_window": short_window, "long_window": long_window}
+        return cached_run(symbol, df, "sma_crossover", params,
+                          lambda: run_vectorized(df, short_window, long_window))
+
     data = bt.feeds.PandasData(dataname=df)
 
     cerebro = bt.Cerebro()
-    cerebro.addstrategy(MovingAverageStrategy)
+    cerebro.broker.setcash(INITIAL_CASH)
+    cerebro.addsizer(bt.sizers.FixedSize, stake=STAKE)
+    cerebro.addstrategy(MovingAverageStrategy, short_window=short_window, long_window=long_window)
     cerebro.adddata(data)
-    cerebro.run()
-    cerebro.plot()
+    cerebro.addanalyzer(FillRecorder, _name="fills")
+    recorder = cerebro.run()[0].analyzers.fills
+    if plot:
+        cerebro.plot()
+    trades = trades_frame(df.index, df["Open"].to_numpy(dtype=np.float64), recorder.fills, STAKE)
+    return backtest_result(df.index, np.array(recorder.equity), np.array(recorder.position, dtype=np.float64),
+                           trades, INITIAL_CASH)
 
 if __name__ == "__main__":
-    run_backtest("BTC")
+    result = run_backtest("BTC")
+    for name, value in result["stats"].items():
+        print(f"{name:>15} : {value}")
+    print(result["trades"])
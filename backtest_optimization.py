@@ -0,0 +1,281 @@
+"""Optimisation des fenêtres de MovingAverageStrategy sur plusieurs actifs.
+
+Usage : python backtest_optimization.py [SYMBOLE ...] [--workers 4] [--rank sharpe_ratio]
+        python backtest_optimization.py SP500 --walk-forward [--train 504 --test 126]
+Les grilles sont évaluées par le moteur vectorisé (vector_backtest) dans un
+pool de processus ; les prix sont partagés via multiprocessing.shared_memory.
+"""
+import argparse
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from price_store import list_symbols, load_prices
+from rolling_stats import CumulativeSums
+from vector_backtest import INITIAL_CASH, crossover_states, equity_curve, simulate, summarize
+
+SHORT_WINDOWS = range(5, 55, 5)
+LONG_WINDOWS = range(20, 210, 10)
+RANK_KEYS = ("sharpe_ratio", "total_return", "max_drawdown")
+
+#=========================prix partagés entre processus
+
+
+class SharedPrices:
+    """Ouvertures et clôtures de plusieurs actifs dans un seul bloc de mémoire partagée.
+
+    Les séries (de longueurs différentes) sont mises bout à bout dans un
+    tableau (2, total) ; `offsets` donne {actif: (début, fin)}. Les workers
+    s'y rattachent par son nom : rien n'est sérialisé par tâche.
+    """
+
+    def __init__(self, frames):
+        self.offsets = {}
+        total = 0
+        for symbol, df in frames.items():
+            self.offsets[symbol] = (total, total + len(df))
+            total += len(df)
+        self.shape = (2, total)
+        self.shm = shared_memory.SharedMemory(create=True, size=max(8 * 2 * total, 1))
+        prices = np.ndarray(self.shape, dtype=np.float64, buffer=self.shm.buf)
+        for symbol, df in frames.items():
+            start, end = self.offsets[symbol]
+            prices[0, start:end] = df["Open"].to_numpy(dtype=np.float64)
+            prices[1, start:end] = df["Close"].to_numpy(dtype=np.float64)
+
+    @property
+    def spec(self):
+        """Ce qu'il faut transmettre aux workers pour se rattacher au bloc"""
+        return self.shm.name, self.shape, self.offsets
+
+    def release(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+_worker = {}
+
+
+def _attach(name, shape, offsets):
+    """Initialiseur des workers : vue en lecture seule sur les prix partagés"""
+    shm = shared_memory.SharedMemory(name=name)
+    prices = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    prices.flags.writeable = False
+    _worker.update(shm=shm, prices=prices, offsets=offsets, sums={})
+
+
+def _arrays(symbol):
+    start, end = _worker["offsets"][symbol]
+    prices = _worker["prices"]
+    return prices[0, start:end], prices[1, start:end]
+
+
+def _sma(symbol, close, window):
+    # Sommes cumulées calculées une fois par actif et par worker, partagées par toutes les fenêtres
+    if symbol not in _worker["sums"]:
+        _worker["sums"][symbol] = (CumulativeSums(close), {})
+    sums, means = _worker["sums"][symbol]
+    if window not in means:
+        means[window] = sums.mean(window)
+    return means[window]
+
+
+def _backtest(symbol, short_window, long_window, cash, start=0, end=None):
+    """Backtest sur les barres [start, end) avec des moyennes calculées sur tout l'historique.
+
+    Les moyennes à la date t ne dépendent que des prix passés : les découper
+    n'introduit aucun biais, et la période de chauffe est prise avant `start`.
+    """
+    open_, close = _arrays(symbol)
+    up, down = crossover_states(_sma(symbol, close, short_window), _sma(symbol, close, long_window))
+    window = slice(start, end)
+    open_, close, up, down = open_[window], close[window], up[window], down[window]
+    fills = simulate(open_, close, up, down, cash)
+    equity, _ = equity_curve(open_, close, fills, cash)
+    pnl = [open_[exit_] - open_[entry] for entry, exit_ in fills if exit_ is not None]
+    return equity, pnl, summarize(equity, pnl, len(fills), cash)
+
+
+def _evaluate_chunk(symbol, combos, cash, start=0, end=None):
+    """Tâche d'un worker : un actif et un lot de couples (courte, longue)"""
+    rows = []
+    for short_window, long_window in combos:
+        _, _, stats = _backtest(symbol, short_window, long_window, cash, start, end)
+        rows.append({"symbol": symbol, "short_window": short_window, "long_window": long_window, **stats})
+    return rows
+
+
+#=========================balayage de la grille
+
+
+def parameter_grid(short_windows=SHORT_WINDOWS, long_windows=LONG_WINDOWS):
+    """Couples (courte, longue) valides : la fenêtre courte est strictement plus petite"""
+    return [(s, l) for s in short_windows for l in long_windows if s < l]
+
+
+def rank_results(results, rank_by="sharpe_ratio"):
+    """Classe les résultats, le meilleur en premier.
+
+    sharpe_ratio et total_return : décroissant ; max_drawdown (négatif) :
+    le plus proche de zéro en premier.
+    """
+    if rank_by not in RANK_KEYS:
+        raise ValueError(f"Critère de classement inconnu : {rank_by} (attendu : {', '.join(RANK_KEYS)})")
+    return results.sort_values(rank_by, ascending=False, na_position="last").reset_index(drop=True)
+
+
+def sweep(symbols=None, short_windows=SHORT_WINDOWS, long_windows=LONG_WINDOWS, rank_by="sharpe_ratio",
+          max_workers=None, chunks_per_worker=4, cash=INITIAL_CASH):
+    """Évalue toute la grille de fenêtres sur plusieurs actifs en parallèle.
+
+    Chaque tâche porte sur un actif et un lot de combinaisons, pour amortir
+    le coût d'envoi et réutiliser les moyennes mobiles déjà calculées par le
+    worker. Renvoie un DataFrame (une ligne par actif et combinaison) classé
+    selon `rank_by`.
+    """
+    symbols = list(symbols) if symbols else list_symbols()
+    combos = parameter_grid(short_windows, long_windows)
+    max_workers = max_workers or os.cpu_count() or 1
+    chunk = max(1, math.ceil(len(combos) * len(symbols) / (max_workers * chunks_per_worker)))
+    tasks = [(symbol, combos[i:i + chunk]) for symbol in symbols for i in range(0, len(combos), chunk)]
+
+    prices = SharedPrices({symbol: load_prices(symbol) for symbol in symbols})
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_attach, initargs=prices.spec) as pool:
+            futures = [pool.submit(_evaluate_chunk, symbol, batch, cash) for symbol, batch in tasks]
+            rows = [row for future in futures for row in future.result()]
+    finally:
+        prices.release()
+
+    return rank_results(pd.DataFrame(rows), rank_by)
+
+
+def best_parameters(results):
+    """Meilleure combinaison par actif, à partir d'un résultat déjà classé"""
+    return results.groupby("symbol", sort=False).head(1).set_index("symbol")
+
+
+#=========================walk-forward : optimisation glissante et évaluation hors échantillon
+
+
+def walk_forward_windows(length, train_size, test_size, step=None):
+    """Fenêtres ((début, fin) d'entraînement, (début, fin) de test) consécutives.
+
+    Le test suit immédiatement l'entraînement ; les fenêtres avancent de
+    `step` barres (par défaut test_size : tests contigus). Un pas plus petit
+    que test_size ferait se recouvrir les périodes hors échantillon.
+    """
+    step = step or test_size
+    if step < test_size:
+        raise ValueError(f"step ({step}) doit être au moins égal à test_size ({test_size})")
+    windows = []
+    start = 0
+    while start + train_size + test_size <= length:
+        train = (start, start + train_size)
+        windows.append((train, (train[1], train[1] + test_size)))
+        start += step
+    return windows
+
+
+def _walk_forward_window(symbol, train, test, combos, rank_by, cash):
+    """Tâche d'un worker : optimise sur `train` puis évalue le meilleur couple sur `test`"""
+    in_sample = rank_results(pd.DataFrame(_evaluate_chunk(symbol, combos, cash, *train)), rank_by)
+    best = in_sample.iloc[0]
+    short_window, long_window = int(best["short_window"]), int(best["long_window"])
+    equity, pnl, stats = _backtest(symbol, short_window, long_window, cash, *test)
+    row = {"train_start": train[0], "train_end": train[1], "test_start": test[0], "test_end": test[1],
+           "short_window": short_window, "long_window": long_window,
+           f"train_{rank_by}": best[rank_by], **{f"test_{k}": v for k, v in stats.items()}}
+    return row, equity, pnl
+
+
+def walk_forward(symbol, train_size=504, test_size=126, step=None, short_windows=SHORT_WINDOWS,
+                 long_windows=LONG_WINDOWS, rank_by="sharpe_ratio", max_workers=None, cash=INITIAL_CASH):
+    """Optimisation walk-forward de MovingAverageStrategy sur un actif.
+
+    Chaque fenêtre d'entraînement (train_size barres) choisit le meilleur
+    couple selon `rank_by`, évalué ensuite sur les test_size barres
+    suivantes, jamais vues pendant l'optimisation. Les fenêtres tournent en
+    parallèle ; chaque worker calcule les moyennes mobiles une seule fois sur
+    tout l'historique et les réutilise pour toutes les fenêtres qui se
+    recouvrent. Chaque test démarre sans position avec `cash` ; la courbe
+    hors échantillon est obtenue en chaînant leurs rendements.
+
+    Renvoie {"windows": DataFrame par fenêtre (dates incluses), "equity":
+    Series hors échantillon, "stats": statistiques de cette courbe}.
+    """
+    df = load_prices(symbol)
+    windows = walk_forward_windows(len(df), train_size, test_size, step)
+    if not windows:
+        raise ValueError(f"Historique trop court pour {symbol} : {len(df)} barres pour "
+                         f"{train_size} d'entraînement + {test_size} de test")
+    combos = parameter_grid(short_windows, long_windows)
+
+    prices = SharedPrices({symbol: df})
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_attach, initargs=prices.spec) as pool:
+            futures = [pool.submit(_walk_forward_window, symbol, train, test, combos, rank_by, cash)
+                       for train, test in windows]
+            results = [future.result() for future in futures]
+    finally:
+        prices.release()
+
+    # Raccordement : chaque segment de test repart de la valeur finale du précédent
+    segments = []
+    value = cash
+    for (_, (start, end)), (_, equity, _) in zip(windows, results):
+        curve = equity / cash * value
+        segments.append(pd.Series(curve, index=df.index[start:end]))
+        value = curve[-1]
+    stitched = pd.concat(segments).rename("Equity")
+
+    table = pd.DataFrame([row for row, _, _ in results])
+    for column in ("train_start", "test_start"):
+        table[column] = df.index[table[column]]
+    for column in ("train_end", "test_end"):
+        table[column] = df.index[table[column] - 1]
+
+    pnl = [p for _, _, window_pnl in results for p in window_pnl]
+    stats = summarize(stitched.to_numpy(), pnl, int(table["test_trades"].sum()), cash)
+    return {"windows": table, "equity": stitched, "stats": stats}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("symbols", nargs="*")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--rank", default="sharpe_ratio", choices=RANK_KEYS)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--walk-forward", action="store_true")
+    parser.add_argument("--train", type=int, default=504)
+    parser.add_argument("--test", type=int, default=126)
+    args = parser.parse_args()
+
+    if args.walk_forward:
+        for symbol in args.symbols or list_symbols():
+            result = walk_forward(symbol, args.train, args.test, rank_by=args.rank, max_workers=args.workers)
+            print(f"\n🔁 {symbol} : walk-forward ({len(result['windows'])} fenêtres)")
+            print(result["windows"][["test_start", "test_end", "short_window", "long_window",
+                                     f"train_{args.rank}", "test_total_return"]].to_string(index=False))
+            stats = result["stats"]
+            print(f"📈 Hors échantillon : rendement {stats['total_return']:.2%}, "
+                  f"drawdown {stats['max_drawdown']:.2%}, Sharpe {stats['sharpe_ratio']:.2f}")
+        return
+
+    start = time.perf_counter()
+    results = sweep(args.symbols, rank_by=args.rank, max_workers=args.workers)
+    elapsed = time.perf_counter() - start
+
+    print(f"✅ {len(results)} backtests en {elapsed:.2f} s ({len(results) / elapsed:.0f} par seconde)")
+    print(results.head(args.top).to_string(index=False))
+    print("\n🏆 Meilleurs paramètres par actif")
+    print(best_parameters(results)[["short_window", "long_window", args.rank]].to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+from price_store import data_version
+
+#=========================stockage des résultats de backtest (Feather non compressé + meta.json)
+# Un dossier par configuration : results/backtests/<clé>/{meta.json, equity.feather, trades.feather}.
+# Le Feather non compressé se relit par memory-map : les courbes sont des vues
+# NumPy sur le fichier, sans copie ni décompression.
+
+RESULTS_DIR = os.path.join("results", "backtests")
+FORMAT_VERSION = 1
+
+
+def data_hash(df):
+    """Empreinte du contenu des prix (index et colonnes), indépendante du mtime"""
+    digest = hashlib.sha256()
+    digest.update(df.index.to_numpy(dtype="datetime64[ns]").tobytes())
+    for column in df.columns:
+        digest.update(column.encode())
+        digest.update(np.ascontiguousarray(df[column].to_numpy(dtype=np.float64)).tobytes())
+    return digest.hexdigest()
+
+
+def result_key(symbol, strategy, params, data_digest):
+    """Clé d'une exécution : sha256 de l'actif, de la stratégie, des paramètres et des données"""
+    payload = json.dumps({"symbol": symbol, "strategy": strategy, "params": params, "data": data_digest,
+                          "format": FORMAT_VERSION}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _result_dir(key):
+    return os.path.join(RESULTS_DIR, key)
+
+
+def _json_value(value):
+    if isinstance(value, (np.floating, np.integer)):
+        return value.item()
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    return value
+
+
+def save_result(key, result, symbol, strategy, params, data_digest):
+    """Écrit un résultat (equity, positions, trades, stats) sous sa clé.
+
+    Écriture dans un dossier temporaire renommé à la fin : un lecteur ne voit
+    jamais de résultat partiel, et deux écritures concurrentes de la même
+    clé laissent un seul résultat complet.
+    """
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+    final = _result_dir(key)
+    tmp = f"{final}.tmp-{os.getpid()}"
+    os.makedirs(tmp, exist_ok=True)
+    try:
+        curves = pd.DataFrame({"Equity": result["equity"], "Position": result["positions"]})
+        curves.index.name = "Date"
+        feather.write_feather(pa.Table.from_pandas(curves), os.path.join(tmp, "equity.feather"),
+                              compression="uncompressed")
+        feather.write_feather(pa.Table.from_pandas(result["trades"], preserve_index=False),
+                              os.path.join(tmp, "trades.feather"), compression="uncompressed")
+        meta = {
+            "key": key,
+            "symbol": symbol,
+            "strategy": strategy,
+            "params": params,
+            "data_hash": data_digest,
+            "data_version": list(data_version(symbol)),
+            "stats": {k: _json_value(v) for k, v in result["stats"].items()},
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "format": FORMAT_VERSION,
+        }
+        with open(os.path.join(tmp, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp, final)
+    except OSError:
+        # Dossier final déjà présent (écrit par un autre processus) : on garde le sien
+        shutil.rmtree(tmp, ignore_errors=True)
+        if not os.path.exists(os.path.join(final, "meta.json")):
+            raise
+    return final
+
+
+def load_meta(key):
+    """Métadonnées d'un résultat (paramètres, version des données, stats), ou None"""
+    try:
+        with open(os.path.join(_result_dir(key), "meta.json")) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _column(table, name):
+    """Colonne Arrow en vue NumPy sur le fichier (memory-map), sans copie"""
+    column = table.column(name)
+    chunk = column.chunk(0) if column.num_chunks == 1 else column.combine_chunks()
+    return chunk.to_numpy(zero_copy_only=True)
+
+
+def load_result(key):
+    """Relit un résultat stocké ; None s'il n'existe pas.
+
+    Equity et positions sont des vues en lecture seule sur le fichier
+    projeté en mémoire : seules les pages lues sont chargées. Les trades
+    (chaînes, peu de lignes) sont convertis normalement.
+    """
+    import pyarrow.feather as feather
+
+    meta = load_meta(key)
+    if meta is None:
+        return None
+    folder = _result_dir(key)
+    curves = feather.read_table(os.path.join(folder, "equity.feather"), memory_map=True)
+    index = pd.DatetimeIndex(_column(curves, "Date"), name="Date", copy=False)
+    equity = pd.Series(_column(curves, "Equity"), index=index, name="Equity", copy=False)
+    positions = pd.Series(_column(curves, "Position"), index=index, name="Position", copy=False)
+    trades = feather.read_table(os.path.join(folder, "trades.feather"), memory_map=True).to_pandas()
+    stats = {k: np.nan if v is None else v for k, v in meta["stats"].items()}
+    return {"equity": equity, "positions": positions, "trades": trades, "stats": stats, "meta": meta}
+
+
+def list_results():
+    """Tableau des résultats stockés (une ligne par exécution, stats à plat)"""
+    if not os.path.isdir(RESULTS_DIR):
+        return pd.DataFrame()
+    rows = []
+    for key in sorted(os.listdir(RESULTS_DIR)):
+        meta = load_meta(key)
+        if meta is not None:
+            rows.append({"key": key, "symbol": meta["symbol"], "strategy": meta["strategy"],
+                         **meta["params"], **meta["stats"], "created": meta["created"]})
+    return pd.DataFrame(rows)
+
+
+def cached_run(symbol, df, strategy, params, run):
+    """Renvoie le résultat stocké pour (stratégie, paramètres, données), sinon exécute `run()` et le stocke"""
+    digest = data_hash(df)
+    key = result_key(symbol, strategy, params, digest)
+    result = load_result(key)
+    if result is not None:
+        return result
+    result = run()
+    save_result(key, result, symbol, strategy, params, digest)
+    result["meta"] = load_meta(key)
+    return result
@@ -0,0 +1,181 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+import forecast_service
+import forecast_store
+from price_store import data_version, load_prices
+
+#=========================prévisions de référence rapides (millisecondes, sans Stan)
+# Chaque modèle prend les clôtures et les dates à prévoir et renvoie un
+# DataFrame (ds, yhat, yhat_lower, yhat_upper) au format de forecast_store,
+# avec un intervalle de prévision à 95 %.
+
+Z_95 = 1.959963984540054
+TREND_WINDOW = 252
+ARIMA_WINDOW = 504
+ARIMA_ORDER = (1, 1, 1)
+HOLT_ALPHAS = np.linspace(0.05, 1.0, 20)
+HOLT_BETAS = np.linspace(0.0, 0.5, 11)
+HOLT_PHIS = (0.8, 0.9, 0.95, 0.98, 1.0)
+
+
+def future_dates(index, periods):
+    """Dates à prévoir : calendrier quotidien si l'actif cote le week-end, jours ouvrés sinon"""
+    freq = "D" if (index[-periods:].dayofweek >= 5).any() else "B"
+    return pd.date_range(index[-1], periods=periods + 1, freq=freq)[1:]
+
+
+def _frame(dates, yhat, spread):
+    return pd.DataFrame({"ds": dates, "yhat": yhat, "yhat_lower": yhat - spread, "yhat_upper": yhat + spread})
+
+
+def drift(close, dates):
+    """Marche aléatoire avec dérive : pente moyenne de l'historique"""
+    close = np.asarray(close, dtype=np.float64)
+    n = len(close)
+    slope = (close[-1] - close[0]) / (n - 1)
+    sigma = np.std(np.diff(close) - slope, ddof=1)
+    h = np.arange(1, len(dates) + 1)
+    return _frame(dates, close[-1] + slope * h, Z_95 * sigma * np.sqrt(h * (1 + h / (n - 1))))
+
+
+def linear_trend(close, dates, window=TREND_WINDOW):
+    """Droite des moindres carrés sur les `window` dernières clôtures, intervalle de prédiction OLS"""
+    y = np.asarray(close, dtype=np.float64)[-window:]
+    n = len(y)
+    x = np.arange(n, dtype=np.float64)
+    slope, intercept = np.polyfit(x, y, 1)
+    sigma = np.sqrt(((y - intercept - slope * x) ** 2).sum() / (n - 2))
+    x_future = n - 1 + np.arange(1, len(dates) + 1)
+    leverage = 1 / n + (x_future - x.mean()) ** 2 / ((x - x.mean()) ** 2).sum()
+    return _frame(dates, intercept + slope * x_future, Z_95 * sigma * np.sqrt(1 + leverage))
+
+
+def _holt_grid():
+    alpha, beta, phi = np.meshgrid(HOLT_ALPHAS, HOLT_BETAS, HOLT_PHIS, indexing="ij")
+    return alpha.ravel(), beta.ravel(), phi.ravel()
+
+
+def holt(close, dates, window=TREND_WINDOW):
+    """Lissage exponentiel de Holt à tendance amortie, ETS(A,Ad,N).
+
+    Toutes les combinaisons (alpha, beta, phi) de la grille sont lissées
+    ensemble : une boucle sur les dates, des tableaux de la taille de la
+    grille, puis la combinaison de plus petite erreur quadratique à un pas
+    est retenue. L'intervalle suit la variance analytique de l'ETS.
+    """
+    y = np.asarray(close, dtype=np.float64)[-window:]
+    alpha, beta, phi = _holt_grid()
+    level = np.full(alpha.shape, y[0])
+    trend = np.full(alpha.shape, y[1] - y[0])
+    sse = np.zeros(alpha.shape)
+    for value in y[1:]:
+        error = value - (level + phi * trend)
+        sse += error * error
+        level = level + phi * trend + alpha * error
+        trend = phi * trend + alpha * beta * error
+
+    best = np.argmin(sse)
+    a, b, p = alpha[best], beta[best], phi[best]
+    sigma2 = sse[best] / (len(y) - 1)
+    h = np.arange(1, len(dates) + 1)
+    damping = np.cumsum(p ** h)
+    j = np.arange(1, len(dates))
+    growth = j * b if p == 1 else b * p * (1 - p ** j) / (1 - p)
+    variance = sigma2 * (1 + np.concatenate([[0.0], np.cumsum((a * (1 + growth)) ** 2)]))
+    return _frame(dates, level[best] + damping * trend[best], Z_95 * np.sqrt(variance))
+
+
+def arima(close, dates, order=ARIMA_ORDER, window=ARIMA_WINDOW):
+    """ARIMA en espace d'états (statsmodels) avec dérive, sur les `window` dernières clôtures"""
+    from statsmodels.tsa.arima.model import ARIMA
+
+    y = np.asarray(close, dtype=np.float64)[-window:]
+    fitted = ARIMA(y, order=order, trend="t" if order[1] == 1 else "c").fit()
+    summary = fitted.get_forecast(len(dates)).summary_frame(alpha=0.05)
+    return pd.DataFrame({"ds": dates, "yhat": summary["mean"].to_numpy(),
+                         "yhat_lower": summary["mean_ci_lower"].to_numpy(),
+                         "yhat_upper": summary["mean_ci_upper"].to_numpy()})
+
+
+BASELINES = {
+    "drift": drift,
+    "linear": linear_trend,
+    "holt": holt,
+    "arima": arima,
+}
+
+
+def baseline_forecast(symbol, model="holt", periods=forecast_service.FORECAST_PERIODS):
+    """Prévision de référence d'un actif à partir de price_store"""
+    if model not in BASELINES:
+        raise ValueError(f"Modèle inconnu : {model} (attendu : {', '.join(BASELINES)})")
+    close = load_prices(symbol)["Close"]
+    return BASELINES[model](close.to_numpy(), future_dates(close.index, periods))
+
+
+#=========================service à deux niveaux : référence immédiate, Prophet en arrière-plan
+
+MAX_REFITS = 1      # réajustements Prophet simultanés dans le processus de l'interface
+
+_refreshing = set()
+_attempted = {}
+_lock = threading.Lock()
+
+
+def _start_refit(symbol, periods):
+    """Lance le réajustement Prophet dans un thread, au plus une fois par version des données.
+
+    Au plus MAX_REFITS réajustements tournent à la fois : au-delà, l'actif
+    garde sa référence et sera relancé par un rendu ultérieur. Le travail
+    de fond sur tout l'univers revient à forecast_batch. Renvoie True si un
+    thread a été lancé.
+    """
+    version = data_version(symbol)
+
+    def run():
+        try:
+            forecast_service.get_forecast(symbol, periods)
+        except Exception:
+            pass  # la référence reste servie, nouvel essai à la prochaine version des prix
+        finally:
+            with _lock:
+                _refreshing.discard(symbol)
+
+    with _lock:
+        if symbol in _refreshing or len(_refreshing) >= MAX_REFITS or _attempted.get(symbol) == version:
+            return False
+        _refreshing.add(symbol)
+        _attempted[symbol] = version
+    threading.Thread(target=run, name=f"prophet-{symbol}", daemon=True).start()
+    return True
+
+
+def refit_pending(symbol):
+    """Vrai si un réajustement Prophet est en cours pour cet actif"""
+    with _lock:
+        return symbol in _refreshing
+
+
+def tiered_forecast(symbol, periods=forecast_service.FORECAST_PERIODS, baseline="holt"):
+    """Prévision sans attente : Prophet s'il a été calculé sur les prix actuels, sinon une référence rapide.
+
+    La version des prix enregistrée avec la prévision (forecast_store, puis
+    forecast_service) est comparée à price_store.data_version. Sinon,
+    Prophet est réajusté dans un thread (voir _start_refit ; Stan tourne dans
+    un processus cmdstan, le thread de l'interface reste libre) et un rendu
+    ultérieur obtient la prévision Prophet dès qu'elle est écrite. Renvoie
+    (prévision future, modèle utilisé).
+    """
+    version = list(data_version(symbol))
+    close = load_prices(symbol)["Close"]
+    last = close.index[-1]
+    if forecast_store.forecast_data_version(symbol, "prophet") == version:
+        return forecast_store.load_forecast(symbol, "prophet"), "prophet"
+    if forecast_service.is_fresh(symbol):
+        forecast = forecast_service.load_forecast(symbol)
+        return forecast[forecast["ds"] > last].reset_index(drop=True), "prophet"
+    _start_refit(symbol, periods)
+    return BASELINES[baseline](close.to_numpy(), future_dates(close.index, periods)), baseline
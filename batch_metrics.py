@@ -0,0 +1,58 @@
+"""Calcul des métriques de risque pour tout l'univers, sans interface.
+
+Usage : python batch_metrics.py [SYMBOLE ...] [--workers 4] [--output results/metrics.csv]
+N'importe ni streamlit ni plotly : utilisable en tâche planifiée (cron).
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+import metrics
+from price_store import list_symbols, load_prices
+
+
+def compute_symbol(symbol, confidence_level=0.95):
+    """Métriques d'un actif ; les erreurs sont renvoyées plutôt que levées"""
+    try:
+        return symbol, metrics.compute_metrics(load_prices(symbol), confidence_level), None
+    except Exception as exc:
+        return symbol, None, f"{type(exc).__name__}: {exc}"
+
+
+def run_batch(symbols=None, max_workers=None, confidence_level=0.95):
+    """Calcule les métriques de plusieurs actifs dans un pool de processus.
+
+    Renvoie (DataFrame indexé par actif, {actif: erreur}).
+    """
+    symbols = list(symbols) if symbols else list_symbols()
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        results = list(pool.map(compute_symbol, symbols, [confidence_level] * len(symbols)))
+
+    rows = {symbol: values for symbol, values, error in results if error is None}
+    errors = {symbol: error for symbol, _, error in results if error is not None}
+    return pd.DataFrame.from_dict(rows, orient="index"), errors
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("symbols", nargs="*")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument("--output", default=os.path.join("results", "metrics.csv"))
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    table, errors = run_batch(args.symbols, args.workers, args.confidence)
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    table.to_csv(args.output, index_label="Symbol")
+
+    print(f"✅ {len(table)} actifs calculés en {time.perf_counter() - start:.2f} s → {args.output}")
+    for symbol, error in errors.items():
+        print(f"❌ {symbol} : {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Compare le calcul d'indicateurs actif par actif (pandas) et en lot (NumPy).
+
+Usage : python benchmarks/bench_indicators.py [--symbols 500] [--days 2520]
+Les clôtures sont synthétiques (marche aléatoire log-normale).
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from indicator_engine import compute_indicators_wide  # noqa: E402
+
+SPECS = ["RSI", "MACD", "BOLLINGER", "VOLATILITY"]
+
+
+def per_symbol_pandas(close):
+    """Version historique : un appel pandas par indicateur et par actif"""
+    delta = close.diff()
+    gain = delta.where(delta > 0, 0).rolling(window=14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+    rsi = 100 - (100 / (1 + gain / loss))
+    macd = close.ewm(span=12, adjust=False).mean() - close.ewm(span=26, adjust=False).mean()
+    signal = macd.ewm(span=9, adjust=False).mean()
+    sma, std = close.rolling(window=20).mean(), close.rolling(window=20).std()
+    upper, lower = sma + 2 * std, sma - 2 * std
+    vol = close.pct_change().rolling(window=30).std() * np.sqrt(252)
+    return rsi, signal, upper, lower, vol
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--days", type=int, default=2520)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (args.days, args.symbols)), axis=0))
+    frame = pd.DataFrame(closes)
+
+    start = time.perf_counter()
+    for col in frame.columns:
+        per_symbol_pandas(frame[col])
+    t_pandas = time.perf_counter() - start
+
+    start = time.perf_counter()
+    wide = compute_indicators_wide(closes, SPECS)
+    t_wide = time.perf_counter() - start
+
+    ref = per_symbol_pandas(frame[0])[0].to_numpy()
+    assert np.allclose(wide["RSI"][:, 0], ref, equal_nan=True)
+
+    print(f"{args.symbols} actifs × {args.days} jours, indicateurs : {', '.join(SPECS)}")
+    print(f"  pandas par actif : {t_pandas:8.3f} s ({args.symbols / t_pandas:8.0f} actifs/s)")
+    print(f"  NumPy en lot     : {t_wide:8.3f} s ({args.symbols / t_wide:8.0f} actifs/s)")
+    print(f"  accélération     : {t_pandas / t_wide:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Compare le temps de chargement CSV et Parquet pour chaque actif de data/.
+
+Usage : python benchmarks/bench_price_load.py [--repeat 20] [--years 0]
+Avec --years > 0, un actif synthétique de N années de barres journalières
+est ajouté pour mesurer le gain sur un historique long.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import price_store  # noqa: E402
+
+
+def _best_time(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _synthetic(years):
+    n = years * 365
+    rng = np.random.default_rng(0)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    index = pd.date_range("2000-01-01", periods=n, freq="D", name="Date")
+    return pd.DataFrame({
+        "Open": close, "High": close * 1.01, "Low": close * 0.99,
+        "Close": close, "Volume": rng.integers(1e6, 1e9, n),
+    }, index=index)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--years", type=int, default=0)
+    args = parser.parse_args()
+
+    frames = {}
+    for name in sorted(os.listdir(price_store.DATA_DIR)):
+        if name.endswith(".csv") and not name.endswith("_forecast.csv"):
+            symbol = name[:-4]
+            frames[symbol] = price_store._parse_csv(price_store.price_path(symbol))
+    if args.years:
+        frames[f"SYNTH_{args.years}Y"] = _synthetic(args.years)
+
+    print(f"{'Actif':<14}{'Lignes':>8}{'CSV (ms)':>12}{'Parquet (ms)':>14}{'Gain':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        price_store.DATA_DIR = tmp
+        for symbol, df in frames.items():
+            df.to_csv(price_store.price_path(symbol))
+            price_store.write_binary(symbol, df)
+            csv_path = price_store.price_path(symbol)
+            bin_path = price_store.binary_path(symbol)
+            t_csv = _best_time(lambda: price_store._parse_csv(csv_path), args.repeat)
+            t_bin = _best_time(lambda: price_store._parse_binary(bin_path), args.repeat)
+            print(f"{symbol:<14}{len(df):>8}{t_csv * 1e3:>12.2f}{t_bin * 1e3:>14.2f}{t_csv / t_bin:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
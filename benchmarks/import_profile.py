@@ -0,0 +1,68 @@
+"""Mesure le coût d'import de chaque module de l'application (démarrage à froid).
+
+Usage : python benchmarks/import_profile.py [module ...] [--top 10]
+Chaque module est importé dans un interpréteur neuf avec `python -X importtime`,
+ce qui donne le temps cumulé du module et ses dépendances les plus lourdes.
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+MODULES = [
+    "price_store", "indicator_engine", "figure_cache", "metrics", "analysis",
+    "indicators", "visualization", "stats_analysis", "alerts", "correlation",
+    "predictor", "backtest", "data_fetcher", "main",
+]
+
+_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def profile_module(module):
+    """Importe `module` dans un sous-processus et renvoie ses temps d'import.
+
+    Renvoie {"total": µs, "imports": [(cumulé µs, propre µs, profondeur, nom)]
+    pour les dépendances du module, "error": message ou None}.
+    """
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=ROOT, capture_output=True, text=True)
+    imports = []
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative, indent, name = match.groups()
+            imports.append((int(cumulative), int(self_us), len(indent) // 2, name))
+    # Les lignes d'import du module suivent celles du démarrage de l'interpréteur :
+    # on ne garde que celles situées après le dernier import de premier niveau précédent
+    end = next((i for i in range(len(imports) - 1, -1, -1) if imports[i][3] == module), None)
+    if end is None:
+        total, imports = None, []
+    else:
+        start = next((i + 1 for i in range(end - 1, -1, -1) if imports[i][2] == 0), 0)
+        total, imports = imports[end][0], imports[start:end]
+    error = proc.stderr.strip().splitlines()[-1] if proc.returncode else None
+    return {"total": total, "imports": imports, "error": error}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    parser.add_argument("--top", type=int, default=5, help="dépendances affichées par module")
+    args = parser.parse_args()
+
+    for module in args.modules:
+        result = profile_module(module)
+        if result["error"]:
+            print(f"❌ {module:<18} {result['error']}")
+            continue
+        print(f"📦 {module:<18} {result['total'] / 1000:8.1f} ms")
+        # Dépendances directes de premier niveau les plus coûteuses
+        direct = sorted((i for i in result["imports"] if i[2] == 1), reverse=True)
+        for cumulative, _, _, name in direct[:args.top]:
+            print(f"     {name:<30} {cumulative / 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,16 @@
 import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
+from price_store import load_prices
 import streamlit as st
 
 
 def plot_correlation_matrix():
     """Affiche la matrice de corrélation entre BTC, SP500 et OR avec Streamlit"""
+    # Import à la demande : seaborn/matplotlib ne servent qu'à ce graphique
+    import seaborn as sns
+    import matplotlib.pyplot as plt
+
     assets = ["BTC", "SP500", "GOLD"]
-    data = {asset: pd.read_csv(f"data/{asset}.csv", index_col=0, parse_dates=True)["Close"] for asset in assets}
+    data = {asset: load_prices(asset)["Close"] for asset in assets}
 
     df = pd.DataFrame(data)
     correlation_matrix = df.corr()
@@ -1,6 +1,10 @@
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import pandas as pd
-import yfinance as yf
+from price_store import load_prices, price_path, save_prices, append_prices
 
 ASSETS = {
     "BTC": "BTC-USD",
@@ -8,25 +12,164 @@ ASSETS = {
     "GOLD": "GC=F"
 }
 
-def fetch_data(symbol):
-    """Télécharge et nettoie les données Yahoo Finance"""
-    if symbol not in ASSETS:
-        print(f"❌ Actif {symbol} non reconnu.")
-        return None
+# Historiques des taux de change (unités de devise pour 1 USD), voir fx_rates.convert_prices.
+# Stockés comme les prix mais hors de la liste des actifs négociables.
+FX_TICKERS = {
+    "FX_EUR": "EUR=X",
+    "FX_GBP": "GBP=X"
+}
+TICKERS = {**ASSETS, **FX_TICKERS}
 
-    data = yf.download(ASSETS[symbol], period="6y")
+COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
 
+
+def _clean(data):
+    """Aplatit les colonnes Yahoo et garde uniquement OHLCV"""
+    if data is None or data.empty:
+        raise ValueError("aucune donnée reçue de la source")
     if isinstance(data.columns, pd.MultiIndex):
         data.columns = [col[0] for col in data.columns]
+    return data[COLUMNS]
+
+
+def yahoo_source(ticker, start=None):
+    """Source par défaut : Yahoo Finance (historique de 6 ans si start est None)"""
+    import yfinance as yf
+
+    if start is None:
+        return yf.download(ticker, period="6y")
+    return yf.download(ticker, start=start)
+
+
+class CsvSource:
+    """Source locale qui sert les barres d'un dossier de CSV ({ticker}.csv).
+
+    Permet de tester le fetcher hors ligne ou de rejouer un miroir local.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def __call__(self, ticker, start=None):
+        df = pd.read_csv(os.path.join(self.directory, f"{ticker}.csv"), index_col=0, parse_dates=True)
+        if start is not None:
+            df = df[df.index >= pd.Timestamp(start)]
+        return df
+
+
+def fetch_data(symbol, incremental=False, source=yahoo_source):
+    """Télécharge et nettoie les données Yahoo Finance.
+
+    En mode incrémental, seules les barres postérieures à la dernière date
+    stockée sont demandées à la source puis ajoutées au fichier existant.
+    """
+    if symbol not in TICKERS:
+        print(f"❌ Actif {symbol} non reconnu.")
+        return None
+
+    if incremental and os.path.exists(price_path(symbol)):
+        return _fetch_incremental(symbol, source)
 
-    data = data[["Open", "High", "Low", "Close", "Volume"]]
+    data = _clean(source(TICKERS[symbol]))
 
-    os.makedirs("data", exist_ok=True)
-    file_path = f"data/{symbol}.csv"
-    data.to_csv(file_path)
+    # CSV + copie binaire (Parquet) relue en priorité par price_store
+    save_prices(symbol, data)
 
     return data
 
+
+def _fetch_incremental(symbol, source):
+    """Ajoute au fichier stocké les barres manquantes depuis la dernière date"""
+    stored = load_prices(symbol)
+    last_date = stored.index[-1]
+
+    # La dernière barre stockée est redemandée : si elle était partielle (séance
+    # en cours lors de l'exécution précédente), sa version définitive la remplace
+    new = _clean(source(TICKERS[symbol], start=last_date.strftime("%Y-%m-%d")))
+    new = new[~new.index.duplicated(keep="last")].sort_index()
+    new = new[new.index >= last_date]
+
+    added = int((new.index > last_date).sum())
+    revised = (not new.empty and new.index[0] == last_date
+               and not np.allclose(new.iloc[0].to_numpy(dtype=np.float64),
+                                   stored[COLUMNS].iloc[-1].to_numpy(dtype=np.float64), rtol=1e-9, equal_nan=True))
+    if not added and not revised:
+        print(f"✅ {symbol} déjà à jour ({last_date:%Y-%m-%d}).")
+        return stored
+
+    append_prices(symbol, new)
+    print(f"✅ {symbol} : {added} nouvelle(s) barre(s) ajoutée(s)"
+          + (f", barre du {last_date:%Y-%m-%d} corrigée." if revised else "."))
+    return load_prices(symbol)
+
+
+class RateLimiter:
+    """Limite globale du nombre d'appels par seconde, partagée entre threads"""
+
+    def __init__(self, calls_per_second, clock=time.monotonic, sleep=time.sleep):
+        self.interval = 1.0 / calls_per_second
+        self.clock = clock
+        self.sleep = sleep
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        # Chaque appel réserve le prochain créneau libre puis attend son tour
+        with self._lock:
+            now = self.clock()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            self.sleep(slot - now)
+
+
+def fetch_many(symbols=None, max_workers=8, retries=3, backoff=0.5, rate_limit=None,
+               incremental=False, source=yahoo_source, sleep=time.sleep):
+    """Télécharge plusieurs actifs en parallèle avec reprise sur erreur.
+
+    Chaque actif est retenté jusqu'à `retries` fois avec un délai exponentiel
+    (backoff, 2*backoff, 4*backoff...). `rate_limit` borne le nombre total
+    d'appels à la source par seconde, tous threads confondus. Par défaut,
+    les actifs de ASSETS (sans les taux de change). Renvoie un
+    rapport {symbole: {"ok", "lignes", "tentatives", "duree", "erreur"}}.
+    """
+    symbols = list(ASSETS) if symbols is None else list(symbols)
+    limiter = RateLimiter(rate_limit, sleep=sleep) if rate_limit else None
+
+    def limited_source(ticker, start=None):
+        if limiter is not None:
+            limiter.wait()
+        return source(ticker, start=start)
+
+    def fetch_one(symbol):
+        start = time.perf_counter()
+        result = {"ok": False, "lignes": 0, "tentatives": 0, "duree": 0.0, "erreur": None}
+        for attempt in range(retries + 1):
+            result["tentatives"] = attempt + 1
+            try:
+                data = fetch_data(symbol, incremental=incremental, source=limited_source)
+            except Exception as e:
+                result["erreur"] = f"{type(e).__name__}: {e}"
+                if attempt < retries:
+                    sleep(backoff * 2 ** attempt)
+                continue
+            if data is None:
+                result["erreur"] = "actif non reconnu"
+            else:
+                result.update(ok=True, lignes=len(data), erreur=None)
+            break
+        result["duree"] = time.perf_counter() - start
+        return symbol, result
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        report = dict(pool.map(fetch_one, symbols))
+
+    failed = [s for s, r in report.items() if not r["ok"]]
+    print(f"📥 {len(symbols) - len(failed)}/{len(symbols)} actifs mis à jour.")
+    for symbol in failed:
+        print(f"❌ {symbol} : {report[symbol]['erreur']}")
+    return report
+
+
 if __name__ == "__main__":
-    for asset in ASSETS.keys():
-        fetch_data(asset)
+    fetch_many(list(TICKERS), incremental=True)
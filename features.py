@@ -0,0 +1,208 @@
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from indicator_engine import ewm_mean
+from online_indicators import OnlineMACD, from_dict
+from price_store import data_version, load_prices
+from rolling_stats import rolling_mean, rolling_std
+
+#=========================variables explicatives des modèles de prédiction, à partir des OHLCV stockés
+# Toutes les variables de la barre t n'utilisent que des données connues à
+# la clôture de t ; les cibles (target_*) portent sur la barre t+1.
+# Matrices en float32, mémorisées par version des données et étendues
+# barre par barre quand de nouvelles cotations arrivent.
+
+FEATURES_DIR = os.path.join("results", "features")
+LAGS = 5
+RSI_WINDOW = 14
+VOL_WINDOW = 20
+SMA_WINDOW = 20
+MACD_SPANS = (12, 26, 9)
+TRADING_DAYS = 252
+# Historique à relire avant les nouvelles barres pour recalculer les fenêtres glissantes
+TAIL = max(LAGS, RSI_WINDOW, VOL_WINDOW, SMA_WINDOW) + 1
+
+FEATURES = ([f"ret_{k}" for k in range(1, LAGS + 1)]
+            + [f"rsi_{RSI_WINDOW}", f"vol_{VOL_WINDOW}", "macd", "macd_signal", "macd_hist",
+               "range", "gap", f"close_sma_{SMA_WINDOW}"])
+TARGETS = ["target_return", "target_close"]
+
+_cache = {}
+_lock = threading.Lock()
+
+
+def _window_features(df):
+    """Variables à mémoire finie (retards, RSI, volatilité, amplitude), calculées en bloc"""
+    close = df["Close"].to_numpy(dtype=np.float64)
+    log_close = np.log(close)
+    returns = np.full(len(close), np.nan)
+    returns[1:] = np.diff(log_close)
+
+    out = {}
+    for k in range(1, LAGS + 1):
+        out[f"ret_{k}"] = np.concatenate([np.full(k - 1, np.nan), returns[:len(returns) - k + 1]])
+
+    delta = np.full(len(close), np.nan)
+    delta[1:] = np.diff(close)
+    gain = rolling_mean(np.where(delta > 0, delta, 0.0), RSI_WINDOW)
+    loss = rolling_mean(np.where(delta < 0, -delta, 0.0), RSI_WINDOW)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[f"rsi_{RSI_WINDOW}"] = 100 - 100 / (1 + gain / loss)
+
+    out[f"vol_{VOL_WINDOW}"] = rolling_std(returns, VOL_WINDOW) * np.sqrt(TRADING_DAYS)
+    out["range"] = (df["High"].to_numpy() - df["Low"].to_numpy()) / close
+    gap = np.full(len(close), np.nan)
+    gap[1:] = np.log(df["Open"].to_numpy()[1:]) - log_close[:-1]
+    out["gap"] = gap
+    out[f"close_sma_{SMA_WINDOW}"] = close / rolling_mean(close, SMA_WINDOW) - 1
+    return out
+
+
+def _macd_features(close, macd, signal):
+    return {"macd": macd / close, "macd_signal": signal / close, "macd_hist": (macd - signal) / close}
+
+
+def _targets(close):
+    target_close = np.full(len(close), np.nan)
+    target_close[:-1] = close[1:]
+    return {"target_return": np.log(target_close / close), "target_close": target_close}
+
+
+def _frame(index, columns, close):
+    columns.update(_targets(close))
+    return pd.DataFrame({name: np.asarray(columns[name], dtype=np.float32) for name in FEATURES + TARGETS},
+                        index=index)
+
+
+def build_features(df):
+    """Calcule toutes les variables d'un historique OHLCV.
+
+    Renvoie (DataFrame float32 indexé par date : FEATURES puis TARGETS,
+    état pour extend_features). Les EMA du MACD sont calculées en bloc
+    (indicator_engine.ewm_mean) et leur dernier état est conservé.
+    """
+    close = df["Close"].to_numpy(dtype=np.float64)
+    fast, slow, span = MACD_SPANS
+    ema_fast, ema_slow = ewm_mean(close[:, None], fast)[:, 0], ewm_mean(close[:, None], slow)[:, 0]
+    macd = ema_fast - ema_slow
+    signal = ewm_mean(macd[:, None], span)[:, 0]
+
+    online = OnlineMACD(fast, slow, span)
+    online.fast.value, online.slow.value, online.signal.value = (float(ema_fast[-1]), float(ema_slow[-1]),
+                                                                  float(signal[-1]))
+
+    columns = {**_window_features(df), **_macd_features(close, macd, signal)}
+    return _frame(df.index, columns, close), _state(df, online)
+
+
+def _state(df, online):
+    return {"rows": len(df), "last_date": df.index[-1].isoformat(), "last_close": float(df["Close"].iloc[-1]),
+            "macd": online.to_dict()}
+
+
+def _extends(state, df):
+    """Vrai si `df` prolonge l'historique décrit par `state` (mêmes barres, puis de nouvelles)"""
+    n = state["rows"]
+    return (len(df) > n and df.index[n - 1].isoformat() == state["last_date"]
+            and float(df["Close"].iloc[n - 1]) == state["last_close"])
+
+
+def extend_features(frame, state, df):
+    """Ajoute à `frame` les barres de `df` postérieures à `state`, sans tout recalculer.
+
+    Les fenêtres glissantes sont recalculées sur les TAIL dernières barres
+    connues plus les nouvelles ; les EMA du MACD repartent de leur état
+    (online_indicators.OnlineMACD). La cible de l'ancienne dernière barre,
+    jusque-là inconnue, est complétée.
+    """
+    n = state["rows"]
+    online = from_dict(state["macd"])
+    new_close = df["Close"].to_numpy(dtype=np.float64)[n:]
+    macd, signal = np.empty(len(new_close)), np.empty(len(new_close))
+    for i, x in enumerate(new_close):
+        value = online.update(x)
+        macd[i], signal[i] = value["MACD"], value["MACD_Signal"]
+
+    start = max(0, n - TAIL)
+    window = {name: values[n - start:] for name, values in _window_features(df.iloc[start:]).items()}
+    columns = {**window, **_macd_features(new_close, macd, signal)}
+    added = _frame(df.index[n:], columns, new_close)
+
+    frame = frame.copy()
+    last_close = df["Close"].iloc[n - 1]
+    frame.iloc[-1, frame.columns.get_loc("target_close")] = np.float32(new_close[0])
+    frame.iloc[-1, frame.columns.get_loc("target_return")] = np.float32(np.log(new_close[0] / last_close))
+    return pd.concat([frame, added]), _state(df, online)
+
+
+def _paths(symbol):
+    return (os.path.join(FEATURES_DIR, f"{symbol}.parquet"), os.path.join(FEATURES_DIR, f"{symbol}.json"))
+
+
+def _read_disk(symbol):
+    frame_path, state_path = _paths(symbol)
+    try:
+        with open(state_path) as f:
+            state = json.load(f)
+        return pd.read_parquet(frame_path), state
+    except (FileNotFoundError, ValueError, ImportError):
+        return None, None
+
+
+def _write_disk(symbol, frame, state):
+    frame_path, state_path = _paths(symbol)
+    os.makedirs(FEATURES_DIR, exist_ok=True)
+    try:
+        frame.to_parquet(f"{frame_path}.tmp")
+    except ImportError:
+        return  # pyarrow absent : cache en mémoire seulement
+    os.replace(f"{frame_path}.tmp", frame_path)
+    with open(f"{state_path}.tmp", "w") as f:
+        json.dump(state, f)
+    os.replace(f"{state_path}.tmp", state_path)
+
+
+def load_features(symbol, persist=True):
+    """Variables d'un actif, à jour de ses prix.
+
+    Ordre de recherche : mémoire, puis results/features/ (avec `persist`).
+    Une version identique des données est renvoyée telle quelle ; un
+    historique prolongé est étendu par extend_features ; sinon tout est
+    recalculé. La table renvoyée est partagée : ne pas la modifier.
+    """
+    version = list(data_version(symbol))
+    with _lock:
+        entry = _cache.get(symbol)
+    if entry is not None and entry[0] == version:
+        return entry[1]
+
+    frame, state = entry[1:] if entry is not None else (None, None)
+    if frame is None and persist:
+        frame, state = _read_disk(symbol)
+        if state is not None and state.get("data_version") == version:
+            with _lock:
+                _cache[symbol] = (version, frame, state)
+            return frame
+
+    df = load_prices(symbol)
+    if state is not None and _extends(state, df):
+        frame, state = extend_features(frame, state, df)
+    else:
+        frame, state = build_features(df)
+    state["data_version"] = version
+    if persist:
+        _write_disk(symbol, frame, state)
+    with _lock:
+        _cache[symbol] = (version, frame, state)
+    return frame
+
+
+def feature_matrix(symbol, features=FEATURES, target="target_return"):
+    """(X, y) prêts pour scikit-learn : lignes complètes seulement, X en float32"""
+    frame = load_features(symbol)
+    data = frame[list(features) + [target]].dropna()
+    return data[list(features)], data[target]
@@ -0,0 +1,92 @@
+import functools
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from price_store import data_version
+
+# Limites du cache (modifiables avant le premier rendu)
+MAX_ENTRIES = 128
+MAX_BYTES = 256 * 1024 * 1024
+
+_entries = OrderedDict()
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "evictions": 0, "bytes": 0}
+
+_TRACE_ARRAYS = ("x", "y", "open", "high", "low", "close", "text")
+
+
+def _hashable(value):
+    """Convertit listes/dicts en tuples pour construire la clé de cache"""
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_hashable(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _hashable(v)) for k, v in value.items()))
+    return value
+
+
+def _figure_size(fig):
+    """Estimation de la mémoire occupée par les données des traces"""
+    size = 0
+    for trace in fig.data:
+        for attr in _TRACE_ARRAYS:
+            values = getattr(trace, attr, None)
+            if values is not None:
+                size += np.asarray(values).nbytes
+    return size
+
+
+def _evict():
+    while _entries and (len(_entries) > MAX_ENTRIES or _stats["bytes"] > MAX_BYTES):
+        _, (_, size) = _entries.popitem(last=False)
+        _stats["bytes"] -= size
+        _stats["evictions"] += 1
+
+
+def cached_figure(assets=None, versions=None):
+    """Mémorise les figures Plotly par (fonction, paramètres, version des données).
+
+    Par défaut, le premier argument est le symbole de l'actif dont la version
+    des données entre dans la clé ; `assets` fixe la liste pour les graphiques
+    multi-actifs. `versions(*args, **kwargs)` ajoute à la clé d'autres
+    versions de données (ex. l'historique de taux de change). Les entrées
+    sont évincées par ordre LRU au-delà de MAX_ENTRIES figures ou de
+    MAX_BYTES octets. La figure renvoyée est partagée : ne pas la modifier.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            symbols = assets if assets is not None else args[:1]
+            key = (func.__module__, func.__qualname__, _hashable(args), _hashable(kwargs),
+                   tuple(data_version(s) for s in symbols),
+                   versions(*args, **kwargs) if versions is not None else None)
+            with _lock:
+                if key in _entries:
+                    _entries.move_to_end(key)
+                    _stats["hits"] += 1
+                    return _entries[key][0]
+                _stats["misses"] += 1
+
+            fig = func(*args, **kwargs)
+            size = _figure_size(fig)
+            with _lock:
+                if key not in _entries:
+                    _entries[key] = (fig, size)
+                    _stats["bytes"] += size
+                    _evict()
+            return fig
+        return wrapper
+    return decorator
+
+
+def cache_stats():
+    """Compteurs du cache de figures (succès, échecs, évictions, mémoire)"""
+    with _lock:
+        return {**_stats, "entries": len(_entries)}
+
+
+def clear_cache():
+    """Vide le cache de figures"""
+    with _lock:
+        _entries.clear()
+        _stats["bytes"] = 0
@@ -0,0 +1,184 @@
+"""Prévisions nocturnes de tout l'univers dans un pool de processus, sans interface.
+
+Usage : python forecast_batch.py [SYMBOLE ...] [--workers 4] [--periods 30]
+                                 [--models prophet drift holt] [--memory-mb 4096] [--deadline 3600]
+Chaque processus est limité en mémoire (RLIMIT_AS) et Stan y tourne sur un
+seul thread : N processus occupent N cœurs, sans sur-souscription. Les
+résultats sont écrits dans forecast_store (results/forecasts.parquet).
+Passé `--deadline` secondes, les processus sont arrêtés (cmdstan compris) et
+les actifs non traités gardent leur prévision précédente.
+"""
+import argparse
+import multiprocessing
+import os
+import signal
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import pandas as pd
+
+import forecast_service
+import forecast_store
+from baselines import BASELINES, future_dates
+from price_store import data_version, list_symbols, load_prices
+
+MODELS = ("prophet",) + tuple(BASELINES)
+DEFAULT_MODELS = ("prophet", "drift", "holt")
+MEMORY_MB = 4096
+THREAD_VARIABLES = ("STAN_NUM_THREADS", "OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS")
+
+
+def _limit_worker(memory_mb, pids=None):
+    """Initialisation d'un processus du pool : un thread de calcul, mémoire plafonnée.
+
+    Le PID du processus est publié dans `pids` (file partagée) pour _terminate.
+    """
+    if hasattr(os, "setpgrp"):
+        os.setpgrp()  # groupe propre : _terminate arrête aussi les processus cmdstan
+    if pids is not None:
+        pids.put(os.getpid())
+    # Lues au démarrage des programmes lancés ensuite (cmdstan) ; les
+    # bibliothèques déjà chargées avant le fork (BLAS de NumPy) sont
+    # plafonnées par threadpoolctl.
+    for name in THREAD_VARIABLES:
+        os.environ[name] = "1"
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        pass
+    else:
+        threadpool_limits(limits=1)
+    if memory_mb:
+        try:
+            import resource
+        except ImportError:
+            return  # Windows : pas de RLIMIT_AS
+        limit = memory_mb * 1024 * 1024
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        if hard != resource.RLIM_INFINITY:
+            limit = min(limit, hard)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+
+def _terminate(pids):
+    """Arrête les processus du pool, dont les PID ont été publiés par _limit_worker, et leurs enfants.
+
+    Les tâches déjà transmises aux processus ne peuvent pas être annulées :
+    sans cela, shutdown (et la sortie de l'interpréteur) attendrait la fin
+    de chaque ajustement en cours ou en file.
+    """
+    while not pids.empty():
+        pid = pids.get()
+        try:
+            if hasattr(os, "killpg"):
+                os.killpg(pid, signal.SIGTERM)  # le groupe créé par _limit_worker porte le PID du processus
+            else:
+                os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+
+
+def _prophet_forecast(symbol, periods, last_date):
+    forecast = forecast_service.get_forecast(symbol, periods)
+    if forecast is None:
+        raise RuntimeError("aucune prévision Prophet disponible")
+    version = forecast_service.fitted_version(symbol)
+    return forecast[forecast["ds"] > last_date].assign(
+        data_version=forecast_store.encode_version(version) if version is not None else "")
+
+
+def forecast_symbol(symbol, periods=forecast_service.FORECAST_PERIODS, models=DEFAULT_MODELS):
+    """Prévisions d'un actif pour chaque modèle ; les erreurs sont renvoyées plutôt que levées.
+
+    Renvoie (actif, DataFrame au format forecast_store ou None, {modèle: erreur}).
+    """
+    try:
+        version = forecast_store.encode_version(data_version(symbol))
+        close = load_prices(symbol)["Close"]
+    except Exception as exc:
+        return symbol, None, {"data": f"{type(exc).__name__}: {exc}"}
+    frames, errors = [], {}
+    for model in models:
+        try:
+            if model == "prophet":
+                frame = _prophet_forecast(symbol, periods, close.index[-1])
+            elif model in BASELINES:
+                frame = BASELINES[model](close.to_numpy(), future_dates(close.index, periods))
+                frame = frame.assign(data_version=version)
+            else:
+                raise ValueError(f"Modèle inconnu : {model}")
+        except Exception as exc:  # MemoryError comprise (plafond RLIMIT_AS)
+            errors[model] = f"{type(exc).__name__}: {exc}"
+            continue
+        frames.append(frame.assign(symbol=symbol, model=model))
+    return symbol, pd.concat(frames, ignore_index=True) if frames else None, errors
+
+
+def run_batch(symbols=None, max_workers=None, periods=forecast_service.FORECAST_PERIODS, models=DEFAULT_MODELS,
+              memory_mb=MEMORY_MB, deadline=None):
+    """Calcule les prévisions de plusieurs actifs dans un pool de processus et les stocke.
+
+    Les actifs dont la prévision Prophet est périmée passent en premier. Si
+    `deadline` (secondes) est atteinte, les résultats terminés sont écrits
+    et les processus sont arrêtés : les ajustements en cours sont perdus et
+    le programme rend la main aussitôt. Renvoie
+    ({actif: nombre de lignes écrites}, {actif: {modèle: erreur}}, [actifs non traités]).
+    """
+    symbols = list(symbols) if symbols else list_symbols()
+    symbols.sort(key=forecast_service.is_fresh)
+    start = time.monotonic()
+    frames, errors, done = [], {}, {}
+
+    pids = multiprocessing.SimpleQueue()
+    pool = ProcessPoolExecutor(max_workers=max_workers, initializer=_limit_worker, initargs=(memory_mb, pids))
+    pending = {pool.submit(forecast_symbol, symbol, periods, tuple(models)): symbol for symbol in symbols}
+    try:
+        while pending:
+            timeout = None if deadline is None else max(0.0, deadline - (time.monotonic() - start))
+            finished, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not finished:
+                break
+            for future in finished:
+                symbol = pending.pop(future)
+                try:
+                    _, frame, symbol_errors = future.result()
+                except Exception as exc:  # processus tué (mémoire), pool cassé…
+                    frame, symbol_errors = None, {"worker": f"{type(exc).__name__}: {exc}"}
+                if frame is not None:
+                    frames.append(frame)
+                    done[symbol] = len(frame)
+                if symbol_errors:
+                    errors[symbol] = symbol_errors
+        skipped = list(pending.values())
+        if frames:
+            forecast_store.write_forecasts(frames)
+    finally:
+        if pending:
+            _terminate(pids)
+        pool.shutdown(wait=True, cancel_futures=True)
+    return done, errors, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("symbols", nargs="*")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--periods", type=int, default=forecast_service.FORECAST_PERIODS)
+    parser.add_argument("--models", nargs="+", default=list(DEFAULT_MODELS), choices=MODELS)
+    parser.add_argument("--memory-mb", type=int, default=MEMORY_MB, help="plafond mémoire par processus (0 : aucun)")
+    parser.add_argument("--deadline", type=float, default=None, help="durée maximale en secondes")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    done, errors, skipped = run_batch(args.symbols, args.workers, args.periods, args.models,
+                                      args.memory_mb, args.deadline)
+    print(f"✅ {len(done)} actifs prévus en {time.perf_counter() - start:.2f} s → {forecast_store.STORE_PATH}")
+    for symbol, symbol_errors in errors.items():
+        for model, error in symbol_errors.items():
+            print(f"❌ {symbol} ({model}) : {error}")
+    if skipped:
+        print(f"⚠ Délai dépassé, non traités : {', '.join(skipped)}")
+
+
+if __name__ == "__main__":
+    main()
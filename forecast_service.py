@@ -0,0 +1,208 @@
+"""Prévisions Prophet précalculées : un ajustement par version des données, pas par affichage.
+
+Usage : python forecast_service.py [SYMBOLE ...] [--periods 30] [--force]
+Le modèle ajusté est sérialisé dans models/<actif>.json (prophet.serialize)
+et ses paramètres servent de point de départ (init Stan) au réajustement
+suivant. La prévision est écrite dans results/forecasts/<actif>.csv avec un
+fichier results/forecasts/<actif>.json qui indique la version des prix
+utilisée. Les CSV data/<actif>_forecast.csv livrés avec le dépôt ne sont
+que relus, tant qu'aucun réajustement n'a eu lieu : sans version des prix
+connue, ils ne sont jamais considérés à jour.
+"""
+import argparse
+import json
+import os
+import threading
+import time
+
+import pandas as pd
+
+from price_store import DATA_DIR, data_version, list_symbols, load_prices
+
+MODELS_DIR = "models"
+FORECASTS_DIR = os.path.join("results", "forecasts")
+FORECAST_PERIODS = 30
+FORECAST_COLUMNS = ["ds", "yhat", "yhat_lower", "yhat_upper"]
+
+_cache = {}
+_lock = threading.Lock()
+_refit_lock = threading.Lock()
+
+
+def _output_path(symbol):
+    return os.path.join(FORECASTS_DIR, f"{symbol}.csv")
+
+
+def _sidecar_path(symbol):
+    return os.path.join(FORECASTS_DIR, f"{symbol}.json")
+
+
+def forecast_path(symbol):
+    """Chemin du CSV de prévision à lire : le dernier réajustement, sinon le fichier livré dans data/"""
+    path = _output_path(symbol)
+    return path if os.path.exists(path) else os.path.join(DATA_DIR, f"{symbol}_forecast.csv")
+
+
+def model_path(symbol):
+    """Chemin du modèle Prophet sérialisé d'un actif"""
+    return os.path.join(MODELS_DIR, f"{symbol}.json")
+
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _write_atomic(path, text):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp-{os.getpid()}"
+    with open(tmp, "w") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def is_fresh(symbol):
+    """Vrai si la prévision stockée a été calculée sur les prix actuels.
+
+    La version des prix (price_store.data_version) utilisée par le dernier
+    réajustement est lue dans son fichier annexe. Un CSV livré dans data/
+    n'en a pas : il n'est jamais à jour, quelles que soient les dates des
+    fichiers (un checkout les remet toutes à l'heure courante).
+    """
+    version = fitted_version(symbol)
+    return version is not None and version == list(data_version(symbol))
+
+
+def fitted_version(symbol):
+    """Version des prix du dernier réajustement (liste), None pour un CSV livré ou sans réajustement"""
+    if forecast_path(symbol) != _output_path(symbol):
+        return None
+    sidecar = _read_json(_sidecar_path(symbol))
+    return None if sidecar is None else sidecar.get("data_version")
+
+
+def forecast_version(symbol):
+    """Version du fichier de prévision : (mtime en ns, taille), None s'il n'existe pas"""
+    try:
+        st = os.stat(forecast_path(symbol))
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def load_forecast(symbol):
+    """Prévision stockée (ds, yhat, yhat_lower, yhat_upper), lue une fois par version du fichier"""
+    version = forecast_version(symbol)
+    if version is None:
+        return None
+    with _lock:
+        entry = _cache.get(symbol)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+    frame = pd.read_csv(forecast_path(symbol), usecols=FORECAST_COLUMNS, parse_dates=["ds"])
+    with _lock:
+        _cache[symbol] = (version, frame)
+    return frame
+
+
+def _stan_init(model):
+    """Paramètres ajustés d'un modèle, au format `init` de Prophet.fit (démarrage à chaud)"""
+    return {
+        **{name: float(model.params[name][0][0]) for name in ("k", "m", "sigma_obs")},
+        **{name: model.params[name][0] for name in ("delta", "beta")},
+    }
+
+
+def _previous_model(symbol):
+    from prophet.serialize import model_from_json
+
+    try:
+        with open(model_path(symbol)) as f:
+            return model_from_json(f.read())
+    except (FileNotFoundError, ValueError, KeyError):
+        return None
+
+
+def _fit_prophet(symbol, history, periods):
+    """Ajuste Prophet (à chaud si un modèle précédent existe) et le sérialise.
+
+    Renvoie (prévision ds, yhat, yhat_lower, yhat_upper, démarrage à chaud).
+    """
+    from prophet import Prophet
+    from prophet.serialize import model_to_json
+
+    previous = _previous_model(symbol)
+    model = Prophet()
+    if previous is not None:
+        model.fit(history, init=_stan_init(previous))
+    else:
+        model.fit(history)
+    forecast = model.predict(model.make_future_dataframe(periods=periods))[FORECAST_COLUMNS]
+    _write_atomic(model_path(symbol), model_to_json(model))
+    return forecast, previous is not None
+
+
+def refit(symbol, periods=FORECAST_PERIODS):
+    """Réajuste Prophet sur les prix actuels et enregistre modèle et prévision.
+
+    Le modèle précédent, s'il existe, fournit l'initialisation de
+    l'optimiseur Stan : après l'ajout de quelques barres, la convergence est
+    bien plus rapide qu'à froid. La version des prix lue avant l'ajustement
+    est enregistrée avec la prévision. Renvoie la prévision.
+    """
+    version = list(data_version(symbol))
+    history = load_prices(symbol)["Close"].rename("y").rename_axis("ds").reset_index()
+    forecast, warm_start = _fit_prophet(symbol, history, periods)
+
+    _write_atomic(_output_path(symbol), forecast.to_csv(index=False))
+    sidecar = {"data_version": version, "periods": periods, "warm_start": warm_start,
+               "created": time.strftime("%Y-%m-%dT%H:%M:%S")}
+    _write_atomic(_sidecar_path(symbol), json.dumps(sidecar, indent=2))
+    return load_forecast(symbol)
+
+
+def get_forecast(symbol, periods=FORECAST_PERIODS, refresh=True):
+    """Prévision d'un actif pour les tableaux de bord.
+
+    La prévision stockée est renvoyée telle quelle si elle est à jour ; sinon
+    elle est recalculée (une seule fois, même si plusieurs sessions la
+    demandent). Sans Prophet installé, la dernière prévision stockée est
+    renvoyée même si elle est ancienne. None si aucune prévision n'existe.
+    """
+    if is_fresh(symbol) or not refresh:
+        return load_forecast(symbol)
+    with _refit_lock:
+        if is_fresh(symbol):
+            return load_forecast(symbol)
+        try:
+            return refit(symbol, periods)
+        except ImportError:
+            print(f"⚠ prophet absent : prévision stockée de {symbol} utilisée sans réajustement.")
+            return load_forecast(symbol)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("symbols", nargs="*")
+    parser.add_argument("--periods", type=int, default=FORECAST_PERIODS)
+    parser.add_argument("--force", action="store_true", help="réajuste même si la prévision est à jour")
+    args = parser.parse_args()
+
+    for symbol in args.symbols or list_symbols():
+        if is_fresh(symbol) and not args.force:
+            print(f"✅ {symbol} : prévision à jour")
+            continue
+        start = time.perf_counter()
+        try:
+            refit(symbol, args.periods)
+        except Exception as exc:
+            print(f"❌ {symbol} : {type(exc).__name__}: {exc}")
+            continue
+        print(f"📈 {symbol} : réajusté en {time.perf_counter() - start:.1f} s → {forecast_path(symbol)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+#=========================stockage compact des prévisions (un seul Parquet pour tout l'univers)
+# Une ligne par (actif, modèle, date future) : actif et modèle en catégories,
+# valeurs en float32. Écrit par forecast_batch, lu par l'interface et le
+# rapport PDF sans réajuster aucun modèle. La colonne data_version garde la
+# version des prix (price_store.data_version, en JSON) sur laquelle chaque
+# prévision a été calculée : vide si elle est inconnue.
+
+STORE_PATH = os.path.join("results", "forecasts.parquet")
+COLUMNS = ["symbol", "model", "data_version", "ds", "yhat", "yhat_lower", "yhat_upper"]
+VALUE_COLUMNS = ["yhat", "yhat_lower", "yhat_upper"]
+
+_cache = {}
+_lock = threading.Lock()
+
+
+def store_version(path=STORE_PATH):
+    """Version du fichier de stockage : (mtime en ns, taille), None s'il n'existe pas"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _compact(frame):
+    frame = frame.reindex(columns=COLUMNS)
+    frame["data_version"] = frame["data_version"].astype(object).fillna("").astype(str)
+    frame = frame.astype({"symbol": "category", "model": "category", "data_version": "category",
+                          **{col: np.float32 for col in VALUE_COLUMNS}})
+    frame["ds"] = pd.to_datetime(frame["ds"]).astype("datetime64[ns]")
+    return frame.sort_values(["symbol", "model", "ds"], ignore_index=True)
+
+
+def read_store(path=STORE_PATH):
+    """Toutes les prévisions stockées, relues une fois par version du fichier (vide si absent)"""
+    version = store_version(path)
+    if version is None:
+        return pd.DataFrame(columns=COLUMNS)
+    with _lock:
+        entry = _cache.get(path)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+    frame = pd.read_parquet(path)
+    with _lock:
+        _cache[path] = (version, frame)
+    return frame
+
+
+def write_forecasts(frames, path=STORE_PATH):
+    """Remplace dans le stockage les (actif, modèle) présents dans `frames`, garde les autres.
+
+    Écriture dans un fichier temporaire renommé à la fin : un lecteur voit
+    toujours l'ancien ou le nouveau stockage complet.
+    """
+    new = _compact(pd.concat(frames, ignore_index=True))
+    stored = read_store(path)
+    if not stored.empty:
+        replaced = pd.MultiIndex.from_frame(new[["symbol", "model"]].astype(str)).unique()
+        keys = pd.MultiIndex.from_frame(stored[["symbol", "model"]].astype(str))
+        new = _compact(pd.concat([stored[~keys.isin(replaced)].astype({"symbol": str, "model": str}),
+                                  new.astype({"symbol": str, "model": str})], ignore_index=True))
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp-{os.getpid()}"
+    new.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+    return len(new)
+
+
+def load_forecast(symbol, model="prophet", path=STORE_PATH):
+    """Prévision d'un actif pour un modèle (ds, yhat, yhat_lower, yhat_upper), None si absente"""
+    stored = read_store(path)
+    if stored.empty:
+        return None
+    rows = stored[(stored["symbol"] == symbol) & (stored["model"] == model)]
+    if rows.empty:
+        return None
+    return rows[["ds"] + VALUE_COLUMNS].reset_index(drop=True)
+
+
+def encode_version(version):
+    """Version des prix au format de la colonne data_version"""
+    return json.dumps(list(version))
+
+
+def forecast_data_version(symbol, model="prophet", path=STORE_PATH):
+    """Version des prix (liste) sur laquelle la prévision stockée a été calculée, None si inconnue"""
+    stored = read_store(path)
+    if stored.empty or "data_version" not in stored:
+        return None
+    rows = stored.loc[(stored["symbol"] == symbol) & (stored["model"] == model), "data_version"]
+    if rows.empty or not rows.iloc[0]:
+        return None
+    return json.loads(rows.iloc[0])
+
+
+def list_forecasts(path=STORE_PATH):
+    """Résumé du stockage : horizon et dernière date prévue par (actif, modèle)"""
+    stored = read_store(path)
+    if stored.empty:
+        return pd.DataFrame(columns=["symbol", "model", "points", "first", "last"])
+    return (stored.groupby(["symbol", "model"], observed=True)["ds"]
+            .agg(points="size", first="min", last="max").reset_index())
@@ -0,0 +1,268 @@
+import threading
+import time
+
+import pandas as pd
+from price_store import FX_PREFIX, data_version, load_prices
+
+#=========================taux de change : cache TTL, session HTTP partagée, rafraîchissement en fond
+
+DEFAULT_TTL = 3600          # secondes pendant lesquelles un taux est servi sans rafraîchissement
+MAX_STALE = 24 * 3600       # au-delà, un taux périmé n'est plus servi : rechargement bloquant
+TIMEOUT = (3.05, 5)         # (connexion, lecture) en secondes
+EXCHANGERATE_URL = "https://api.exchangerate-api.com/v4/latest/{base}"
+
+
+def _make_session(pool_size=4, retries=2):
+    """Session requests avec pool de connexions et réessais sur erreurs serveur"""
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    session = requests.Session()
+    retry = Retry(total=retries, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504))
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class ExchangeRateApiSource:
+    """Source principale : exchangerate-api.com, via une session réutilisée"""
+
+    def __init__(self, session=None, timeout=TIMEOUT):
+        self._session = session
+        self.timeout = timeout
+
+    def __call__(self, base):
+        if self._session is None:
+            self._session = _make_session()
+        response = self._session.get(EXCHANGERATE_URL.format(base=base), timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()["rates"]
+
+
+def forex_python_source(base):
+    """Source de secours : forex_python (import à la demande)"""
+    from forex_python.converter import CurrencyRates
+
+    return CurrencyRates().get_rates(base)
+
+
+class FallbackSource:
+    """Interroge les sources dans l'ordre et renvoie la première réponse"""
+
+    def __init__(self, *sources):
+        self.sources = sources
+
+    def __call__(self, base):
+        errors = []
+        for source in self.sources:
+            try:
+                return source(base)
+            except Exception as exc:
+                errors.append(f"{getattr(source, '__name__', type(source).__name__)}: {exc}")
+        raise RuntimeError(f"Aucune source de taux disponible pour {base} ({'; '.join(errors)})")
+
+
+class StaticRateSource:
+    """Source locale à taux fixes {base: {devise: taux}}, pour les tests hors ligne"""
+
+    def __init__(self, rates):
+        self.rates = rates
+        self.calls = 0
+
+    def __call__(self, base):
+        self.calls += 1
+        return dict(self.rates[base])
+
+
+class FxRateProvider:
+    """Fournit les taux de change avec cache TTL et stale-while-revalidate.
+
+    Un taux frais (âge < ttl) est servi depuis le cache. Un taux périmé mais
+    d'âge inférieur à max_stale est servi immédiatement pendant qu'un thread
+    le rafraîchit (un seul rafraîchissement en cours par devise). Au-delà,
+    ou au premier appel, la source est interrogée de façon bloquante.
+    `source` est un appelable base -> {devise: taux}.
+    """
+
+    def __init__(self, source=None, ttl=DEFAULT_TTL, max_stale=MAX_STALE,
+                 clock=time.monotonic, background=True):
+        self.source = source or FallbackSource(ExchangeRateApiSource(), forex_python_source)
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.clock = clock
+        self.background = background
+        self._cache = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "stale_hits": 0, "fetches": 0, "errors": 0}
+
+    def _fetch(self, base):
+        try:
+            rates = self.source(base)
+        except Exception:
+            with self._lock:
+                self._stats["errors"] += 1
+            raise
+        with self._lock:
+            self._cache[base] = (self.clock(), rates)
+            self._stats["fetches"] += 1
+        return rates
+
+    def _refresh_in_background(self, base):
+        def run():
+            try:
+                self._fetch(base)
+            except Exception:
+                pass  # le taux périmé reste servi, nouvel essai au prochain appel
+            finally:
+                with self._lock:
+                    self._refreshing.discard(base)
+
+        with self._lock:
+            if base in self._refreshing:
+                return
+            self._refreshing.add(base)
+        if self.background:
+            threading.Thread(target=run, daemon=True).start()
+        else:
+            run()
+
+    def get_rates(self, base):
+        """Tous les taux depuis `base`"""
+        with self._lock:
+            entry = self._cache.get(base)
+        if entry is not None:
+            age = self.clock() - entry[0]
+            if age < self.ttl:
+                with self._lock:
+                    self._stats["hits"] += 1
+                return entry[1]
+            if age < self.max_stale:
+                with self._lock:
+                    self._stats["stale_hits"] += 1
+                self._refresh_in_background(base)
+                return entry[1]
+        return self._fetch(base)
+
+    def get_rate(self, base, target):
+        """Taux base -> target"""
+        if base == target:
+            return 1.0
+        rates = self.get_rates(base)
+        if target not in rates:
+            raise ValueError(f"Devise inconnue : {target}")
+        return float(rates[target])
+
+    def convert(self, amount, base, target):
+        return amount * self.get_rate(base, target)
+
+    def convert_series(self, series, base, target):
+        """Convertit une série ou un tableau entier avec un seul taux"""
+        return series * self.get_rate(base, target)
+
+    def convert_frame(self, df, base, target, columns=("Open", "High", "Low", "Close")):
+        """Copie d'un DataFrame OHLCV avec les colonnes de prix converties"""
+        rate = self.get_rate(base, target)
+        out = df.copy()
+        for column in columns:
+            if column in out.columns:
+                out[column] = out[column] * rate
+        return out
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def get_stats(self):
+        with self._lock:
+            return {**self._stats, "devises_en_cache": len(self._cache)}
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_provider():
+    """Instance partagée par le processus (survit aux reruns Streamlit)"""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = FxRateProvider()
+        return _default
+
+
+#=========================conversion des historiques avec les taux quotidiens stockés
+
+BASE_CURRENCY = "USD"
+PRICE_COLUMNS = ("Open", "High", "Low", "Close")
+
+_converted = {}
+_converted_lock = threading.Lock()
+
+
+def fx_symbol(currency):
+    """Nom de l'historique de taux stocké par data_fetcher (ex. FX_EUR)"""
+    return f"{FX_PREFIX}{currency}"
+
+
+def fx_version(currency):
+    """Version de l'historique de taux, pour les clés de cache (None en USD ou sans historique)"""
+    if currency == BASE_CURRENCY:
+        return None
+    try:
+        return data_version(fx_symbol(currency))
+    except FileNotFoundError:
+        return None
+
+
+def convert_prices(df, fx, columns=PRICE_COLUMNS):
+    """Convertit un historique OHLCV date par date avec une série de taux.
+
+    Jointure as-of vectorisée (pd.merge_asof, direction « backward ») : chaque
+    barre prend le dernier taux connu à sa date, ce qui reporte le taux du
+    vendredi sur les week-ends des cryptos. Les barres antérieures au premier
+    taux prennent ce premier taux. Le volume n'est pas converti.
+    """
+    fx = fx.dropna().sort_index()
+    if fx.empty:
+        raise ValueError("Historique de taux vide")
+    left = pd.DataFrame({"date": df.index.values.astype("datetime64[ns]")})
+    right = pd.DataFrame({"date": fx.index.values.astype("datetime64[ns]"), "rate": fx.to_numpy(dtype="float64")})
+    rate = pd.merge_asof(left, right, on="date", direction="backward")["rate"]
+    rate = rate.fillna(right["rate"].iloc[0]).to_numpy()
+
+    out = df.copy()
+    for column in columns:
+        if column in out.columns:
+            out[column] = out[column].to_numpy(dtype="float64") * rate
+    return out
+
+
+def converted_prices(symbol, currency=BASE_CURRENCY):
+    """Prix d'un actif dans `currency`, mis en cache par (actif, devise).
+
+    Le cache est invalidé dès que les prix ou l'historique de taux changent
+    sur disque (price_store.data_version). En USD, les prix sont renvoyés tels
+    quels. Sans historique FX_<devise> stocké, le taux courant du fournisseur
+    par défaut est appliqué à toute la série.
+    """
+    if currency == BASE_CURRENCY:
+        return load_prices(symbol)
+
+    versions = (data_version(symbol), fx_version(currency))
+    if versions[1] is None:
+        print(f"⚠️ Pas d'historique {fx_symbol(currency)} : conversion au taux courant.")
+        return default_provider().convert_frame(load_prices(symbol), BASE_CURRENCY, currency)
+
+    key = (symbol, currency)
+    with _converted_lock:
+        entry = _converted.get(key)
+    if entry is not None and entry[0] == versions:
+        return entry[1].copy(deep=False)
+
+    df = convert_prices(load_prices(symbol), load_prices(fx_symbol(currency))["Close"])
+    with _converted_lock:
+        _converted[key] = (versions, df)
+    return df.copy(deep=False)
@@ -0,0 +1,305 @@
+"""Estimation et prévision GARCH(1,1) à moyenne constante, sans dépendance à arch.
+
+Usage : python garch.py [SYMBOLE ...] [--workers 4] [--horizon 10] [--cold]
+Les paramètres de la veille sont relus dans results/garch_params.json et
+servent de point de départ : un réajustement quotidien ne fait que quelques
+itérations par actif.
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from metrics import TRADING_DAYS
+from price_store import data_version, list_symbols, load_prices
+# scipy est importé dans les fonctions de calcul : ce module est chargé par
+# stats_analysis au démarrage de l'interface, avant tout ajustement.
+
+SCALE = 100.0               # rendements en %, comme arch_model : optimisation mieux conditionnée
+BACKCAST_SPAN = 75
+BACKCAST_DECAY = 0.94
+MAX_PERSISTENCE = 1 - 1e-6
+PARAMS_PATH = os.path.join("results", "garch_params.json")
+PARAM_NAMES = ("mu", "omega", "alpha", "beta")
+LOG_2PI = np.log(2 * np.pi)
+
+
+def log_returns(close):
+    """Log-rendements en % d'une série de clôtures (NaN retirés)"""
+    close = np.asarray(close, dtype=np.float64)
+    returns = np.diff(np.log(close)) * SCALE
+    return returns[~np.isnan(returns)]
+
+
+def backcast(e2):
+    """Variance initiale : moyenne pondérée exponentiellement des premiers carrés (comme arch)"""
+    weights = BACKCAST_DECAY ** np.arange(min(BACKCAST_SPAN, len(e2)))
+    return float(weights @ e2[:len(weights)] / weights.sum())
+
+
+class _Likelihood:
+    """Log-vraisemblance gaussienne et son gradient pour des résidus fixés.
+
+    La récurrence sigma2[t] = omega + alpha * e2[t-1] + beta * sigma2[t-1]
+    est un filtre IIR d'ordre 1 : un seul appel à lfilter, sans boucle
+    Python. Les dérivées suivent la même récurrence et sont filtrées en un
+    second appel sur une matrice (3, n). Les tampons sont alloués une fois
+    par ajustement et réutilisés à chaque évaluation de l'optimiseur.
+    """
+
+    def __init__(self, e):
+        self.e2 = e * e
+        self.n = len(e)
+        self.sigma2_0 = backcast(self.e2)
+        self.drive = np.empty(self.n)
+        self.grad_drive = np.zeros((3, self.n))
+        self.grad_drive[0, 1:] = 1.0
+        self.grad_drive[1, 1:] = self.e2[:-1]
+        self.weights = np.empty(self.n)
+        self._cache = (None, None)
+
+    def variance(self, omega, alpha, beta):
+        from scipy.signal import lfilter
+
+        drive = self.drive
+        drive[0] = self.sigma2_0
+        np.multiply(self.e2[:-1], alpha, out=drive[1:])
+        drive[1:] += omega
+        return lfilter([1.0], [1.0, -beta], drive)
+
+    def _evaluate(self, theta):
+        key, value = self._cache
+        if key is not None and np.array_equal(key, theta):
+            return value
+        from scipy.signal import lfilter
+
+        omega, alpha, beta = theta
+        sigma2 = self.variance(omega, alpha, beta)
+        if sigma2.min() <= 0:
+            value = (np.inf, np.zeros(3))
+        else:
+            nll = 0.5 * (self.n * LOG_2PI + np.log(sigma2).sum() + (self.e2 / sigma2).sum())
+            self.grad_drive[2, 1:] = sigma2[:-1]
+            dsigma2 = lfilter([1.0], [1.0, -beta], self.grad_drive, axis=1)
+            np.divide(sigma2 - self.e2, sigma2 * sigma2, out=self.weights)
+            value = (nll, 0.5 * (dsigma2 @ self.weights))
+        self._cache = (theta.copy(), value)
+        return value
+
+    def objective(self, theta):
+        return self._evaluate(theta)[0]
+
+    def gradient(self, theta):
+        return self._evaluate(theta)[1]
+
+
+def _starting_values(variance, previous):
+    if previous is not None:
+        omega, alpha, beta = previous["omega"], previous["alpha"], previous["beta"]
+        if omega > 0 and alpha >= 0 and beta >= 0 and alpha + beta < MAX_PERSISTENCE:
+            return np.array([omega, alpha, beta])
+    return np.array([variance * 0.05, 0.05, 0.90])
+
+
+def fit(returns, previous=None):
+    """Ajuste un GARCH(1,1) gaussien à moyenne constante sur des log-rendements en %.
+
+    `previous` (résultat d'un ajustement antérieur) sert de point de départ :
+    après l'ajout de quelques barres l'optimum bouge peu et SLSQP converge
+    en quelques itérations. La moyenne est estimée par la moyenne empirique.
+
+    Renvoie un dictionnaire : mu, omega, alpha, beta, persistence,
+    loglik, nobs, iterations, converged, ainsi que l'état final (last_e2,
+    last_sigma2) nécessaire aux prévisions.
+    """
+    from scipy.optimize import minimize
+
+    returns = np.asarray(returns, dtype=np.float64)
+    if len(returns) < 100:
+        raise ValueError("Au moins 100 rendements sont nécessaires pour ajuster un GARCH(1,1)")
+    mu = float(returns.mean())
+    e = returns - mu
+    variance = float(e.var())
+    likelihood = _Likelihood(e)
+
+    result = minimize(
+        likelihood.objective, _starting_values(variance, previous), jac=likelihood.gradient, method="SLSQP",
+        bounds=[(1e-8 * variance, 10 * variance), (0.0, 1.0), (0.0, 1.0)],
+        constraints=[{"type": "ineq", "fun": lambda t: MAX_PERSISTENCE - t[1] - t[2],
+                      "jac": lambda t: np.array([0.0, -1.0, -1.0])}],
+        options={"ftol": 1e-9, "maxiter": 200},
+    )
+    omega, alpha, beta = (float(v) for v in result.x)
+    # SLSQP peut dépasser la contrainte de quelques ulp : on la rétablit
+    beta = min(beta, MAX_PERSISTENCE - alpha)
+    sigma2 = likelihood.variance(omega, alpha, beta)
+    return {
+        "mu": mu, "omega": omega, "alpha": alpha, "beta": beta,
+        "persistence": alpha + beta,
+        "loglik": -float(result.fun),
+        "nobs": len(returns),
+        "iterations": int(result.nit),
+        "converged": bool(result.success),
+        "last_e2": float(e[-1] ** 2),
+        "last_sigma2": float(sigma2[-1]),
+    }
+
+
+def conditional_volatility(returns, params):
+    """Volatilité conditionnelle (en %, journalière) de chaque barre pour des paramètres donnés"""
+    e = np.asarray(returns, dtype=np.float64) - params["mu"]
+    return np.sqrt(_Likelihood(e).variance(params["omega"], params["alpha"], params["beta"]))
+
+
+def forecast_variance(params, horizon=10):
+    """Variances journalières prévues pour t+1 … t+horizon (en %²).
+
+    sigma2[t+h] = sigma2_lt + (alpha + beta)^(h-1) * (sigma2[t+1] - sigma2_lt),
+    sigma2_lt = omega / (1 - alpha - beta) étant la variance de long terme.
+    """
+    omega, alpha, beta = params["omega"], params["alpha"], params["beta"]
+    persistence = alpha + beta
+    next_var = omega + alpha * params["last_e2"] + beta * params["last_sigma2"]
+    if persistence >= 1:
+        return next_var + omega * np.arange(horizon)
+    long_run = omega / (1 - persistence)
+    return long_run + persistence ** np.arange(horizon) * (next_var - long_run)
+
+
+def value_at_risk(params, confidence_level=0.95, horizon=1):
+    """VaR paramétrique conditionnelle sur `horizon` jours, même convention que metrics.value_at_risk.
+
+    Quantile (1 - niveau) du rendement simple cumulé, sous hypothèse
+    normale avec la variance cumulée prévue par le GARCH.
+    """
+    from scipy.stats import norm
+
+    variance = forecast_variance(params, horizon).sum()
+    quantile = params["mu"] * horizon + norm.ppf(1 - confidence_level) * np.sqrt(variance)
+    return float(np.expm1(quantile / SCALE))
+
+
+#=========================ajustement par actif et pour tout l'univers
+
+def load_params(path=PARAMS_PATH):
+    """Derniers paramètres ajustés par actif ({} si aucun)"""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_params(fits, path=PARAMS_PATH):
+    """Fusionne les nouveaux ajustements dans le fichier de paramètres (écriture atomique)"""
+    stored = load_params(path)
+    stored.update(fits)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp-{os.getpid()}"
+    with open(tmp, "w") as f:
+        json.dump(stored, f, indent=2)
+    os.replace(tmp, path)
+
+
+_fits = {}
+
+
+def fit_symbol(symbol, previous=None):
+    """Ajustement d'un actif, mémorisé par version des données.
+
+    Un ajustement (en mémoire ou passé en `previous`, ex. relu dans
+    PARAMS_PATH) fait sur la version actuelle des données est renvoyé tel
+    quel. Quand de nouvelles barres arrivent, il sert de point de départ.
+    """
+    version = list(data_version(symbol))
+    cached = _fits.get(symbol)
+    for fitted in (cached, previous):
+        if fitted is not None and fitted.get("data_version") == version:
+            _fits[symbol] = fitted
+            return fitted
+    returns = log_returns(load_prices(symbol)["Close"])
+    result = fit(returns, previous or cached)
+    result["data_version"] = version
+    _fits[symbol] = result
+    return result
+
+
+def _fit_worker(symbol, previous):
+    try:
+        return symbol, fit_symbol(symbol, previous), None
+    except Exception as exc:
+        return symbol, None, f"{type(exc).__name__}: {exc}"
+
+
+def fit_universe(symbols=None, max_workers=None, warm_start=True, horizon=10, confidence_level=0.95):
+    """Ajuste tous les actifs dans un pool de processus, à partir des paramètres stockés.
+
+    Les actifs dont les paramètres stockés portent la version actuelle des
+    données ne sont pas réajustés. Renvoie (DataFrame indexé par actif :
+    paramètres, volatilités annualisées courante et de long terme, VaR à
+    1 jour et à `horizon` jours ; {actif: erreur}). Les nouveaux paramètres
+    sont enregistrés pour le prochain réajustement.
+    """
+    symbols = list(symbols) if symbols else list_symbols()
+    stored = load_params() if warm_start else {}
+    fits, errors, stale = {}, {}, []
+    for symbol in symbols:
+        try:
+            version = list(data_version(symbol))
+        except FileNotFoundError as exc:
+            errors[symbol] = f"{type(exc).__name__}: {exc}"
+            continue
+        if symbol in stored and stored[symbol].get("data_version") == version:
+            fits[symbol] = stored[symbol]
+        else:
+            stale.append(symbol)
+
+    if stale:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(_fit_worker, stale, [stored.get(symbol) for symbol in stale]))
+        refitted = {symbol: result for symbol, result, error in results if error is None}
+        errors.update({symbol: error for symbol, _, error in results if error is not None})
+        if refitted:
+            save_params(refitted)
+        fits.update(refitted)
+    fits = {symbol: fits[symbol] for symbol in symbols if symbol in fits}
+
+    rows = {}
+    for symbol, params in fits.items():
+        rows[symbol] = {
+            **{name: params[name] for name in PARAM_NAMES},
+            "persistence": params["persistence"],
+            "volatility": np.sqrt(forecast_variance(params, 1)[0] * TRADING_DAYS) / SCALE,
+            "long_run_volatility": np.sqrt(params["omega"] / (1 - params["persistence"]) * TRADING_DAYS) / SCALE,
+            "var_1d": value_at_risk(params, confidence_level, 1),
+            f"var_{horizon}d": value_at_risk(params, confidence_level, horizon),
+            "iterations": params["iterations"],
+            "converged": params["converged"],
+        }
+    return pd.DataFrame.from_dict(rows, orient="index"), errors
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("symbols", nargs="*")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--horizon", type=int, default=10)
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument("--cold", action="store_true", help="ignore les paramètres stockés")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    table, errors = fit_universe(args.symbols, args.workers, not args.cold, args.horizon, args.confidence)
+    print(f"✅ {len(table)} actifs ajustés en {time.perf_counter() - start:.2f} s → {PARAMS_PATH}")
+    if not table.empty:
+        print(table.round(4).to_string())
+    for symbol, error in errors.items():
+        print(f"❌ {symbol} : {error}")
+
+
+if __name__ == "__main__":
+    main()
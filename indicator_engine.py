@@ -0,0 +1,175 @@
+import numpy as np
+import pandas as pd
+from rolling_stats import CumulativeSums
+
+# Paramètres par défaut de chaque indicateur
+DEFAULTS = {
+    "RETURN": {},
+    "SMA": {"window": 20},
+    "EMA": {"window": 20},
+    "STD": {"window": 20},
+    "RSI": {"window": 14},
+    "MACD": {"fast": 12, "slow": 26, "signal": 9},
+    "BOLLINGER": {"window": 20, "num_std": 2},
+    "VOLATILITY": {"window": 30, "periods": 252},
+    "DEVIATION": {"window": 20},
+}
+
+
+def _normalize_spec(spec):
+    """Accepte "RSI" ou ("RSI", {"window": 14}) et renvoie (nom, paramètres)"""
+    if isinstance(spec, str):
+        name, params = spec, {}
+    else:
+        name, params = spec
+    name = name.upper()
+    if name not in DEFAULTS:
+        raise ValueError(f"Indicateur inconnu : {name}")
+    return name, {**DEFAULTS[name], **params}
+
+
+#=========================noyaux NumPy (colonne par colonne, axe 0 = temps)
+
+def _diff(x):
+    out = np.full_like(x, np.nan)
+    out[1:] = x[1:] - x[:-1]
+    return out
+
+
+def _pct_change(x):
+    out = np.full_like(x, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[1:] = x[1:] / x[:-1] - 1
+    return out
+
+
+def ewm_mean(x, span):
+    """Moyenne exponentielle (adjust=False), démarrée à la première valeur de chaque colonne.
+
+    Une valeur manquante conserve l'état précédent (ignore_na=True). Le
+    lissage tourne dans le noyau compilé de pandas, colonne par colonne.
+    """
+    return pd.DataFrame(x).ewm(span=span, adjust=False, ignore_na=True).mean().to_numpy()
+
+
+class _Intermediates:
+    """Calculs partagés entre indicateurs (variations, fenêtres glissantes, EMA)"""
+
+    def __init__(self, close):
+        self.close = close
+        self._cache = {}
+
+    def sums(self, key, values):
+        # Sommes cumulées partagées par toutes les fenêtres d'une même série
+        return self._get(("sums", key), lambda: CumulativeSums(values()))
+
+    def _get(self, key, compute):
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    def delta(self):
+        return self._get("delta", lambda: _diff(self.close))
+
+    def returns(self):
+        return self._get("returns", lambda: _pct_change(self.close))
+
+    def sma(self, window):
+        return self._get(("sma", window), lambda: self.sums("close", lambda: self.close).mean(window))
+
+    def std(self, window):
+        return self._get(("std", window), lambda: self.sums("close", lambda: self.close).std(window))
+
+    def ema(self, span):
+        return self._get(("ema", span), lambda: ewm_mean(self.close, span))
+
+    def rsi_averages(self, window):
+        def compute():
+            delta = self.delta()
+            gain = np.where(delta > 0, delta, 0.0)
+            loss = np.where(delta < 0, -delta, 0.0)
+            return (self.sums("gain", lambda: gain).mean(window),
+                    self.sums("loss", lambda: loss).mean(window))
+        return self._get(("rsi", window), compute)
+
+
+def compute_indicators_wide(closes, specs):
+    """Calcule les indicateurs sur une matrice de clôtures (dates × actifs).
+
+    `closes` est un tableau 2-D (une colonne par actif, NaN avant la cotation).
+    Les actifs doivent partager le même calendrier : une fenêtre glissante
+    contenant des NaN vaut NaN, comme avec pandas.
+    Chaque indicateur est calculé pour toutes les colonnes à la fois et le
+    résultat est un dictionnaire {colonne: tableau 2-D aligné sur `closes`}.
+    """
+    closes = np.asarray(closes, dtype=np.float64)
+    if closes.ndim == 1:
+        closes = closes[:, None]
+    inter = _Intermediates(closes)
+    out = {}
+
+    for spec in specs:
+        name, p = _normalize_spec(spec)
+        default = p == DEFAULTS[name]
+
+        if name == "RETURN":
+            out["Return"] = inter.returns()
+
+        elif name == "SMA":
+            out[f"SMA_{p['window']}"] = inter.sma(p["window"])
+
+        elif name == "EMA":
+            out[f"EMA_{p['window']}"] = inter.ema(p["window"])
+
+        elif name == "STD":
+            out[f"STD_{p['window']}"] = inter.std(p["window"])
+
+        elif name == "RSI":
+            gain, loss = inter.rsi_averages(p["window"])
+            with np.errstate(divide="ignore", invalid="ignore"):
+                rs = gain / loss
+            out["RSI" if default else f"RSI_{p['window']}"] = 100 - (100 / (1 + rs))
+
+        elif name == "MACD":
+            suffix = "" if default else f"_{p['fast']}_{p['slow']}_{p['signal']}"
+            fast, slow = inter.ema(p["fast"]), inter.ema(p["slow"])
+            macd = fast - slow
+            out[f"EMA_{p['fast']}"] = fast
+            out[f"EMA_{p['slow']}"] = slow
+            out[f"MACD{suffix}"] = macd
+            out[f"MACD_Signal{suffix}"] = ewm_mean(macd, p["signal"])
+
+        elif name == "BOLLINGER":
+            sma, std = inter.sma(p["window"]), inter.std(p["window"])
+            suffix = "" if default else f"_{p['window']}"
+            out[f"SMA_{p['window']}"] = sma
+            out[f"STD_{p['window']}"] = std
+            out[f"Upper_Band{suffix}"] = sma + std * p["num_std"]
+            out[f"Lower_Band{suffix}"] = sma - std * p["num_std"]
+
+        elif name == "VOLATILITY":
+            returns = inter.returns()
+            out["Return"] = returns
+            column = "Volatility" if default else f"Volatility_{p['window']}"
+            out[column] = inter.sums("returns", inter.returns).std(p["window"]) * np.sqrt(p["periods"])
+
+        elif name == "DEVIATION":
+            sma = inter.sma(p["window"])
+            out[f"SMA_{p['window']}"] = sma
+            out["Diff" if default else f"Diff_{p['window']}"] = (closes - sma) / sma * 100
+
+    return out
+
+
+def compute_indicators(df, specs):
+    """Calcule plusieurs indicateurs techniques en un seul passage.
+
+    `specs` est une liste de noms ("RSI") ou de couples (nom, paramètres).
+    Les calculs intermédiaires (variations, moyennes mobiles, EMA) sont
+    partagés entre indicateurs. Renvoie un nouveau DataFrame contenant les
+    colonnes d'origine et celles des indicateurs.
+    """
+    out = df.copy(deep=False)
+    for column, values in compute_indicators_wide(df["Close"].to_numpy(), specs).items():
+        out[column] = values[:, 0]
+    return out
@@ -1,16 +1,14 @@
-import pandas as pd
+from price_store import load_prices
+from indicator_engine import compute_indicators
 import plotly.graph_objects as go
 import streamlit as st
+from figure_cache import cached_figure
 
-def plot_bollinger_bands(symbol):
-    """Affiche les Bandes de Bollinger pour un actif"""
-    df = pd.read_csv(f"data/{symbol}.csv", index_col=0, parse_dates=True)
-
+@cached_figure()
+def figure_bollinger_bands(symbol):
+    """Construit le graphique des Bandes de Bollinger pour un actif"""
     # Calcul des bandes de Bollinger
-    df["SMA_20"] = df["Close"].rolling(window=20).mean()
-    df["STD_20"] = df["Close"].rolling(window=20).std()
-    df["Upper_Band"] = df["SMA_20"] + (df["STD_20"] * 2)
-    df["Lower_Band"] = df["SMA_20"] - (df["STD_20"] * 2)
+    df = compute_indicators(load_prices(symbol), [("BOLLINGER", {"window": 20, "num_std": 2})])
 
     # Création du graphique
     fig = go.Figure()
@@ -19,40 +17,35 @@ def plot_bollinger_bands(symbol):
     fig.add_trace(go.Scatter(x=df.index, y=df["Lower_Band"], mode='lines', name="Bande Inférieure", line=dict(color="green")))
 
     fig.update_layout(title=f"Bandes de Bollinger pour {symbol}", xaxis_title="Date", yaxis_title="Prix")
+    return fig
 
-    # Affichage avec Streamlit
-    st.plotly_chart(fig)
-
-def plot_macd(symbol):
-    """Affiche le MACD pour un actif"""
-    df = pd.read_csv(f"data/{symbol}.csv", index_col=0, parse_dates=True)
+def plot_bollinger_bands(symbol):
+    """Affiche les Bandes de Bollinger pour un actif"""
+    st.plotly_chart(figure_bollinger_bands(symbol))
 
+@cached_figure()
+def figure_macd(symbol):
+    """Construit le graphique du MACD pour un actif"""
     # Calcul du MACD
-    df["EMA_12"] = df["Close"].ewm(span=12, adjust=False).mean()
-    df["EMA_26"] = df["Close"].ewm(span=26, adjust=False).mean()
-    df["MACD"] = df["EMA_12"] - df["EMA_26"]
-    df["Signal_Line"] = df["MACD"].ewm(span=9, adjust=False).mean()
+    df = compute_indicators(load_prices(symbol), ["MACD"])
 
     # Création du graphique
     fig = go.Figure()
     fig.add_trace(go.Scatter(x=df.index, y=df["MACD"], mode='lines', name="MACD"))
-    fig.add_trace(go.Scatter(x=df.index, y=df["Signal_Line"], mode='lines', name="Ligne de Signal", line=dict(color="red")))
+    fig.add_trace(go.Scatter(x=df.index, y=df["MACD_Signal"], mode='lines', name="Ligne de Signal", line=dict(color="red")))
 
     fig.update_layout(title=f"MACD pour {symbol}", xaxis_title="Date", yaxis_title="Valeur MACD")
+    return fig
 
-    # Affichage avec Streamlit
-    st.plotly_chart(fig)
-
-def plot_rsi(symbol):
-    """Affiche le RSI de l'actif avec Streamlit"""
-    df = pd.read_csv(f"data/{symbol}.csv", index_col=0, parse_dates=True)
+def plot_macd(symbol):
+    """Affiche le MACD pour un actif"""
+    st.plotly_chart(figure_macd(symbol))
 
+@cached_figure()
+def figure_rsi(symbol):
+    """Construit le graphique du RSI d'un actif"""
     # Calcul du RSI
-    delta = df["Close"].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-    rs = gain / loss
-    df["RSI"] = 100 - (100 / (1 + rs))
+    df = compute_indicators(load_prices(symbol), ["RSI"])
 
     # Création du graphique
     fig = go.Figure()
@@ -61,9 +54,11 @@ def plot_rsi(symbol):
     fig.add_trace(go.Scatter(x=df.index, y=[30] * len(df), mode='lines', name="Survente (30)", line=dict(color="green", dash="dash")))
 
     fig.update_layout(title=f"RSI pour {symbol}", xaxis_title="Date", yaxis_title="RSI")
+    return fig
 
-    # Affichage avec Streamlit
-    st.plotly_chart(fig)
+def plot_rsi(symbol):
+    """Affiche le RSI de l'actif avec Streamlit"""
+    st.plotly_chart(figure_rsi(symbol))
     
     
     
@@ -1,42 +1,20 @@
-from re import A
-import requests
 import streamlit as st
-import numpy as np
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-import plotly.subplots as sp
-from data_fetcher import fetch_data
-from alerts import plot_trends  # Correction ici !
-from stats_analysis import plot_daily_returns, plot_return_distribution, plot_volatility, plot_drawdown, compute_var, plot_annual_volatility, plot_annual_returns
-from correlation import plot_correlation_matrix
-from predictor import plot_forecast
+from stats_analysis import plot_daily_returns, plot_return_distribution, plot_volatility, plot_drawdown, compute_var, plot_annual_volatility, plot_annual_returns, plot_monte_carlo, plot_garch_volatility, VAR_METHODS
 from visualization import plot_price_trends, plot_comparison, plot_candlestick_2, plot_comparison_percentage, plot_candlestick
 from indicators import plot_bollinger_bands, plot_macd, plot_rsi
 from analysis import compute_ratios
-from forex_python.converter import CurrencyRates
+from fx_rates import default_provider
 
 
 
-# Fonction de conversion avec gestion des erreurs et alternative API
+# Fonction de conversion : taux mis en cache et rafraîchis en arrière-plan (voir fx_rates)
 def convertir_devise(montant, devise_source, devise_cible):
     try:
-        # Tentative d'utilisation de forex_python
-        c = CurrencyRates()
-        taux = c.get_rate(devise_source, devise_cible)
-        return montant * taux
+        return default_provider().convert(montant, devise_source, devise_cible)
     except Exception as e:
-        # Si forex_python échoue, utiliser une API alternative
-      #st.warning("Erreur avec l'API Forex Python. Tentative d'utilisation d'une autre API.")
-        try:
-            url = f"https://api.exchangerate-api.com/v4/latest/{devise_source}"
-            response = requests.get(url)
-            data = response.json()
-            taux = data['rates'].get(devise_cible, 1)
-            return montant * taux
-        except Exception as e:
-            st.error(f"Erreur API : {e}")
-            return montant  # Retourner le montant initial si tout échoue
+        st.error(f"Erreur API : {e}")
+        return montant  # Retourner le montant initial si tout échoue
 
  
 # 🌟 Interface Streamlit
@@ -88,9 +66,8 @@ tab_overview, tab_details, tab_comparison, tab_risques = st.tabs(["Overview", "D
 with tab_overview:  
     # 📈 Graphique en Chandeliers
     st.subheader("📈 Evolution des prix des actifs")
-    plot_candlestick(actif)
     # Générer le graphique
-    fig = plot_candlestick(actif)
+    fig = plot_candlestick(actif, devise)
 
     # Affichage dans Streamlit
     st.plotly_chart(fig, use_container_width=True)
@@ -125,7 +102,7 @@ with tab_details:
     filters = st.multiselect("Appliquer un indicateur technique :", ["RSI", "MACD", "SMA", "EMA"])
     # 📊 Analyse des Indicateurs
     st.subheader("📈 Evolution des prix des actifs")
-    plot_candlestick_2(actif, filters)  
+    plot_candlestick_2(actif, filters, devise)  
      
     # 🛑 RSI (Indicateur Technique)
     st.subheader("🛑 Indicateur Technique : RSI")
@@ -172,9 +149,18 @@ with tab_risques:
     "<h1 style='text-align: center;'>📊 Analyse des Risques Financiers</h1>", 
     unsafe_allow_html=True)
     # 📉 VaR
-    compute_var(actif)
+    methode_var = st.selectbox("Méthode de calcul de la VaR", list(VAR_METHODS), format_func=VAR_METHODS.get)
+    compute_var(actif, method=methode_var)
+
+    # 📊 Volatilité conditionnelle GARCH
+    plot_garch_volatility(actif)
 
     # 📉 Drawdown
     plot_drawdown(actif)
+
+    # 🎲 Simulation Monte Carlo (trajectoires corrélées des trois actifs)
+    methode = st.radio("Méthode de simulation", ["gbm", "bootstrap"], horizontal=True,
+                       format_func=lambda m: "Brownien géométrique" if m == "gbm" else "Bootstrap historique")
+    plot_monte_carlo(actif, methode)
     
 
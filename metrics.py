@@ -0,0 +1,81 @@
+import numpy as np
+
+#=========================couche de calcul pure : tableaux en entrée, résultats en sortie
+# Aucun import de streamlit, plotly ni lecture de fichier : ces fonctions
+# peuvent être appelées en lot, mises en cache ou exécutées dans un worker.
+
+TRADING_DAYS = 252
+RISK_FREE_RATE = 0.02
+
+
+def daily_returns(close):
+    """Rendements simples jour à jour (le premier vaut NaN, comme pct_change)"""
+    close = np.asarray(close, dtype=np.float64)
+    out = np.full(close.shape, np.nan)
+    out[1:] = close[1:] / close[:-1] - 1
+    return out
+
+
+def _valid(returns):
+    returns = np.asarray(returns, dtype=np.float64)
+    return returns[~np.isnan(returns)]
+
+
+def value_at_risk(returns, confidence_level=0.95):
+    """VaR historique : quantile (1 - niveau) des rendements, NaN sans données"""
+    returns = _valid(returns)
+    if returns.size == 0:
+        return np.nan
+    return float(np.percentile(returns, (1 - confidence_level) * 100))
+
+
+def drawdown(close):
+    """Drawdown relatif au plus haut historique des rendements cumulés"""
+    cumulative = np.cumprod(1 + np.nan_to_num(daily_returns(close)))
+    peak = np.maximum.accumulate(cumulative)
+    return (cumulative - peak) / peak
+
+
+def max_drawdown(close):
+    """Perte maximale observée depuis un sommet"""
+    dd = drawdown(close)
+    return float(dd.min()) if dd.size else np.nan
+
+
+def ratios(returns):
+    """Sharpe (sans taux sans risque), volatilité et rendement annuels composés"""
+    returns = _valid(returns)
+    mean, std = returns.mean(), returns.std()
+    return {
+        "sharpe_ratio": mean / std * np.sqrt(TRADING_DAYS),
+        "volatility": std * np.sqrt(TRADING_DAYS),
+        "annual_return": (1 + mean) ** TRADING_DAYS - 1,
+    }
+
+
+def financial_metrics(returns, risk_free_rate=RISK_FREE_RATE):
+    """Rendement et volatilité annualisés, ratios de Sharpe et de Sortino"""
+    returns = _valid(returns)
+    annual_return = returns.mean() * TRADING_DAYS
+    annual_volatility = returns.std(ddof=1) * np.sqrt(TRADING_DAYS)
+    negative = returns[returns < 0]
+    downside_volatility = negative.std(ddof=1) * np.sqrt(TRADING_DAYS) if negative.size > 1 else np.nan
+    return {
+        "annual_return": annual_return,
+        "annual_volatility": annual_volatility,
+        "sharpe_ratio": (annual_return - risk_free_rate) / annual_volatility if annual_volatility > 0 else np.nan,
+        "sortino_ratio": (annual_return - risk_free_rate) / downside_volatility if downside_volatility > 0 else np.nan,
+    }
+
+
+def compute_metrics(df, confidence_level=0.95, risk_free_rate=RISK_FREE_RATE):
+    """Toutes les métriques d'un actif à partir de ses prix (colonne Close)"""
+    if "Close" not in df.columns:
+        raise ValueError("La colonne 'Close' est absente des données")
+    close = df["Close"].to_numpy()
+    returns = daily_returns(close)
+    result = financial_metrics(returns, risk_free_rate)
+    result["var"] = value_at_risk(returns, confidence_level)
+    result["max_drawdown"] = max_drawdown(close)
+    result["observations"] = int(np.count_nonzero(~np.isnan(returns)))
+    return result
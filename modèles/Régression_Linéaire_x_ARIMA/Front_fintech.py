@@ -1,15 +1,24 @@
+import os
+import sys
 import streamlit as st
-import yfinance as yf
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import plotly.graph_objects as go
 from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
 from reportlab.pdfgen import canvas
 
-# Fonction pour récupérer les données
-def get_data(symbol, start_date='2019-01-01'):
-    df = yf.download(symbol, start=start_date)
+# Modules partagés du projet (price_store, fx_rates) : à lancer depuis la racine du dépôt, comme main.py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from fx_rates import converted_prices  # noqa: E402
+
+# Prix stockés par data_fetcher, convertis date par date avec les taux FX_<devise> stockés.
+# fx_rates met le résultat en cache par version des données et se partage entre threads.
+def get_converted_data(symbol, currency):
+    df = converted_prices(symbol, currency)
+    if isinstance(df.columns, pd.MultiIndex):  # même format de colonnes quelle que soit la devise
+        df = df.set_axis([col[0] for col in df.columns], axis=1)
     return df
 
 # Calcul du RSI
@@ -47,9 +56,9 @@ st.markdown(
 
 # Sélection de l'actif
 assets = {
-    "Bitcoin": "BTC-USD",
-    "S&P 500": "^GSPC",
-    "Or": "GC=F"
+    "Bitcoin": "BTC",
+    "S&P 500": "SP500",
+    "Or": "GOLD"
 }
 
 col1, col2 = st.columns([2, 1])
@@ -58,8 +67,8 @@ with col1:
 with col2:
     currency_choice = st.selectbox("Sélectionnez la devise :", ["USD", "EUR", "GBP"])
 
-# Récupération des données
-df = get_data(assets[asset_choice])
+# Récupération des données, converties dans la devise choisie
+df = get_converted_data(assets[asset_choice], currency_choice)
 
 # Options de filtres
 filters = st.multiselect("Sélectionnez les filtres à appliquer :", ["RSI", "MACD", "Rendement", "SMA", "EMA"])
@@ -130,9 +139,10 @@ with tab_overview:
 with tab_comparison:
     # Comparaison des trois actifs
     st.write("Comparaison des trois actifs (Bitcoin, S&P 500, Or) sur la même devise :")
-    df_bitcoin = get_data("BTC-USD")
-    df_sp500 = get_data("^GSPC")
-    df_or = get_data("GC=F")
+    # Chargement des trois actifs en parallèle, dans la devise choisie
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        df_bitcoin, df_sp500, df_or = pool.map(lambda symbol: get_converted_data(symbol, currency_choice),
+                                               ["BTC", "SP500", "GOLD"])
 
     # Affichage de la performance comparée des actifs
     fig = go.Figure()
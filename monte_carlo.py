@@ -0,0 +1,172 @@
+"""Simulation Monte Carlo de trajectoires de prix corrélées (GBM ou bootstrap).
+
+Usage : python monte_carlo.py [SYMBOLE ...] [--paths 100000] [--horizon 252] [--method gbm]
+Les trajectoires sont générées par lots (mémoire bornée) ; chaque bloc de
+STREAM_BLOCK trajectoires a son propre flux aléatoire issu de
+SeedSequence.spawn : le résultat ne dépend que de la graine, ni du nombre
+de processus ni de la taille des lots.
+"""
+import argparse
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from price_store import load_close_matrix
+
+METHODS = ("gbm", "bootstrap")
+PERCENTILES = (5, 25, 50, 75, 95)
+CHUNK_SIZE = 10_000
+STREAM_BLOCK = 1_000        # trajectoires par flux aléatoire ; les lots regroupent des blocs entiers
+FAN_POINTS = 64
+N_BINS = 1024
+BIN_SIGMAS = 8.0
+
+
+def log_returns(symbols):
+    """Rendements logarithmiques (dates communes × actifs) et derniers prix"""
+    closes = load_close_matrix(symbols).dropna()
+    if len(closes) < 3:
+        raise ValueError("Pas assez de dates communes entre les actifs")
+    prices = closes.to_numpy(dtype=np.float64)
+    return np.diff(np.log(prices), axis=0), prices[-1]
+
+
+def estimate(returns):
+    """Dérive journalière et facteur de Cholesky de la covariance des log-rendements"""
+    mu = returns.mean(axis=0)
+    cov = np.atleast_2d(np.cov(returns, rowvar=False))
+    return mu, np.linalg.cholesky(cov)
+
+
+def _bin_edges(mu, chol, grid):
+    """Cases de log(S_t / S_0) par (date, actif) : ± BIN_SIGMAS écarts-types à chaque date"""
+    sigma = np.sqrt((chol ** 2).sum(axis=1))
+    t = grid[:, None]
+    span = BIN_SIGMAS * sigma * np.sqrt(t)
+    lo = np.minimum(0.0, mu * t) - span
+    hi = np.maximum(0.0, mu * t) + span
+    return lo, (hi - lo) / N_BINS
+
+
+def time_grid(horizon, fan_points=FAN_POINTS):
+    """Dates simulées (en jours) : pas régulier, l'horizon toujours inclus"""
+    step = max(1, math.ceil(horizon / fan_points))
+    return np.unique(np.append(np.arange(step, horizon, step), horizon))
+
+
+def _simulate_chunk(seeds, sizes, grid, method, mu, chol, returns, lo, width):
+    """Un lot de blocs de trajectoires : histogrammes par (date, actif) et valeurs terminales.
+
+    Chaque bloc (sizes[k] trajectoires) tire ses aléas dans son propre flux
+    seeds[k] ; les blocs sont mis bout à bout, de sorte que le découpage en
+    lots ne change aucune trajectoire.
+
+    En GBM, les incréments entre deux dates de la grille sont tirés
+    directement (somme de d normales = normale de variance d) : la loi aux
+    dates de la grille est exacte sans simuler chaque jour. En bootstrap,
+    chaque jour est tiré puis sommé par intervalle. Les histogrammes sont
+    cumulés en un seul bincount, l'indice de case étant décalé par date et
+    par actif.
+    """
+    rngs = [np.random.default_rng(seed) for seed in seeds]
+    n_assets = len(mu)
+    gaps = np.diff(grid, prepend=0)
+    if method == "gbm":
+        normals = [rng.standard_normal((n, len(grid), n_assets)) for rng, n in zip(rngs, sizes)]
+        shocks = np.concatenate(normals) @ chol.T
+        shocks *= np.sqrt(gaps)[:, None]
+        shocks += gaps[:, None] * mu
+    else:
+        draws = [rng.integers(0, len(returns), size=(n, grid[-1])) for rng, n in zip(rngs, sizes)]
+        days = returns[np.concatenate(draws)]
+        shocks = np.add.reduceat(days, np.append(0, grid[:-1]), axis=1)
+    paths = np.cumsum(shocks, axis=1, out=shocks)
+
+    bins = ((paths - lo) / width).astype(np.int64)
+    np.clip(bins, 0, N_BINS - 1, out=bins)
+    bins += (np.arange(len(grid))[:, None] * n_assets + np.arange(n_assets)) * N_BINS
+    counts = np.bincount(bins.ravel(), minlength=len(grid) * n_assets * N_BINS)
+    return counts.reshape(len(grid), n_assets, N_BINS), paths[:, -1, :].copy()
+
+
+def _percentiles_from_counts(counts, lo, width, percentiles):
+    """Percentiles (interpolation linéaire dans la case) à partir des histogrammes (dates, actifs, cases)"""
+    cumulative = np.cumsum(counts, axis=2)
+    total = cumulative[:, :, -1:]
+    out = np.empty((len(percentiles),) + counts.shape[:2])
+    for i, p in enumerate(percentiles):
+        target = total * p / 100.0
+        idx = np.minimum((cumulative < target).sum(axis=2, keepdims=True), counts.shape[2] - 1)
+        inside = np.take_along_axis(counts, idx, axis=2)
+        before = np.take_along_axis(cumulative, idx, axis=2) - inside
+        frac = np.where(inside > 0, (target - before) / np.maximum(inside, 1), 0.5)
+        out[i] = (lo + (idx + frac)[:, :, 0] * width)
+    return out
+
+
+def simulate(symbols, horizon=252, n_paths=100_000, method="gbm", seed=None, chunk_size=CHUNK_SIZE,
+             max_workers=None, percentiles=PERCENTILES, fan_points=FAN_POINTS):
+    """Simule n_paths trajectoires jointes des actifs sur `horizon` jours.
+
+    method="gbm" : mouvement brownien géométrique corrélé (Cholesky de la
+    covariance historique) ; method="bootstrap" : tirage de jours historiques
+    entiers, ce qui conserve corrélations et queues épaisses. Les lots sont
+    répartis sur `max_workers` processus (1 : tout dans le processus courant).
+
+    Renvoie {"symbols", "s0", "days": dates de l'éventail (0 inclus), "fan":
+    (percentiles, dates, actifs) en prix, "percentiles", "terminal":
+    (n_paths, actifs) prix terminaux exacts}.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Méthode inconnue : {method} (attendu : {', '.join(METHODS)})")
+    symbols = list(symbols)
+    returns, s0 = log_returns(symbols)
+    mu, chol = estimate(returns)
+    grid = time_grid(horizon, fan_points)
+    lo, width = _bin_edges(mu, chol, grid)
+
+    sizes = [min(STREAM_BLOCK, n_paths - start) for start in range(0, n_paths, STREAM_BLOCK)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    per_chunk = max(1, chunk_size // STREAM_BLOCK)
+    args = [(seeds[i:i + per_chunk], sizes[i:i + per_chunk], grid, method, mu, chol, returns, lo, width)
+            for i in range(0, len(sizes), per_chunk)]
+
+    if max_workers == 1 or len(args) == 1:
+        results = [_simulate_chunk(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(_simulate_chunk, *zip(*args)))
+
+    counts = sum(r[0] for r in results)
+    terminal = s0 * np.exp(np.concatenate([r[1] for r in results]))
+    fan = s0 * np.exp(_percentiles_from_counts(counts, lo, width, percentiles))
+    fan = np.concatenate([np.broadcast_to(s0, (len(percentiles), 1, len(symbols))), fan], axis=1)
+    return {"symbols": symbols, "s0": s0, "method": method, "horizon": horizon, "n_paths": n_paths,
+            "days": np.append(0, grid), "percentiles": tuple(percentiles), "fan": fan, "terminal": terminal}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("symbols", nargs="*", default=["BTC", "SP500", "GOLD"])
+    parser.add_argument("--paths", type=int, default=100_000)
+    parser.add_argument("--horizon", type=int, default=252)
+    parser.add_argument("--method", default="gbm", choices=METHODS)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    result = simulate(args.symbols, args.horizon, args.paths, args.method, args.seed, max_workers=args.workers)
+    elapsed = time.perf_counter() - start
+
+    print(f"✅ {args.paths} trajectoires × {args.horizon} jours ({args.method}) en {elapsed:.2f} s")
+    for j, symbol in enumerate(result["symbols"]):
+        terminal = result["terminal"][:, j]
+        fan = ", ".join(f"P{p}={result['fan'][i, -1, j]:.2f}" for i, p in enumerate(result["percentiles"]))
+        print(f"📈 {symbol} : départ {result['s0'][j]:.2f} → {fan} (exact P50={np.median(terminal):.2f})")
+
+
+if __name__ == "__main__":
+    main()
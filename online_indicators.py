@@ -0,0 +1,234 @@
+import json
+import math
+from rolling_stats import RollingWindow
+
+
+def _close(bar):
+    """Accepte un prix ou une barre {"Close": ...}"""
+    if isinstance(bar, (int, float)):
+        return float(bar)
+    return float(bar["Close"])
+
+
+class OnlineIndicator:
+    """Base des indicateurs en flux : update(bar) en O(1), état sérialisable"""
+
+    _fields = ()
+
+    def to_dict(self):
+        state = {}
+        for field in self._fields:
+            value = getattr(self, field)
+            state[field] = value.to_dict() if isinstance(value, RollingWindow) else value
+        return {"type": type(self).__name__, "state": state}
+
+    @classmethod
+    def _restore(cls, state):
+        obj = cls.__new__(cls)
+        for field, value in state.items():
+            if isinstance(value, dict) and "values" in value:
+                value = RollingWindow.from_dict(value)
+            setattr(obj, field, value)
+        return obj
+
+
+class OnlineSMA(OnlineIndicator):
+    """Moyenne mobile simple"""
+
+    _fields = ("rolling",)
+
+    def __init__(self, window=20):
+        self.rolling = RollingWindow(window)
+
+    def update(self, bar):
+        self.rolling.update(_close(bar))
+        return self.value
+
+    @property
+    def value(self):
+        return self.rolling.mean if self.rolling.ready else math.nan
+
+
+class OnlineEMA(OnlineIndicator):
+    """Moyenne mobile exponentielle (adjust=False, comme ewm de pandas)"""
+
+    _fields = ("alpha", "value")
+
+    def __init__(self, span):
+        self.alpha = 2.0 / (span + 1.0)
+        self.value = math.nan
+
+    def update(self, bar):
+        x = _close(bar)
+        self.value = x if math.isnan(self.value) else self.value + self.alpha * (x - self.value)
+        return self.value
+
+
+class OnlineRSI(OnlineIndicator):
+    """RSI en flux.
+
+    method="simple" reproduit indicators.plot_rsi (moyennes glissantes des
+    hausses et baisses) ; method="wilder" utilise le lissage de Wilder.
+    """
+
+    _fields = ("window", "method", "last_close", "gains", "losses", "avg_gain", "avg_loss", "count")
+
+    def __init__(self, window=14, method="simple"):
+        if method not in ("simple", "wilder"):
+            raise ValueError(f"Méthode RSI inconnue : {method}")
+        self.window = window
+        self.method = method
+        self.last_close = None
+        self.gains = RollingWindow(window)
+        self.losses = RollingWindow(window)
+        self.avg_gain = math.nan
+        self.avg_loss = math.nan
+        self.count = 0
+
+    def update(self, bar):
+        x = _close(bar)
+        # Première barre : variation nulle, comme delta.where(...) sur le NaN initial
+        delta = 0.0 if self.last_close is None else x - self.last_close
+        self.last_close = x
+        gain, loss = max(delta, 0.0), max(-delta, 0.0)
+
+        if self.method == "simple":
+            self.gains.update(gain)
+            self.losses.update(loss)
+            if self.gains.ready:
+                self.avg_gain, self.avg_loss = self.gains.mean, self.losses.mean
+        elif self.count > 0:
+            # Wilder : moyenne simple des `window` premières variations, puis lissage
+            n = self.window
+            if self.count <= n:
+                self.gains.update(gain)
+                self.losses.update(loss)
+                if self.count == n:
+                    self.avg_gain, self.avg_loss = self.gains.mean, self.losses.mean
+            else:
+                self.avg_gain = (self.avg_gain * (n - 1) + gain) / n
+                self.avg_loss = (self.avg_loss * (n - 1) + loss) / n
+        self.count += 1
+        return self.value
+
+    @property
+    def value(self):
+        if math.isnan(self.avg_gain):
+            return math.nan
+        if self.avg_loss == 0:
+            return 100.0 if self.avg_gain > 0 else math.nan
+        return 100 - 100 / (1 + self.avg_gain / self.avg_loss)
+
+
+class OnlineMACD(OnlineIndicator):
+    """MACD (EMA rapide - EMA lente) et sa ligne de signal"""
+
+    _fields = ("fast", "slow", "signal")
+
+    def __init__(self, fast=12, slow=26, signal=9):
+        self.fast = OnlineEMA(fast)
+        self.slow = OnlineEMA(slow)
+        self.signal = OnlineEMA(signal)
+
+    def to_dict(self):
+        return {"type": "OnlineMACD", "state": {f: getattr(self, f).to_dict()["state"] for f in self._fields}}
+
+    @classmethod
+    def _restore(cls, state):
+        obj = cls.__new__(cls)
+        for field in cls._fields:
+            setattr(obj, field, OnlineEMA._restore(state[field]))
+        return obj
+
+    def update(self, bar):
+        x = _close(bar)
+        macd = self.fast.update(x) - self.slow.update(x)
+        self.signal.update(macd)
+        return self.value
+
+    @property
+    def value(self):
+        macd = self.fast.value - self.slow.value
+        return {"MACD": macd, "MACD_Signal": self.signal.value, "Histogram": macd - self.signal.value}
+
+
+class OnlineBollinger(OnlineIndicator):
+    """Bandes de Bollinger (moyenne ± num_std écarts-types glissants)"""
+
+    _fields = ("rolling", "num_std")
+
+    def __init__(self, window=20, num_std=2):
+        self.rolling = RollingWindow(window)
+        self.num_std = num_std
+
+    def update(self, bar):
+        self.rolling.update(_close(bar))
+        return self.value
+
+    @property
+    def value(self):
+        if not self.rolling.ready:
+            return {"SMA": math.nan, "Upper_Band": math.nan, "Lower_Band": math.nan}
+        mean, std = self.rolling.mean, self.rolling.std()
+        return {"SMA": mean, "Upper_Band": mean + self.num_std * std, "Lower_Band": mean - self.num_std * std}
+
+
+class OnlineTrend(OnlineIndicator):
+    """Écart au SMA 20 et tendance, comme alerts.plot_trends"""
+
+    _fields = ("rolling", "threshold", "last_close")
+
+    def __init__(self, window=20, threshold=5):
+        self.rolling = RollingWindow(window)
+        self.threshold = threshold
+        self.last_close = math.nan
+
+    def update(self, bar):
+        self.last_close = _close(bar)
+        self.rolling.update(self.last_close)
+        return self.value
+
+    @property
+    def value(self):
+        if not self.rolling.ready:
+            return {"Diff": math.nan, "Trend": "Stable"}
+        sma = self.rolling.mean
+        diff = (self.last_close - sma) / sma * 100
+        trend = "Hausse" if diff > self.threshold else "Baisse" if diff < -self.threshold else "Stable"
+        return {"Diff": diff, "Trend": trend}
+
+
+_REGISTRY = {cls.__name__: cls for cls in (OnlineSMA, OnlineEMA, OnlineRSI, OnlineMACD, OnlineBollinger, OnlineTrend)}
+
+
+def from_dict(data):
+    """Reconstruit un indicateur depuis son état sérialisé"""
+    return _REGISTRY[data["type"]]._restore(data["state"])
+
+
+def save_state(indicators, path):
+    """Sauvegarde un dictionnaire {nom: indicateur} en JSON"""
+    with open(path, "w") as f:
+        json.dump({name: ind.to_dict() for name, ind in indicators.items()}, f)
+
+
+def load_state(path):
+    """Recharge les indicateurs sauvegardés par save_state"""
+    with open(path) as f:
+        return {name: from_dict(data) for name, data in json.load(f).items()}
+
+
+if __name__ == "__main__":
+    # Vérifie l'accord avec les calculs en lot sur l'historique BTC
+    import numpy as np
+    from indicator_engine import compute_indicators
+    from price_store import load_prices
+
+    df = compute_indicators(load_prices("BTC"), ["RSI", "MACD", "BOLLINGER", "DEVIATION"])
+    rsi, macd, boll, trend = OnlineRSI(), OnlineMACD(), OnlineBollinger(), OnlineTrend()
+    rows = [(rsi.update(c), macd.update(c)["MACD_Signal"], boll.update(c)["Upper_Band"], trend.update(c)["Diff"])
+            for c in df["Close"]]
+    online = np.array(rows, dtype=float)
+    for i, col in enumerate(["RSI", "MACD_Signal", "Upper_Band", "Diff"]):
+        ok = np.allclose(online[:, i], df[col], equal_nan=True, rtol=1e-8)
+        print(f"{'✅' if ok else '❌'} {col}")
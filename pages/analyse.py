@@ -1,8 +1,8 @@
 import streamlit as st
 import pdfkit
-from predictor import plot_forecast
+from predictor import plot_forecast, figure_forecast
 from visualization import plot_price_trends, plot_comparison, plot_candlestick_2, plot_comparison_percentage
-from indicators import plot_bollinger_bands, plot_macd, plot_rsi
+from indicators import plot_bollinger_bands, plot_macd, plot_rsi, figure_bollinger_bands, figure_macd, figure_rsi
 import requests
 import pandas as pd
 import plotly.express as px
@@ -11,6 +11,7 @@ import plotly.subplots as sp
 from data_fetcher import fetch_data
 from alerts import plot_trends  # Correction ici !
 from stats_analysis import plot_daily_returns, plot_return_distribution,plot_annual_volatility, plot_volatility, plot_drawdown, compute_var  # Ajout ici
+from stats_analysis import figure_daily_returns, figure_return_distribution, figure_volatility, figure_drawdown
 from correlation import plot_correlation_matrix
 from visualization import plot_price_trends, plot_comparison, plot_candlestick_2, plot_comparison_percentage
 from visualization import plot_candlestick
@@ -51,7 +52,7 @@ st.markdown(
     retournement de tendance.
     """
 )
-plot_candlestick(actif)
+st.plotly_chart(plot_candlestick(actif))
 
 st.subheader("📈 Evolution des prix des actifs avec filtres")
 st.markdown("Ce graphique avancé intègre plusieurs indicateurs techniques sélectionnés pour affiner davantage l'analyse des tendances de marché.")
@@ -187,21 +188,21 @@ def generate_pdf():
     # 📌 Génération des graphiques et ajout dans le PDF
     figures = {
         "plot_candlestick.png": plot_candlestick,
-        "plot_rsi.png": plot_rsi,
-        "plot_bollinger.png": plot_bollinger_bands,
-        "plot_macd.png": plot_macd,
-        "plot_return_dist.png": plot_return_distribution,
-        "plot_volatility.png": plot_volatility,
-        "plot_daily_returns.png": plot_daily_returns,
-        "plot_forecast.png": plot_forecast,
+        "plot_rsi.png": figure_rsi,
+        "plot_bollinger.png": figure_bollinger_bands,
+        "plot_macd.png": figure_macd,
+        "plot_return_dist.png": figure_return_distribution,
+        "plot_volatility.png": lambda symbol: figure_volatility(),
+        "plot_daily_returns.png": figure_daily_returns,
+        "plot_forecast.png": figure_forecast,
         "plot_correlation_matrix.png": plot_correlation_matrix,
-        "plot_drawdown.png": plot_drawdown
+        "plot_drawdown.png": figure_drawdown
     }
 
     for title, img_name in toc:
         if img_name in figures:
             try:
-                fig = figures[img_name]("BTC")  # Modifier selon l'actif sélectionné
+                fig = figures[img_name](actif)  # Figures mémorisées : pas de recalcul
                 if fig is not None:
                     img_buffer = BytesIO()
                     fig.write_image(img_buffer, format="png")  # Sauvegarde en mémoire
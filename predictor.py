@@ -1,22 +1,39 @@
-from prophet import Prophet
 import pandas as pd
+from price_store import load_prices
 import plotly.graph_objects as go
 import streamlit as st
-from sklearn.linear_model import LinearRegression
-from sklearn.model_selection import train_test_split, cross_val_score
-from sklearn.metrics import mean_squared_error, r2_score
 import numpy as np
-import matplotlib.pyplot as plt 
+import forecast_service
+import features
+import forecast_store
+import time_series_cv
+from baselines import refit_pending, tiered_forecast
+from figure_cache import cached_figure
+# prophet, sklearn et matplotlib sont importés dans les fonctions qui s'en
+# servent : leur chargement (plusieurs secondes) n'a lieu qu'à l'ouverture
+# de l'onglet de prévision.
 
-def predict_and_plot(asset_data, features, target='Clôture', plot_title='Prédiction des Clôtures'):
-    """Fonction de prédiction pour un actif donné et visualisation des résultats"""
+def predict_and_plot(asset_data, feature_cols, target='Clôture', plot_title='Prédiction des Clôtures',
+                     n_splits=5, window=None, n_jobs=-1, target_type="price"):
+    """Fonction de prédiction pour un actif donné et visualisation des résultats.
+
+    Les données sont supposées triées par date : le test porte sur les 20 %
+    les plus récents, et la validation croisée est chronologique (fenêtre
+    croissante, ou glissante de `window` observations). `target_type`
+    ("price" ou "return") choisit les scores (voir time_series_cv.scores).
+    Renvoie le tableau des scores par pli.
+    """
+    from sklearn.linear_model import LinearRegression
+    from sklearn.metrics import mean_squared_error, r2_score
+    import matplotlib.pyplot as plt
     
     # Séparation des données
-    X = asset_data[features]  # Variables indépendantes
+    X = asset_data[feature_cols]  # Variables indépendantes
     y = asset_data[target]  # Variable cible
     
-    # Séparation des données en ensembles d'entraînement et de test
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    # Séparation chronologique : apprentissage sur le passé, test sur la fin de l'historique
+    split = int(len(X) * 0.8)
+    X_train, X_test, y_train, y_test = X.iloc[:split], X.iloc[split:], y.iloc[:split], y.iloc[split:]
     
     # Modèle de régression linéaire
     model = LinearRegression()
@@ -25,83 +42,87 @@ def predict_and_plot(asset_data, features, target='Clôture', plot_title='Prédi
     # Prédiction sur l'ensemble de test
     y_pred = model.predict(X_test)
     
-    # Calcul des scores de validation croisée
-    scores = cross_val_score(model, X, y, cv=5, scoring='neg_mean_squared_error')
-    rmse_mean = np.mean(np.sqrt(-scores))
+    # Validation croisée chronologique, plis en parallèle
+    folds = time_series_cv.cross_validate(model, X, y, n_splits=n_splits, window=window, n_jobs=n_jobs,
+                                          target_type=target_type)
+    rmse_mean = folds["rmse"].mean()
     mse = mean_squared_error(y_test, y_pred)
     r2 = r2_score(y_test, y_pred)
     
     # Affichage des résultats
-    st.write(f"RMSE moyen (validation croisée) : {rmse_mean:.4f}")
+    st.write(f"RMSE moyen (validation croisée chronologique) : {rmse_mean:.4f}")
     st.write(f"MSE sur les données de test : {mse:.4f}")
     st.write(f"R² sur les données de test : {r2:.4f}")
+    st.dataframe(folds)
     
     # Visualisation des résultats
-    plt.figure(figsize=(10, 6))
+    fig = plt.figure(figsize=(10, 6))
     plt.plot(y_test.index, y_test, label='Valeurs réelles', color='blue')
-    plt.plot(y_pred, label='Prédictions', color='red')
+    plt.plot(y_test.index, y_pred, label='Prédictions', color='red')
     plt.title(plot_title)
     plt.legend()
     
     # Affichage dans Streamlit
-    st.pyplot()
+    st.pyplot(fig)
+    return folds
+
+ASSETS = {"BTC": "Bitcoin", "GOLD": "Or", "SP500": "S&P 500"}
+
 
 def main():
-    # Charger les données dans df_total
-    df_gold = pd.read_csv("data/GOLD.csv")
-    df_btc = pd.read_csv("data/BTC.csv")
-    df_sp500 = pd.read_csv("data/SP500.csv")
-    # Assurez-vous que vos données sont chargées dans df_total
-    # Exemple de données pour un actif, ici l'Or
-    gold_data = df_gold[df_gold['Actif'] == 'Or'].dropna(subset=['Clôture', 'RSI', 'Rendement', 'Haut', 'Bas', 'Ouverture', 'Volatilité'])
-    
-    features = ["Ouverture", "Haut", "Bas", "RSI", "Volatilité", "Rendement"]
-    
-    # Prédiction et affichage des résultats pour chaque actif
-    st.title("Prédiction des Prix des Actifs")
-    
-    # Bitcoin
-    bitcoin_data = df_btc[df_btc['Actif'] == 'Bitcoin'].dropna(subset=['Clôture', 'RSI', 'Rendement', 'Haut', 'Bas', 'Ouverture', 'Volatilité'])
-    st.subheader("Bitcoin")
-    predict_and_plot(bitcoin_data, features, plot_title='Prédiction de la Clôture - Bitcoin')
-    
-    # Or
-    st.subheader("Or")
-    predict_and_plot(gold_data, features, plot_title='Prédiction de la Clôture - Or')
-    
-    # S&P 500
-    sp500_data = df_sp500[df_sp500['Actif'] == 'S&P 500'].dropna(subset=['Clôture', 'RSI', 'Rendement', 'Haut', 'Bas', 'Ouverture', 'Volatilité'])
-    st.subheader("S&P 500")
-    predict_and_plot(sp500_data, features, plot_title='Prédiction de la Clôture - S&P 500')
+    # Variables calculées à partir des OHLCV stockés (features.py), cible : rendement du lendemain
+    st.title("Prédiction des Rendements des Actifs")
+    for symbol, name in ASSETS.items():
+        asset_data = features.load_features(symbol).dropna(subset=features.FEATURES + ["target_return"])
+        st.subheader(name)
+        predict_and_plot(asset_data, features.FEATURES, target="target_return", target_type="return",
+                         plot_title=f"Prédiction du rendement du lendemain - {name}")
 
-def plot_forecast(symbol):
-    """Affiche les prévisions des prix avec Prophet"""
-    df = pd.read_csv(f"data/{symbol}.csv", index_col=0, parse_dates=True)
+def _forecast_versions(symbol):
+    return forecast_store.store_version(), forecast_service.forecast_version(symbol)
 
-    # Renommer les colonnes pour Prophet
-    df = df.rename(columns={"Close": "y"})
-    df["ds"] = df.index
 
-    # Entraînement du modèle Prophet
-    model = Prophet()
-    model.fit(df)
+@cached_figure(versions=_forecast_versions)
+def figure_forecast(symbol):
+    """Construit le graphique des prévisions sans attendre Stan (voir baselines.tiered_forecast).
 
-    # Création des prévisions sur 30 jours
-    future = model.make_future_dataframe(periods=30)
-    forecast = model.predict(future)
+    Le modèle affiché est indiqué dans fig.layout.meta["model"].
+    """
+    df = load_prices(symbol)
+    forecast, model = tiered_forecast(symbol)
+    baseline = forecast_store.load_forecast(symbol, "drift")
 
     # Création du graphique avec Plotly
     fig = go.Figure()
-    fig.add_trace(go.Scatter(x=df["ds"], y=df["y"], mode='lines', name="Historique"))
-    fig.add_trace(go.Scatter(x=forecast["ds"], y=forecast["yhat"], mode='lines', name="Prévision"))
-    fig.update_layout(title=f"Prédictions de {symbol} (30 jours)", xaxis_title="Date", yaxis_title="Prix")
+    fig.add_trace(go.Scatter(x=df.index, y=df["Close"], mode='lines', name="Historique"))
+    fig.add_trace(go.Scatter(x=forecast["ds"], y=forecast["yhat_upper"], mode='lines',
+                             line=dict(width=0), showlegend=False))
+    fig.add_trace(go.Scatter(x=forecast["ds"], y=forecast["yhat_lower"], mode='lines', line=dict(width=0),
+                             fill="tonexty", fillcolor="rgba(255,127,14,0.2)", name="Intervalle"))
+    fig.add_trace(go.Scatter(x=forecast["ds"], y=forecast["yhat"], mode='lines',
+                             name="Prévision" if model == "prophet" else f"Prévision ({model})"))
+    if baseline is not None:
+        fig.add_trace(go.Scatter(x=baseline["ds"], y=baseline["yhat"], mode='lines', name="Tendance (dérive)",
+                                 line=dict(dash="dot", color="gray")))
+    fig.update_layout(title=f"Prédictions de {symbol} ({len(forecast)} jours)", xaxis_title="Date",
+                      yaxis_title="Prix", meta={"model": model})
+    return fig
+
+def plot_forecast(symbol):
+    """Affiche les prévisions des prix avec Prophet (réajustées seulement quand les prix changent)"""
+    fig = figure_forecast(symbol)
+    model = fig.layout.meta["model"]
+    if model != "prophet" and refit_pending(symbol):
+        st.info(f"⏳ Prévision Prophet en cours de calcul : modèle {model} affiché en attendant.")
+    elif model != "prophet":
+        st.info(f"ℹ️ Prévision Prophet indisponible : modèle {model} affiché.")
 
     # Vérifie si on est dans Streamlit avant d'afficher
     try:
         st.plotly_chart(fig)
     except RuntimeError:
         print("⚠ Attention : Exécute ce script avec Streamlit (`streamlit run main.py`).")
-
+    return fig
 
 if __name__ == "__main__":
     print("⚠ Ce script est conçu pour être utilisé avec Streamlit.")
@@ -0,0 +1,232 @@
+import os
+import shutil
+import threading
+import pandas as pd
+
+DATA_DIR = "data"
+# Historiques de taux de change stockés à côté des prix (voir fx_rates), exclus de list_symbols
+FX_PREFIX = "FX_"
+
+# Types attendus pour les colonnes OHLCV
+DTYPES = {
+    "Open": "float64",
+    "High": "float64",
+    "Low": "float64",
+    "Close": "float64",
+    "Volume": "int64",
+}
+
+_cache = {}
+_lock = threading.Lock()
+_stats = {"parses": 0, "hits": 0, "invalidations": 0}
+
+
+def price_path(symbol):
+    """Chemin du fichier CSV d'un actif"""
+    return os.path.join(DATA_DIR, f"{symbol}.csv")
+
+
+def binary_path(symbol):
+    """Chemin de la copie binaire (Parquet) d'un actif"""
+    return os.path.join(DATA_DIR, f"{symbol}.parquet")
+
+
+def _file_version(path):
+    """Version d'un fichier : (mtime en ns, taille)"""
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _parse_csv(path):
+    """Lit un CSV de prix et applique les types OHLCV"""
+    df = pd.read_csv(path, index_col=0, parse_dates=True)
+    return _apply_types(df)
+
+
+def _parse_binary(path):
+    """Lit la copie Parquet d'un actif (types et index déjà stockés)"""
+    return _apply_types(pd.read_parquet(path))
+
+
+def _apply_types(df):
+    """Applique les types OHLCV et nomme l'index de dates"""
+    df.index.name = "Date"
+    types = {col: dtype for col, dtype in DTYPES.items() if col in df.columns}
+    if "Volume" in types and df["Volume"].isna().any():
+        types["Volume"] = "float64"
+    return df.astype(types)
+
+
+def _freeze(df):
+    """Rend les tableaux sous-jacents du DataFrame en lecture seule"""
+    for col in df.columns:
+        values = df[col].to_numpy()
+        if values.base is not None:
+            values = values.base
+        values.flags.writeable = False
+    return df
+
+
+def _source(symbol):
+    """Choisit le fichier à lire : la copie Parquet si elle est à jour, sinon le CSV"""
+    csv_path = price_path(symbol)
+    bin_path = binary_path(symbol)
+    try:
+        bin_version = _file_version(bin_path)
+    except FileNotFoundError:
+        return csv_path, _file_version(csv_path), _parse_csv
+    try:
+        csv_version = _file_version(csv_path)
+    except FileNotFoundError:
+        return bin_path, bin_version, _parse_binary
+    if bin_version[0] >= csv_version[0]:
+        return bin_path, bin_version, _parse_binary
+    return csv_path, csv_version, _parse_csv
+
+
+def _load(key, path, version, parser):
+    """Lit un fichier une seule fois par version et renvoie une vue partagée"""
+    with _lock:
+        entry = _cache.get(key)
+        if entry is not None and entry[0] == (path, version):
+            _stats["hits"] += 1
+            return entry[1].copy(deep=False)
+        if entry is not None:
+            _stats["invalidations"] += 1
+
+    df = _freeze(parser(path))
+
+    with _lock:
+        _stats["parses"] += 1
+        _cache[key] = ((path, version), df)
+    return df.copy(deep=False)
+
+
+def load_prices(symbol):
+    """Renvoie les prix OHLCV d'un actif depuis le cache partagé.
+
+    Le fichier est relu uniquement si son mtime (ou sa taille) change. La vue
+    renvoyée est une copie superficielle : ajouter des colonnes ne touche pas
+    le cache, et les données d'origine sont en lecture seule.
+    """
+    path, version, parser = _source(symbol)
+    return _load(symbol, path, version, parser)
+
+
+def load_close_matrix(symbols, column="Close"):
+    """Aligne une colonne de plusieurs actifs sur un même calendrier (dates × actifs).
+
+    Les dates absentes pour un actif valent NaN. Renvoie un DataFrame dont
+    `.to_numpy()` alimente directement indicator_engine.compute_indicators_wide.
+    """
+    return pd.concat({symbol: load_prices(symbol)[column] for symbol in symbols}, axis=1).sort_index()
+
+
+def list_symbols():
+    """Actifs disponibles dans DATA_DIR (fichiers CSV hors prévisions et taux de change)"""
+    return sorted(name[:-4] for name in os.listdir(DATA_DIR)
+                  if name.endswith(".csv") and not name.endswith("_forecast.csv")
+                  and not name.startswith(FX_PREFIX))
+
+
+def data_version(symbol):
+    """Version des données d'un actif, utilisable comme clé de cache"""
+    path, version, _ = _source(symbol)
+    return (os.path.basename(path),) + version
+
+
+def _atomic_write(path, write):
+    """Écrit dans un fichier temporaire puis le renomme sur la cible"""
+    tmp_path = f"{path}.tmp"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def write_binary(symbol, df):
+    """Écrit la copie Parquet d'un actif (nécessite pyarrow)"""
+    try:
+        _atomic_write(binary_path(symbol), lambda p: _apply_types(df.copy()).to_parquet(p))
+    except ImportError:
+        print("⚠ pyarrow absent : copie binaire non écrite, lecture depuis le CSV.")
+        return False
+    return True
+
+
+def save_prices(symbol, df):
+    """Enregistre les prix d'un actif en CSV puis en copie binaire"""
+    os.makedirs(DATA_DIR, exist_ok=True)
+    _atomic_write(price_path(symbol), df.to_csv)
+    write_binary(symbol, df)
+    invalidate(symbol)
+
+
+def _tail_offset(path, lines):
+    """Position (en octets) du début des `lines` dernières lignes d'un fichier"""
+    with open(path, "rb") as f:
+        end = f.seek(0, os.SEEK_END)
+        block = 4096
+        while True:
+            start = max(0, end - block)
+            f.seek(start)
+            data = f.read(end - start)
+            body = data[:-1] if data.endswith(b"\n") else data
+            if body.count(b"\n") >= lines or start == 0:
+                break
+            block *= 2
+    cut = len(body)
+    for _ in range(lines):
+        cut = body.rfind(b"\n", 0, cut)
+    return start + cut + 1
+
+
+def append_prices(symbol, new):
+    """Ajoute des barres à la fin du CSV d'un actif sans relire l'historique.
+
+    Le CSV existant est copié tel quel dans un fichier temporaire, les
+    nouvelles lignes y sont ajoutées, puis le fichier remplace l'original.
+    Les barres stockées à partir de la première date de `new` (ex. une
+    dernière barre partielle de la veille) sont remplacées : seule la fin
+    du fichier est tronquée.
+    """
+    stored = load_prices(symbol)
+    new = new[stored.columns]
+    replaced = int((stored.index >= new.index[0]).sum())
+
+    def write(tmp_path):
+        shutil.copyfile(price_path(symbol), tmp_path)
+        if replaced:
+            with open(tmp_path, "r+b") as f:
+                f.truncate(_tail_offset(tmp_path, replaced))
+        new.to_csv(tmp_path, mode="a", header=False)
+
+    _atomic_write(price_path(symbol), write)
+    write_binary(symbol, pd.concat([stored.iloc[:len(stored) - replaced], new]))
+    invalidate(symbol)
+
+
+def invalidate(symbol=None):
+    """Vide le cache pour un actif, ou entièrement si symbol est None"""
+    with _lock:
+        if symbol is None:
+            _cache.clear()
+        else:
+            _cache.pop(symbol, None)
+
+
+def get_stats():
+    """Compteurs du cache : lectures effectives et lectures évitées"""
+    with _lock:
+        return {
+            "parses": _stats["parses"],
+            "parses_evites": _stats["hits"],
+            "invalidations": _stats["invalidations"],
+            "actifs_en_cache": len(_cache),
+        }
+
+
+if __name__ == "__main__":
+    # Génère les copies binaires des CSV existants
+    for asset in ["BTC", "SP500", "GOLD"]:
+        write_binary(asset, load_prices(asset))
+        load_prices(asset)
+    print(f"📦 Cache des prix : {get_stats()}")
@@ -0,0 +1,288 @@
+import numpy as np
+import pandas as pd
+
+import garch
+from price_store import load_prices
+from rolling_stats import rolling_quantile
+# scipy est importé dans les méthodes paramétriques, comme dans garch
+
+#=========================VaR et Expected Shortfall en lot (niveaux × horizons × actifs)
+# Entrée : matrice de rendements simples journaliers (dates × actifs), NaN
+# autorisés pour les historiques de longueurs différentes. Sortie : tableaux
+# (niveaux, horizons, actifs), même convention de signe que
+# metrics.value_at_risk (une perte est un rendement négatif).
+
+METHODS = ("historical", "gaussian", "cornish_fisher", "filtered_historical", "monte_carlo")
+LEVELS = (0.95, 0.99)
+HORIZONS = (1, 10)
+N_SIMULATIONS = 10_000
+ES_POINTS = 64
+
+
+def load_returns(symbols):
+    """Rendements simples journaliers (dates × actifs), calculés actif par actif.
+
+    Chaque rendement relie deux séances de l'actif lui-même : un actif coté
+    en semaine a un NaN le week-end, pas un lundi manquant.
+    """
+    return pd.concat({symbol: load_prices(symbol)["Close"].pct_change() for symbol in symbols},
+                     axis=1).sort_index()
+
+
+def _log_returns(returns):
+    """Log-rendements (lignes × actifs), l'historique valide de chaque actif tassé en fin de tableau.
+
+    Les mesures de risque d'un actif ne dépendent que de la suite de ses
+    séances : les trous de calendrier sont retirés, et les dernières lignes
+    restent les séances les plus récentes de chaque actif.
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    log_returns = np.log1p(returns[:, None] if returns.ndim == 1 else returns)
+    if not np.isnan(log_returns).any():
+        return log_returns
+    order = np.argsort(~np.isnan(log_returns), axis=0, kind="stable")
+    return np.take_along_axis(log_returns, order, axis=0)
+
+
+def _window_sums(log_returns, horizon):
+    """Log-rendements cumulés sur `horizon` jours glissants (NaN si un jour manque)"""
+    valid = ~np.isnan(log_returns)
+    zeros = np.zeros((1, log_returns.shape[1]))
+    sums = np.vstack([zeros, np.cumsum(np.where(valid, log_returns, 0.0), axis=0)])
+    counts = np.vstack([zeros, np.cumsum(valid, axis=0)])
+    return np.where(counts[horizon:] - counts[:-horizon] == horizon, sums[horizon:] - sums[:-horizon], np.nan)
+
+
+def empirical_tail(samples, levels):
+    """VaR (quantile à interpolation linéaire, comme np.percentile) et ES d'échantillons (k, actifs).
+
+    Seule la queue gauche est triée (np.partition puis tri des quelques
+    pour cent inférieurs), une fois pour tous les niveaux ; les NaN (rangés
+    en fin) sont exclus colonne par colonne. L'ES est la moyenne des valeurs
+    inférieures ou égales à la VaR, lue dans les sommes cumulées de la queue.
+    """
+    n = (~np.isnan(samples)).sum(axis=0)
+    last = np.maximum(n - 1, 0)
+    depth = int(np.floor((1 - min(levels)) * last.max())) + 2
+    if depth < len(samples):
+        samples = np.partition(samples, depth - 1, axis=0)[:depth]
+    ordered = np.sort(samples, axis=0)
+    cumulative = np.cumsum(np.nan_to_num(ordered), axis=0)
+    columns = np.arange(samples.shape[1])
+    var = np.full((len(levels), samples.shape[1]), np.nan)
+    es = np.full_like(var, np.nan)
+    for i, level in enumerate(levels):
+        position = (1 - level) * last
+        lo = np.floor(position).astype(np.int64)
+        hi = np.minimum(lo + 1, last)
+        frac = position - lo
+        var[i] = ordered[lo, columns] + frac * (ordered[hi, columns] - ordered[lo, columns])
+        es[i] = cumulative[lo, columns] / (lo + 1)
+    var[:, n < 2] = np.nan
+    es[:, n < 2] = np.nan
+    return var, es
+
+
+def _moments(log_returns):
+    """Moyenne, écart-type, asymétrie et excès de kurtosis par colonne (NaN ignorés)"""
+    mean = np.nanmean(log_returns, axis=0)
+    centered = log_returns - mean
+    std = np.nanstd(log_returns, axis=0, ddof=1)
+    scaled = centered / np.nanstd(log_returns, axis=0)
+    skew = np.nanmean(scaled ** 3, axis=0)
+    kurt = np.nanmean(scaled ** 4, axis=0) - 3
+    return mean, std, skew, kurt
+
+
+def _historical(log_returns, levels, horizons, **_):
+    var = np.empty((len(levels), len(horizons), log_returns.shape[1]))
+    es = np.empty_like(var)
+    for j, h in enumerate(horizons):
+        var[:, j], es[:, j] = empirical_tail(np.expm1(_window_sums(log_returns, h)), levels)
+    return var, es
+
+
+def _gaussian(log_returns, levels, horizons, **_):
+    """Log-rendements normaux i.i.d. : VaR et ES exactes du rendement simple (loi log-normale)"""
+    from scipy.stats import norm
+
+    mean, std, _, _ = _moments(log_returns)
+    h = np.asarray(horizons, dtype=np.float64)[None, :, None]
+    alpha = 1 - np.asarray(levels)[:, None, None]
+    z = norm.ppf(alpha)
+    mu, sigma = mean * h, std * np.sqrt(h)
+    var = np.expm1(mu + z * sigma)
+    es = np.exp(mu + sigma ** 2 / 2) * norm.cdf(z - sigma) / alpha - 1
+    return var, es
+
+
+def _cornish_fisher_z(z, skew, kurt):
+    return (z + (z ** 2 - 1) * skew / 6 + (z ** 3 - 3 * z) * kurt / 24
+            - (2 * z ** 3 - 5 * z) * skew ** 2 / 36)
+
+
+def _cornish_fisher(log_returns, levels, horizons, **_):
+    """Quantile normal corrigé de l'asymétrie et de la kurtosis (agrégées en 1/√h et 1/h).
+
+    L'ES est la moyenne des VaR Cornish-Fisher sur ES_POINTS niveaux de la queue.
+    Le développement n'est plus monotone pour des kurtosis très élevées
+    (crypto à 99 %) : la VaR obtenue y est alors très conservatrice.
+    """
+    from scipy.stats import norm
+
+    mean, std, skew, kurt = _moments(log_returns)
+    h = np.asarray(horizons, dtype=np.float64)[None, :, None]
+    mu, sigma = mean * h, std * np.sqrt(h)
+    skew_h, kurt_h = skew / np.sqrt(h), kurt / h
+    alpha = 1 - np.asarray(levels)[:, None, None]
+    var = np.expm1(mu + _cornish_fisher_z(norm.ppf(alpha), skew_h, kurt_h) * sigma)
+    # Points milieux de (0, alpha) pour l'intégrale de la queue
+    u = alpha[..., None] * (np.arange(ES_POINTS) + 0.5) / ES_POINTS
+    tail = np.expm1(mu[..., None] + _cornish_fisher_z(norm.ppf(u), skew_h[..., None], kurt_h[..., None])
+                    * sigma[..., None])
+    return var, tail.mean(axis=-1)
+
+
+def _draw(rng, data, n_valid, n_simulations):
+    """Lignes de `data` tirées avec remise pour un jour simulé, un même tirage pour tous les actifs.
+
+    Chaque actif tire dans ses n_valid dernières lignes : sur l'historique
+    commun, les actifs reçoivent la même séance, ce qui conserve leurs
+    corrélations. Si tous les historiques ont la même longueur, on copie des
+    lignes entières au lieu d'indexer élément par élément.
+    """
+    n_rows = len(data)
+    u = rng.random((n_simulations, 1))
+    if (n_valid == n_valid[0]).all():
+        return data[n_rows - n_valid[0] + np.minimum((u[:, 0] * n_valid[0]).astype(np.int64), n_valid[0] - 1)]
+    rows = n_rows - n_valid + np.minimum((u * n_valid).astype(np.int64), n_valid - 1)
+    return data[rows, np.arange(data.shape[1])]
+
+
+def _simulated_tail(draw_step, n_assets, levels, horizons, n_simulations):
+    """VaR/ES à partir de trajectoires cumulées jour par jour ; draw_step() renvoie (sims, actifs)"""
+    var = np.empty((len(levels), len(horizons), n_assets))
+    es = np.empty_like(var)
+    cumulated = np.zeros((n_simulations, n_assets))
+    for day in range(1, max(horizons) + 1):
+        cumulated += draw_step()
+        if day in horizons:
+            j = horizons.index(day)
+            var[:, j], es[:, j] = empirical_tail(np.expm1(cumulated), levels)
+    return var, es
+
+
+def _valid_history(log_returns):
+    """Nombre de séances de chaque actif (tassées en fin de tableau par _log_returns)"""
+    return (~np.isnan(log_returns)).sum(axis=0)
+
+
+def _monte_carlo(log_returns, levels, horizons, n_simulations=N_SIMULATIONS, seed=None, **_):
+    """Trajectoires par tirage i.i.d. de jours historiques (bootstrap conjoint des actifs)"""
+    n_valid = _valid_history(log_returns)
+    usable = n_valid >= 2
+    data = np.where(np.isnan(log_returns), 0.0, log_returns)
+    rng = np.random.default_rng(seed)
+    n_valid = np.maximum(n_valid, 1)
+    var, es = _simulated_tail(lambda: _draw(rng, data, n_valid, n_simulations),
+                              data.shape[1], levels, list(horizons), n_simulations)
+    var[..., ~usable] = np.nan
+    es[..., ~usable] = np.nan
+    return var, es
+
+
+def _filtered_historical(log_returns, levels, horizons, n_simulations=N_SIMULATIONS, seed=None,
+                         garch_params=None, **_):
+    """Simulation historique filtrée : résidus GARCH(1,1) standardisés rééchantillonnés.
+
+    Chaque actif est ajusté par garch.fit, sauf si `garch_params` fournit
+    déjà ses paramètres ; les résidus e / sigma sont tirés (même date pour
+    tous les actifs) puis replongés dans la récurrence GARCH à partir de la
+    variance prévue pour demain.
+    """
+    n_rows, n_assets = log_returns.shape
+    n_valid = _valid_history(log_returns)
+    residuals = np.zeros((n_rows, n_assets))
+    mu, omega, alpha, beta, sigma2 = (np.zeros(n_assets) for _ in range(5))
+    usable = np.zeros(n_assets, dtype=bool)
+    for k in range(n_assets):
+        history = log_returns[n_rows - n_valid[k]:, k] * garch.SCALE
+        try:
+            params = garch_params[k] if garch_params is not None and garch_params[k] else garch.fit(history)
+        except ValueError:
+            continue
+        residuals[n_rows - n_valid[k]:, k] = (history - params["mu"]) / garch.conditional_volatility(history, params)
+        mu[k], omega[k], alpha[k], beta[k] = (params[name] for name in garch.PARAM_NAMES)
+        sigma2[k] = garch.forecast_variance(params, 1)[0]
+        usable[k] = True
+
+    rng = np.random.default_rng(seed)
+    n_draw = np.maximum(n_valid, 1)
+    state = {"sigma2": np.broadcast_to(sigma2, (n_simulations, n_assets))}
+
+    def step():
+        shock = _draw(rng, residuals, n_draw, n_simulations)
+        shock *= np.sqrt(state["sigma2"])
+        sigma2 = shock * shock
+        sigma2 *= alpha
+        sigma2 += omega
+        sigma2 += beta * state["sigma2"]
+        state["sigma2"] = sigma2
+        shock += mu
+        shock /= garch.SCALE
+        return shock
+
+    var, es = _simulated_tail(step, n_assets, levels, list(horizons), n_simulations)
+    var[..., ~usable] = np.nan
+    es[..., ~usable] = np.nan
+    return var, es
+
+
+_ENGINES = {
+    "historical": _historical,
+    "gaussian": _gaussian,
+    "cornish_fisher": _cornish_fisher,
+    "filtered_historical": _filtered_historical,
+    "monte_carlo": _monte_carlo,
+}
+
+
+def compute_risk(returns, levels=LEVELS, horizons=HORIZONS, method="historical",
+                 n_simulations=N_SIMULATIONS, seed=None, garch_params=None):
+    """VaR et Expected Shortfall de plusieurs actifs, niveaux et horizons en un appel.
+
+    `returns` : rendements simples journaliers (dates × actifs, ou une série).
+    Méthodes : historical (fenêtres de h jours glissantes), gaussian,
+    cornish_fisher, filtered_historical (GARCH + résidus) et monte_carlo
+    (bootstrap de jours). Renvoie {"var", "es"} de forme
+    (niveaux, horizons, actifs) avec "levels", "horizons", "method" et,
+    si `returns` est un DataFrame, "symbols". `garch_params` (une entrée par
+    actif, None pour ajuster) évite de réajuster les GARCH de
+    filtered_historical, ex. avec garch.fit_symbol mémorisé par version des
+    données.
+    """
+    if method not in _ENGINES:
+        raise ValueError(f"Méthode inconnue : {method} (attendu : {', '.join(METHODS)})")
+    levels, horizons = tuple(levels), tuple(int(h) for h in horizons)
+    var, es = _ENGINES[method](_log_returns(returns), levels, horizons,
+                               n_simulations=n_simulations, seed=seed, garch_params=garch_params)
+    result = {"var": var, "es": es, "levels": levels, "horizons": horizons, "method": method}
+    if hasattr(returns, "columns"):
+        result["symbols"] = list(returns.columns)
+    return result
+
+
+def rolling_var(returns, window=250, levels=LEVELS):
+    """VaR historique glissante à 1 jour, forme (niveaux, dates, actifs).
+
+    Les dates sont celles de `returns` (un seul calendrier par appel). Le quantile de chaque fenêtre est maintenu incrémentalement par
+    rolling_stats.rolling_quantile, sans retrier la fenêtre à chaque date.
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    quantiles = rolling_quantile(returns, window, [1 - level for level in levels])
+    return np.moveaxis(quantiles, -1, 0)
+
+
+def risk_report(symbols, levels=LEVELS, horizons=HORIZONS, method="historical", **kwargs):
+    """compute_risk sur les actifs de price_store"""
+    return compute_risk(load_returns(symbols), levels, horizons, method, **kwargs)
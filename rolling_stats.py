@@ -0,0 +1,327 @@
+import bisect
+import math
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+#=========================statistiques glissantes sur tableaux (axe 0 = temps)
+
+
+def _as_2d(x):
+    x = np.asarray(x, dtype=np.float64)
+    return (x[:, None], True) if x.ndim == 1 else (x, False)
+
+
+class CumulativeSums:
+    """Sommes glissantes stables, partagées entre les statistiques d'une même série.
+
+    Pour une fenêtre w, la série est découpée en blocs de w lignes dont les
+    sommes cumulées repartent de zéro, sur les écarts à la moyenne du bloc.
+    Une fenêtre couvre au plus la fin d'un bloc et le début du suivant :
+    moyennes et sommes de carrés centrés des deux morceaux sont combinées
+    par la formule de fusion de Chan (celle de l'ajout/retrait de Welford).
+    Les erreurs d'arrondi restent ainsi à l'échelle d'un bloc au lieu de
+    croître avec la longueur de la série, même sur une tendance marquée.
+    Les sommes du dernier découpage sont conservées : moyenne et écart-type
+    d'une même fenêtre (Bollinger) ne parcourent x qu'une fois.
+    """
+
+    def __init__(self, x):
+        x, self.squeeze = _as_2d(x)
+        self.length = len(x)
+        self.x = x
+        self.valid = ~np.isnan(x)
+        self.complete = bool(self.valid.all())
+        self._pieces = (None, None)
+
+    def _split(self, window):
+        """Morceaux de chaque fenêtre, au format (blocs, window, colonnes).
+
+        La fenêtre se terminant à la ligne r du bloc k réunit le début du
+        bloc k (lignes 0..r) et la fin du bloc k-1 (lignes r+1..window-1) ;
+        pour chacun : effectif, somme et somme des carrés des écarts au
+        centre du bloc, et ce centre.
+        """
+        key, pieces = self._pieces
+        if key == window:
+            return pieces
+        n, m = self.x.shape
+        n_blocks = -(-n // window)
+        if self.complete and n == n_blocks * window:
+            blocks = self.x.reshape(n_blocks, window, m)
+        else:
+            padded = np.zeros((n_blocks * window, m))
+            padded[:n] = self.x if self.complete else np.where(self.valid, self.x, 0.0)
+            blocks = padded.reshape(n_blocks, window, m)
+
+        if self.complete:
+            # Effectifs identiques pour toutes les colonnes : tableaux (blocs, window, 1)
+            n_prefix = np.broadcast_to(np.arange(1.0, window + 1)[None, :, None], (n_blocks, window, 1))
+            n_block = np.full((n_blocks, 1, 1), float(window))
+            n_block[-1] = n - (n_blocks - 1) * window
+        else:
+            mask = np.zeros((n_blocks * window, m), dtype=bool)
+            mask[:n] = self.valid
+            mask = mask.reshape(blocks.shape)
+            n_prefix = np.cumsum(mask, axis=1, dtype=np.float64)
+            n_block = n_prefix[:, -1:]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            center = np.where(n_block > 0, blocks.sum(axis=1, keepdims=True) / n_block, 0.0)
+
+        z = blocks - center
+        if self.complete:
+            z[-1, n - (n_blocks - 1) * window:] = 0.0  # lignes de remplissage
+        else:
+            z[~mask] = 0.0
+        s_prefix = np.cumsum(z, axis=1)
+        np.multiply(z, z, out=z)
+        q_prefix = np.cumsum(z, axis=1)
+
+        def previous_tail(cum, fill=0.0):
+            out = np.empty_like(cum)
+            out[0] = fill
+            out[1:] = cum[:-1, -1:] - cum[:-1]
+            return out
+
+        n_tail = previous_tail(np.ascontiguousarray(n_prefix))
+        center_tail = np.zeros_like(center)
+        center_tail[1:] = center[:-1]
+        pieces = ((n_prefix, s_prefix, q_prefix, center),
+                  (n_tail, previous_tail(s_prefix), previous_tail(q_prefix), center_tail))
+        self._pieces = (window, pieces)
+        return pieces
+
+    def _rows(self, a, count, window):
+        a = np.where(count >= window, a, np.nan)
+        return self._out(a.reshape(-1, a.shape[-1])[:self.length])
+
+    def _out(self, a):
+        return a[:, 0] if self.squeeze else a
+
+    def mean(self, window):
+        """Moyenne glissante (NaN tant que la fenêtre n'est pas complète)"""
+        (n_p, s_p, _, c_p), (n_t, s_t, _, c_t) = self._split(window)
+        total = s_p + s_t
+        total += n_p * c_p
+        total += n_t * c_t
+        total /= window
+        return self._rows(total, n_p + n_t, window)
+
+    def var(self, window, ddof=1):
+        """Variance glissante (ddof=1 par défaut, comme pandas)"""
+        (n_p, s_p, q_p, c_p), (n_t, s_t, q_t, c_t) = self._split(window)
+        count = n_p + n_t
+        with np.errstate(invalid="ignore", divide="ignore"):
+            inv_p = np.where(n_p > 0, 1 / n_p, 0.0)
+            inv_t = np.where(n_t > 0, 1 / n_t, 0.0)
+            weight = np.where(count > 0, n_p * n_t / count, 0.0)
+        mean_p = s_p * inv_p
+        m2 = q_p - s_p * mean_p
+        mean_t = s_t * inv_t
+        m2 += q_t
+        m2 -= s_t * mean_t
+        # Fusion des deux morceaux : écart entre leurs moyennes
+        mean_p -= mean_t
+        mean_p += c_p - c_t
+        mean_p *= mean_p
+        mean_p *= weight
+        m2 += mean_p
+        m2 /= window - ddof
+        np.maximum(m2, 0.0, out=m2)
+        return self._rows(m2, count, window)
+
+    def std(self, window, ddof=1):
+        """Écart-type glissant"""
+        return np.sqrt(self.var(window, ddof))
+
+
+def rolling_mean(x, window):
+    """Moyenne glissante d'une série ou d'une matrice (dates × actifs)"""
+    return CumulativeSums(x).mean(window)
+
+
+def rolling_std(x, window, ddof=1):
+    """Écart-type glissant d'une série ou d'une matrice (dates × actifs)"""
+    return CumulativeSums(x).std(window, ddof)
+
+
+def _rolling_extreme(x, window, ufunc):
+    """Min/max glissant en O(n) quel que soit la fenêtre (van Herk / Gil-Werman).
+
+    La série est découpée en blocs de `window` ; le maximum d'une fenêtre est
+    le maximum entre le suffixe d'un bloc et le préfixe du bloc suivant.
+    """
+    x, squeeze = _as_2d(x)
+    n, m = x.shape
+    n_blocks = -(-n // window)
+    padded = np.full((n_blocks * window, m), np.nan)
+    padded[:n] = x
+    blocks = padded.reshape(n_blocks, window, m)
+    prefix = ufunc.accumulate(blocks, axis=1).reshape(-1, m)
+    suffix = ufunc.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].reshape(-1, m)
+
+    out = np.full((n, m), np.nan)
+    if n >= window:
+        ends = np.arange(window - 1, n)
+        out[window - 1:] = ufunc(suffix[ends - window + 1], prefix[ends])
+        # Une fenêtre contenant un NaN vaut NaN, comme avec pandas
+        nan_count = CumulativeSums(np.isnan(x).astype(np.float64))
+        has_nan = nan_count.mean(window) * window > 0.5
+        out[has_nan] = np.nan
+    return out[:, 0] if squeeze else out
+
+
+def rolling_max(x, window):
+    """Maximum glissant"""
+    return _rolling_extreme(x, window, np.fmax)
+
+
+def rolling_min(x, window):
+    """Minimum glissant"""
+    return _rolling_extreme(x, window, np.fmin)
+
+
+def rolling_quantile(x, window, q):
+    """Quantile glissant exact (interpolation linéaire).
+
+    S'appuie sur la fenêtre glissante de pandas, qui maintient une skiplist
+    triée mise à jour en O(log w) par pas au lieu de retrier chaque fenêtre.
+    `q` peut être une liste : le résultat a alors une dimension
+    supplémentaire en dernier. Sert au calcul de la VaR glissante.
+    """
+    x, squeeze = _as_2d(x)
+    rolling = pd.DataFrame(x).rolling(window=window)
+    qs = np.atleast_1d(q)
+    out = np.stack([rolling.quantile(qk).to_numpy() for qk in qs], axis=-1)
+    out = out[:, 0] if squeeze else out
+    return out[..., 0] if np.ndim(q) == 0 else out
+
+
+def rolling_stats(x, windows=(20, 50, 100, 200), stats=("mean", "std")):
+    """Calcule plusieurs statistiques pour plusieurs fenêtres en un seul passage.
+
+    Les sommes cumulées sont partagées entre toutes les fenêtres. Renvoie
+    {(statistique, fenêtre): tableau}. Statistiques : mean, std, var, min, max.
+    """
+    sums = CumulativeSums(x)
+    out = {}
+    for window in windows:
+        for stat in stats:
+            if stat in ("mean", "std", "var"):
+                out[(stat, window)] = getattr(sums, stat)(window)
+            elif stat == "min":
+                out[(stat, window)] = rolling_min(x, window)
+            elif stat == "max":
+                out[(stat, window)] = rolling_max(x, window)
+            else:
+                raise ValueError(f"Statistique inconnue : {stat}")
+    return out
+
+
+#=========================fenêtre glissante en flux (une valeur à la fois)
+
+
+class RollingWindow:
+    """Moyenne, écart-type, min et max glissants en O(1) (amorti) par mise à jour.
+
+    Moyenne/variance par Welford avec ajout et retrait ; min/max par deques
+    monotones. Les sommes sont recalculées exactement toutes les `window`
+    mises à jour pour éviter la dérive des arrondis sur les flux longs.
+    Les quantiles utilisent une copie triée de la fenêtre, construite au
+    premier appel à quantile() puis maintenue par dichotomie : O(w) par
+    mise à jour (décalage mémoire de la liste), payé seulement par les
+    fenêtres dont on lit des quantiles.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.mean = 0.0
+        self.m2 = 0.0
+        self._since_resync = 0
+        self._count = 0
+        self._min = deque()
+        self._max = deque()
+        self._sorted = None  # copie triée, créée par quantile()
+
+    def update(self, x):
+        if len(self.values) == self.window:
+            old = self.values[0]
+            if self._sorted is not None:
+                del self._sorted[bisect.bisect_left(self._sorted, old)]
+            n = len(self.values)
+            new_mean = self.mean + (x - old) / n
+            self.m2 += (x - old) * (x - new_mean + old - self.mean)
+            self.mean = new_mean
+        else:
+            n = len(self.values) + 1
+            delta = x - self.mean
+            self.mean += delta / n
+            self.m2 += delta * (x - self.mean)
+        self.values.append(x)
+        if self._sorted is not None:
+            bisect.insort(self._sorted, x)
+
+        # Deques monotones de (position, valeur)
+        i = self._count
+        self._count += 1
+        while self._min and self._min[-1][1] >= x:
+            self._min.pop()
+        self._min.append((i, x))
+        while self._max and self._max[-1][1] <= x:
+            self._max.pop()
+        self._max.append((i, x))
+        for dq in (self._min, self._max):
+            if dq[0][0] <= i - self.window:
+                dq.popleft()
+
+        self._since_resync += 1
+        if self._since_resync >= self.window:
+            self._resync()
+
+    def _resync(self):
+        n = len(self.values)
+        self.mean = sum(self.values) / n
+        self.m2 = sum((v - self.mean) ** 2 for v in self.values)
+        self._since_resync = 0
+
+    @property
+    def ready(self):
+        return len(self.values) == self.window
+
+    def std(self):
+        """Écart-type (ddof=1, comme pandas)"""
+        if not self.ready or self.window < 2:
+            return math.nan
+        return math.sqrt(max(self.m2, 0.0) / (self.window - 1))
+
+    def min(self):
+        return self._min[0][1] if self.ready else math.nan
+
+    def max(self):
+        return self._max[0][1] if self.ready else math.nan
+
+    def quantile(self, q):
+        """Quantile de la fenêtre (interpolation linéaire, comme pandas)"""
+        if not self.ready:
+            return math.nan
+        if self._sorted is None:
+            self._sorted = sorted(self.values)
+        pos = q * (self.window - 1)
+        i = int(pos)
+        j = min(i + 1, self.window - 1)
+        return self._sorted[i] + (pos - i) * (self._sorted[j] - self._sorted[i])
+
+    def to_dict(self):
+        return {"window": self.window, "values": list(self.values), "mean": self.mean,
+                "m2": self.m2, "since_resync": self._since_resync}
+
+    @classmethod
+    def from_dict(cls, state):
+        obj = cls(state["window"])
+        for x in state["values"]:
+            obj.update(x)
+        obj.mean, obj.m2 = state["mean"], state["m2"]
+        obj._since_resync = state["since_resync"]
+        return obj
@@ -1,66 +1,85 @@
+import functools
 import pandas as pd
+from price_store import load_prices, data_version
 import numpy as np
-import seaborn as sns
 import plotly.express as px
 import plotly.graph_objects as go
 import streamlit as st
+from figure_cache import cached_figure
+import metrics
+import monte_carlo
+import garch
+import risk
+import plotly.subplots as sp
 
 def compute_financial_metrics(symbol):
     """Calcule rendement quotidien, annuel, volatilité et ratios"""
-    df = pd.read_csv(f"data/{symbol}.csv", index_col=0, parse_dates=True)
-
-    # Calcul du rendement quotidien
-    df["Daily_Return"] = df["Close"].pct_change()
-
-    # Calcul du rendement annuel moyen
-    annual_return = df["Daily_Return"].mean() * 252
-
-    # Volatilité annuelle (écart-type des rendements)
-    annual_volatility = df["Daily_Return"].std() * np.sqrt(252)
-
-    # Sharpe Ratio (on suppose un taux sans risque de 2%)
-    risk_free_rate = 0.02
-    sharpe_ratio = (annual_return - risk_free_rate) / annual_volatility
-
-    # Sortino Ratio (ne prend en compte que les pertes)
-    negative_returns = df["Daily_Return"][df["Daily_Return"] < 0]
-    downside_volatility = negative_returns.std() * np.sqrt(252)
-    sortino_ratio = (annual_return - risk_free_rate) / downside_volatility if downside_volatility > 0 else np.nan
+    df = load_prices(symbol)
+    result = metrics.financial_metrics(metrics.daily_returns(df["Close"]))
 
     print(f"\n🔹 {symbol} - Analyse Financière")
-    print(f"📈 Rendement Annuel Moyen : {annual_return:.2%}")
-    print(f"📉 Volatilité Annuelle : {annual_volatility:.2%}")
-    print(f"⚖ Sharpe Ratio : {sharpe_ratio:.2f}")
-    print(f"📊 Sortino Ratio : {sortino_ratio:.2f}")
-
-
-
-
-def compute_var(symbol, confidence_level=0.95):
-    """Calcule la Value at Risk (VaR) pour un actif donné."""
-    df = pd.read_csv(f"data/{symbol}.csv", index_col=0, parse_dates=True)    
-    # Calcul des rendements quotidiens
-    df["Daily_Return"] = df["Close"].pct_change()    
-    # Suppression des valeurs NaN
-    returns = df["Daily_Return"].dropna()
-    # Vérification s'il reste des valeurs après suppression
-    if returns.empty:
-        return np.nan, f"⚠️ Impossible de calculer la VaR pour {symbol} (pas assez de données)."
-    # Calcul de la VaR
-    var = np.percentile(returns, (1 - confidence_level) * 100)
+    print(f"📈 Rendement Annuel Moyen : {result['annual_return']:.2%}")
+    print(f"📉 Volatilité Annuelle : {result['annual_volatility']:.2%}")
+    print(f"⚖ Sharpe Ratio : {result['sharpe_ratio']:.2f}")
+    print(f"📊 Sortino Ratio : {result['sortino_ratio']:.2f}")
+    return result
+
+
+
+
+VAR_METHODS = {
+    "historical": "Historique",
+    "gaussian": "Paramétrique (normale)",
+    "cornish_fisher": "Cornish-Fisher",
+    "filtered_historical": "Historique filtrée (GARCH)",
+    "monte_carlo": "Monte Carlo (bootstrap)",
+}
+
+
+@functools.lru_cache(maxsize=64)
+def _cached_var_es(symbol, version, confidence_level, method, horizon):
+    # VaR et ES mémorisées par paramètres et version des données ; le GARCH de
+    # filtered_historical vient de garch.fit_symbol (mémorisé, réajusté à chaud).
+    close = load_prices(symbol)["Close"]
+    garch_params = None
+    if method == "filtered_historical":
+        try:
+            garch_params = [garch.fit_symbol(symbol)]
+        except ValueError:
+            pass
+    result = risk.compute_risk(metrics.daily_returns(close), [confidence_level], [horizon], method, seed=42,
+                               garch_params=garch_params)
+    return float(result["var"][0, 0, 0]), float(result["es"][0, 0, 0])
+
+
+def var_es(symbol, confidence_level=0.95, method="historical", horizon=1):
+    """(VaR, ES) d'un actif, recalculés seulement quand ses données changent"""
+    return _cached_var_es(symbol, data_version(symbol), confidence_level, method, horizon)
+
+
+def compute_var(symbol, confidence_level=0.95, method="historical", horizon=1):
+    """Calcule la Value at Risk (VaR) et l'Expected Shortfall pour un actif donné (voir risk.compute_risk).
+
+    Affiche le résultat et renvoie la VaR (NaN, avec un avertissement, sans données suffisantes).
+    """
+    var, es = var_es(symbol, confidence_level, method, horizon)
+    # Vérification s'il reste des valeurs après suppression des NaN
+    if np.isnan(var):
+        st.warning(f"⚠️ Impossible de calculer la VaR pour {symbol} (pas assez de données).")
+        return np.nan
+    period = "une journée" if horizon == 1 else f"{horizon} jours"
     st.markdown(f"### 📉 Value at Risk (VaR) - {symbol}")
-    st.write(f"🔻 La VaR à {confidence_level*100:.0f}% indique qu'un investisseur pourrait perdre au maximum "
-             f"**{abs(var):.2%}** sur une journée en conditions normales de marché.")
+    st.write(f"🔻 La VaR à {confidence_level*100:.0f}% ({VAR_METHODS[method]}) indique qu'un investisseur pourrait "
+             f"perdre au maximum **{abs(var):.2%}** sur {period} en conditions normales de marché.")
+    st.write(f"⚠️ Au-delà de ce seuil, la perte moyenne (Expected Shortfall) est de **{abs(es):.2%}**.")
     return var
 
-def plot_drawdown(symbol):
-    """Calcule et affiche le drawdown maximum sous forme de graphique."""
-    df = pd.read_csv(f"data/{symbol}.csv", index_col=0, parse_dates=True)
-    df["Cumulative_Return"] = (1 + df["Close"].pct_change()).cumprod()
-    df["Peak"] = df["Cumulative_Return"].cummax()
-    df["Drawdown"] = (df["Cumulative_Return"] - df["Peak"]) / df["Peak"]
-
-    max_drawdown = df["Drawdown"].min()
+@cached_figure()
+def figure_drawdown(symbol):
+    """Calcule le drawdown et construit son graphique (drawdown maximum dans fig.layout.meta)."""
+    df = load_prices(symbol)
+    df["Drawdown"] = metrics.drawdown(df["Close"])
+    max_drawdown = metrics.max_drawdown(df["Close"])
 
     fig = go.Figure()
     fig.add_trace(go.Scatter(x=df.index, y=df["Drawdown"], 
@@ -70,21 +89,29 @@ def plot_drawdown(symbol):
     fig.update_layout(title=f"📉 Drawdown Historique de {symbol}",
                       xaxis_title="Date",
                       yaxis_title="Drawdown (%)",
-                      hovermode="x unified")
-    
+                      hovermode="x unified",
+                      meta={"max_drawdown": max_drawdown})
+    return fig
+
+def plot_drawdown(symbol):
+    """Calcule et affiche le drawdown maximum sous forme de graphique."""
+    fig = figure_drawdown(symbol)
+    max_drawdown = fig.layout.meta["max_drawdown"]
+
     st.markdown(f"### 📉 Drawdown Maximum - {symbol}")
     st.write(f"📉 **Drawdown Maximal : {max_drawdown:.2%}** (perte maximale observée depuis un sommet)")
     
     st.plotly_chart(fig, use_container_width=True)
 
-def plot_return_distribution(symbol):
-    """Affiche la distribution des rendements quotidiens avec un histogramme interactif."""
+@cached_figure()
+def figure_return_distribution(symbol):
+    """Construit la distribution des rendements quotidiens avec un histogramme interactif."""
     
     # Définition des couleurs pour chaque actif
     colors = {"BTC": "green", "GOLD": "gold", "SP500": "blue"}
     
     # Chargement des données
-    df = pd.read_csv(f"data/{symbol}.csv", index_col=0, parse_dates=True)
+    df = load_prices(symbol)
     df["Daily_Return"] = df["Close"].pct_change().dropna()
 
     # Création du graphique avec la couleur spécifique de l'actif
@@ -93,13 +120,16 @@ def plot_return_distribution(symbol):
                        labels={"Daily_Return": "Rendement"},
                        marginal="box", opacity=0.75,
                        color_discrete_sequence=[colors.get(symbol, "gray")])  # Couleur par défaut : gris
+    return fig
 
-    # Affichage avec Streamlit
-    st.plotly_chart(fig, use_container_width=True)
+def plot_return_distribution(symbol):
+    """Affiche la distribution des rendements quotidiens avec un histogramme interactif."""
+    st.plotly_chart(figure_return_distribution(symbol), use_container_width=True)
 
-def plot_daily_returns(symbol):
-    """Affiche les rendements quotidiens sous forme de courbe interactive."""
-    df = pd.read_csv(f"data/{symbol}.csv", index_col=0, parse_dates=True)
+@cached_figure()
+def figure_daily_returns(symbol):
+    """Construit les rendements quotidiens sous forme de courbe interactive."""
+    df = load_prices(symbol)
     df["Daily_Return"] = df["Close"].pct_change().dropna()
 
     fig = go.Figure()
@@ -111,17 +141,21 @@ def plot_daily_returns(symbol):
                       xaxis_title="Date",
                       yaxis_title="Rendement",
                       hovermode="x unified")
-    
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
-def plot_volatility():
-    """Affiche la volatilité annuelle des actifs sous forme de graphique interactif."""
+def plot_daily_returns(symbol):
+    """Affiche les rendements quotidiens sous forme de courbe interactive."""
+    st.plotly_chart(figure_daily_returns(symbol), use_container_width=True)
+
+@cached_figure(assets=("BTC", "SP500", "GOLD"))
+def figure_volatility():
+    """Construit la volatilité annuelle des actifs sous forme de graphique interactif."""
     assets = ["BTC", "SP500", "GOLD"]
     colors = {"BTC": "green", "SP500": "blue", "GOLD": "gold"}  # Définition des couleurs
     volatilities = []
     
     for asset in assets:
-        df = pd.read_csv(f"data/{asset}.csv", index_col=0, parse_dates=True)
+        df = load_prices(asset)
         daily_volatility = df["Close"].pct_change().std()
         annual_volatility = daily_volatility * np.sqrt(252)  # Conversion en volatilité annuelle
         volatilities.append(annual_volatility)
@@ -134,23 +168,119 @@ def plot_volatility():
                  text_auto='.2%', 
                  labels={"Volatilité Annuelle": "Volatilité (%)"},
                  color="Actifs", color_discrete_map=colors)  # Mapping des couleurs
-    
-    # Affichage avec Streamlit
+    return fig
+
+def plot_volatility():
+    """Affiche la volatilité annuelle des actifs sous forme de graphique interactif."""
+    st.plotly_chart(figure_volatility(), use_container_width=True)
+
+
+@cached_figure()
+def figure_garch_volatility(symbol, horizon=20, confidence_level=0.95):
+    """Volatilité conditionnelle GARCH(1,1) annualisée et sa prévision (VaR GARCH dans fig.layout.meta)."""
+    df = load_prices(symbol)
+    params = garch.fit_symbol(symbol)
+    volatility = garch.conditional_volatility(garch.log_returns(df["Close"]), params)
+    annualize = np.sqrt(metrics.TRADING_DAYS) / garch.SCALE
+    future = pd.bdate_range(df.index[-1], periods=horizon + 1)[1:]
+    forecast = np.sqrt(garch.forecast_variance(params, horizon)) * annualize
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=df.index[-len(volatility):], y=volatility * annualize,
+                             mode='lines', name="Volatilité conditionnelle", line=dict(color="blue")))
+    fig.add_trace(go.Scatter(x=future, y=forecast, mode='lines', name="Prévision",
+                             line=dict(color="red", dash="dash")))
+    fig.update_layout(title=f"📊 Volatilité GARCH(1,1) de {symbol}",
+                      xaxis_title="Date",
+                      yaxis_title="Volatilité annualisée",
+                      yaxis_tickformat=".0%",
+                      template="plotly_white",
+                      meta={"var_1d": garch.value_at_risk(params, confidence_level, 1),
+                            "var_horizon": garch.value_at_risk(params, confidence_level, horizon),
+                            "persistence": params["persistence"]})
+    return fig
+
+def plot_garch_volatility(symbol, horizon=20, confidence_level=0.95):
+    """Affiche la volatilité GARCH et la VaR conditionnelle qui en découle."""
+    fig = figure_garch_volatility(symbol, horizon, confidence_level)
+    meta = fig.layout.meta
+    st.markdown(f"### 📊 Volatilité conditionnelle (GARCH) - {symbol}")
+    st.write(f"🔻 VaR GARCH à {confidence_level*100:.0f}% : **{abs(meta['var_1d']):.2%}** sur une journée, "
+             f"**{abs(meta['var_horizon']):.2%}** sur {horizon} jours (persistance {meta['persistence']:.3f}).")
+    st.plotly_chart(fig, use_container_width=True)
+
+
+MONTE_CARLO_ASSETS = ("BTC", "SP500", "GOLD")
+
+
+@functools.lru_cache(maxsize=8)
+def _monte_carlo(method, n_paths, horizon, versions):
+    # Simulation jointe des actifs, mémorisée par paramètres et version des données.
+    # Lots simulés dans le processus du serveur : pas de fork depuis les threads
+    # de Streamlit (le pool de processus reste réservé à la ligne de commande).
+    return monte_carlo.simulate(MONTE_CARLO_ASSETS, horizon, n_paths, method, seed=42, max_workers=1)
+
+
+def monte_carlo_result(method="gbm", n_paths=100_000, horizon=252):
+    """Trajectoires Monte Carlo corrélées des actifs (voir monte_carlo.simulate)"""
+    versions = tuple(data_version(asset) for asset in MONTE_CARLO_ASSETS)
+    return _monte_carlo(method, n_paths, horizon, versions)
+
+
+@cached_figure(assets=MONTE_CARLO_ASSETS)
+def figure_monte_carlo(symbol, method="gbm", n_paths=100_000, horizon=252):
+    """Construit l'éventail de percentiles et la distribution des prix terminaux simulés."""
+    result = monte_carlo_result(method, n_paths, horizon)
+    j = result["symbols"].index(symbol)
+    fan = dict(zip(result["percentiles"], result["fan"][:, :, j]))
+    days = result["days"]
+
+    fig = sp.make_subplots(rows=1, cols=2, column_widths=[0.65, 0.35],
+                           subplot_titles=(f"Trajectoires simulées ({n_paths:,} chemins)".replace(",", " "),
+                                           f"Prix à {horizon} jours"))
+    fig.add_trace(go.Scatter(x=days, y=fan[95], mode="lines", line=dict(width=0), showlegend=False), row=1, col=1)
+    fig.add_trace(go.Scatter(x=days, y=fan[5], mode="lines", line=dict(width=0), fill="tonexty",
+                             fillcolor="rgba(255,0,0,0.15)", name="P5 – P95"), row=1, col=1)
+    fig.add_trace(go.Scatter(x=days, y=fan[75], mode="lines", line=dict(width=0), showlegend=False), row=1, col=1)
+    fig.add_trace(go.Scatter(x=days, y=fan[25], mode="lines", line=dict(width=0), fill="tonexty",
+                             fillcolor="rgba(255,0,0,0.35)", name="P25 – P75"), row=1, col=1)
+    fig.add_trace(go.Scatter(x=days, y=fan[50], mode="lines", line=dict(color="red"), name="Médiane"), row=1, col=1)
+
+    # Histogramme pré-agrégé : quelques dizaines de barres au lieu de 100 000 points
+    terminal = result["terminal"][:, j]
+    counts, edges = np.histogram(terminal, bins=60, range=tuple(np.percentile(terminal, [0.5, 99.5])))
+    fig.add_trace(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, marker_color="red", showlegend=False),
+                  row=1, col=2)
+
+    loss = 1 - np.percentile(terminal, 5) / result["s0"][j]
+    fig.update_layout(title=f"🎲 Monte Carlo {method.upper()} - {symbol}", hovermode="x unified",
+                      meta={"var_95": loss, "median": float(np.median(terminal))})
+    fig.update_xaxes(title_text="Jours", row=1, col=1)
+    fig.update_yaxes(title_text="Prix", row=1, col=1)
+    return fig
+
+def plot_monte_carlo(symbol, method="gbm", n_paths=100_000, horizon=252):
+    """Affiche la simulation Monte Carlo d'un actif et la perte au 5e percentile."""
+    fig = figure_monte_carlo(symbol, method, n_paths, horizon)
+    st.markdown(f"### 🎲 Simulation Monte Carlo - {symbol}")
+    st.write(f"🔻 Dans 5 % des scénarios, le prix perd plus de **{fig.layout.meta['var_95']:.2%}** "
+             f"en {horizon} jours (médiane simulée : {fig.layout.meta['median']:.2f}).")
     st.plotly_chart(fig, use_container_width=True)
 
 
-def load_data(file_path):
-    """Charge les données depuis un fichier CSV et calcule les rendements."""
-    df = pd.read_csv(file_path, index_col=0, parse_dates=True)
+def load_data(symbol):
+    """Charge les données d'un actif et calcule les rendements."""
+    df = load_prices(symbol)
     df['Return'] = df['Close'].pct_change()  # Rendement sous forme décimale
     return df
 
-def plot_annual_volatility():
-    """Affiche la volatilité annuelle des actifs (Bitcoin, S&P 500, Or) regroupée par année."""
+@cached_figure(assets=("SP500", "BTC", "GOLD"))
+def figure_annual_volatility():
+    """Construit la volatilité annuelle des actifs (Bitcoin, S&P 500, Or) regroupée par année."""
     # Chargement des données
-    df_sp500 = load_data("data/SP500.csv")
-    df_btc = load_data("data/BTC.csv")
-    df_gold = load_data("data/GOLD.csv")
+    df_sp500 = load_data("SP500")
+    df_btc = load_data("BTC")
+    df_gold = load_data("GOLD")
 
     # Resampling des données pour obtenir les rendements annuels
     df_sp500_annual_volatility = df_sp500['Return'].resample('Y').std()  # Calcul de la volatilité annuelle
@@ -190,16 +320,19 @@ def plot_annual_volatility():
             ticktext=[f'{i/100:.2f}' for i in range(int(df_volatility[['S&P 500', 'Bitcoin', 'Gold']].min().min()*100), int(df_volatility[['S&P 500', 'Bitcoin', 'Gold']].max().max()*100)+1)]
         )
     )
+    return fig
 
-    # Affichage avec Streamlit
-    st.plotly_chart(fig)
+def plot_annual_volatility():
+    """Affiche la volatilité annuelle des actifs (Bitcoin, S&P 500, Or) regroupée par année."""
+    st.plotly_chart(figure_annual_volatility())
 
-def plot_annual_returns():
-    """Affiche les rendements annuels des actifs (Bitcoin, S&P 500, Or) regroupés par année."""
+@cached_figure(assets=("SP500", "BTC", "GOLD"))
+def figure_annual_returns():
+    """Construit les rendements annuels des actifs (Bitcoin, S&P 500, Or) regroupés par année."""
     # Chargement des données
-    df_sp500 = load_data("data/SP500.csv")
-    df_btc = load_data("data/BTC.csv")
-    df_gold = load_data("data/GOLD.csv")
+    df_sp500 = load_data("SP500")
+    df_btc = load_data("BTC")
+    df_gold = load_data("GOLD")
 
     # Resampling des données pour obtenir les rendements annuels
     df_sp500_annual_returns = df_sp500['Return'].resample('Y').sum()  # Somme des rendements annuels
@@ -234,9 +367,11 @@ def plot_annual_returns():
         template="plotly_white",
         showlegend=True
     )
+    return fig
 
-    # Affichage avec Streamlit
-    st.plotly_chart(fig)
+def plot_annual_returns():
+    """Affiche les rendements annuels des actifs (Bitcoin, S&P 500, Or) regroupés par année."""
+    st.plotly_chart(figure_annual_returns())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,15 @@
+import os
+import sys
+
+import pytest
+
+# Les modules du projet sont à la racine du dépôt
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(autouse=True)
+def _repo_root(monkeypatch):
+    """Chemins relatifs du projet (data/, results/) résolus depuis la racine du dépôt"""
+    monkeypatch.chdir(ROOT)
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import backtest_optimization
+import vector_backtest
+from price_store import load_prices
+
+SHORT, LONG = (5, 10, 20), (20, 50)
+
+
+def test_sweep_matches_single_runs():
+    symbols = ["SP500", "GOLD"]
+    results = backtest_optimization.sweep(symbols, SHORT, LONG, max_workers=2)
+    assert len(results) == len(symbols) * len(backtest_optimization.parameter_grid(SHORT, LONG))
+    assert results["sharpe_ratio"].is_monotonic_decreasing
+    for row in results.itertuples():
+        stats = vector_backtest.run_vectorized(load_prices(row.symbol), row.short_window, row.long_window)["stats"]
+        assert row.final_value == pytest.approx(stats["final_value"], rel=1e-12)
+        assert row.trades == stats["trades"]
+        assert row.max_drawdown == pytest.approx(stats["max_drawdown"], rel=1e-12, nan_ok=True)
+
+    best = backtest_optimization.best_parameters(results)
+    assert list(best.index) == list(dict.fromkeys(results["symbol"]))
+
+
+def test_rank_results_rejects_unknown_key():
+    with pytest.raises(ValueError):
+        backtest_optimization.rank_results(pd.DataFrame({"sharpe_ratio": [1.0]}), "sortino")
+
+
+def test_walk_forward_windows():
+    windows = backtest_optimization.walk_forward_windows(1000, 500, 100)
+    assert windows[0] == ((0, 500), (500, 600))
+    assert all(test[0] == previous[1][1] for previous, (_, test) in zip(windows, windows[1:]))
+    assert windows[-1][1][1] <= 1000
+    with pytest.raises(ValueError):
+        backtest_optimization.walk_forward_windows(1000, 500, 100, step=50)
+
+
+def _walk_forward(monkeypatch, df):
+    monkeypatch.setattr(backtest_optimization, "load_prices", lambda symbol: df)
+    return backtest_optimization.walk_forward("SP500", train_size=300, test_size=100, short_windows=SHORT,
+                                              long_windows=LONG, max_workers=2)
+
+
+def test_walk_forward_stitches_test_segments(monkeypatch):
+    df = load_prices("SP500")
+    result = _walk_forward(monkeypatch, df)
+    windows, equity = result["windows"], result["equity"]
+    assert len(equity) == 100 * len(windows)
+    assert equity.index.is_monotonic_increasing and equity.index[0] == windows["test_start"].iloc[0]
+    growth = np.prod(1 + windows["test_total_return"].to_numpy())
+    assert result["stats"]["total_return"] == pytest.approx(growth - 1, rel=1e-10)
+
+
+def test_walk_forward_has_no_look_ahead(monkeypatch):
+    df = load_prices("SP500")
+    full = _walk_forward(monkeypatch, df)["windows"]
+    # Les barres postérieures au 2e test n'influencent ni les choix ni les résultats des deux premières fenêtres
+    cut = _walk_forward(monkeypatch, df.iloc[:300 + 2 * 100])["windows"]
+    pd.testing.assert_frame_equal(cut, full.iloc[:2])
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import backtest_store
+from price_store import load_prices
+from vector_backtest import run_vectorized
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(backtest_store, "RESULTS_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_round_trip_is_memory_mapped(store):
+    df = load_prices("BTC")
+    params = {"short_window": 20, "long_window": 50}
+    first = backtest_store.cached_run("BTC", df, "sma_crossover", params, lambda: run_vectorized(df, 20, 50))
+    stored = backtest_store.cached_run("BTC", df, "sma_crossover", params, lambda: pytest.fail("relu attendu"))
+
+    pd.testing.assert_series_equal(stored["equity"], first["equity"], check_names=False, check_freq=False)
+    pd.testing.assert_series_equal(stored["positions"], first["positions"], check_names=False,
+                                   check_freq=False, check_dtype=False)
+    assert len(stored["trades"]) == len(first["trades"])
+    # Vue sur le tableau Arrow du fichier projeté en mémoire, pas une copie
+    base = stored["equity"].to_numpy()
+    while isinstance(base, np.ndarray):
+        base = base.base
+    assert type(base).__module__.startswith("pyarrow")
+
+
+def test_key_depends_on_symbol():
+    digest = "0" * 64
+    params = {"short_window": 20, "long_window": 50}
+    assert (backtest_store.result_key("BTC", "sma_crossover", params, digest)
+            != backtest_store.result_key("GOLD", "sma_crossover", params, digest))
+
+
+def test_run_backtest_persists_only_on_request(store):
+    pytest.importorskip("backtrader")
+    from backtest import run_backtest
+
+    plain = run_backtest("GOLD")
+    assert not any(store.iterdir())                 # calcul pur par défaut : rien n'est écrit
+    stored = run_backtest("GOLD", use_store=True)
+    assert any(store.iterdir())
+    pd.testing.assert_frame_equal(stored["trades"], plain["trades"])
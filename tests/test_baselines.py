@@ -0,0 +1,131 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import baselines
+
+
+def _close(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    return 100 + 0.1 * np.arange(n) + np.cumsum(rng.normal(size=n))
+
+
+def _holt_sse(y, alpha, beta, phi):
+    level, trend, sse = y[0], y[1] - y[0], 0.0
+    for value in y[1:]:
+        error = value - (level + phi * trend)
+        sse += error * error
+        level, trend = level + phi * trend + alpha * error, phi * trend + alpha * beta * error
+    return sse, level, trend
+
+
+def test_future_dates_follow_the_asset_calendar():
+    daily = pd.date_range("2025-01-01", periods=30, freq="D")
+    business = pd.bdate_range("2025-01-01", periods=30)
+    assert (baselines.future_dates(daily, 10) == pd.date_range(daily[-1], periods=11, freq="D")[1:]).all()
+    assert (baselines.future_dates(business, 10).dayofweek < 5).all()
+    assert baselines.future_dates(business, 10)[0] > business[-1]
+
+
+def test_holt_grid_matches_scalar_smoothing():
+    close = _close()
+    dates = pd.bdate_range("2026-01-01", periods=20)
+    forecast = baselines.holt(close, dates)
+    y = close[-baselines.TREND_WINDOW:]
+    alpha, beta, phi = baselines._holt_grid()
+    sse = np.array([_holt_sse(y, a, b, p)[0] for a, b, p in zip(alpha, beta, phi)])
+    best = np.argmin(sse)
+    _, level, trend = _holt_sse(y, alpha[best], beta[best], phi[best])
+    h = np.arange(1, len(dates) + 1)
+    expected = level + np.cumsum(phi[best] ** h) * trend
+    np.testing.assert_allclose(forecast["yhat"].to_numpy(), expected, rtol=1e-12)
+    assert (forecast["yhat_lower"] < forecast["yhat"]).all() and (forecast["yhat"] < forecast["yhat_upper"]).all()
+
+
+def test_linear_trend_matches_ols_prediction_interval():
+    import statsmodels.api as sm
+
+    close = _close()
+    dates = pd.bdate_range("2026-01-01", periods=15)
+    forecast = baselines.linear_trend(close, dates)
+    y = close[-baselines.TREND_WINDOW:]
+    x = np.arange(len(y), dtype=np.float64)
+    fitted = sm.OLS(y, sm.add_constant(x)).fit()
+    x_future = len(y) - 1 + np.arange(1, len(dates) + 1)
+    frame = fitted.get_prediction(sm.add_constant(x_future)).summary_frame(alpha=0.05)
+    np.testing.assert_allclose(forecast["yhat"].to_numpy(), frame["mean"].to_numpy(), rtol=1e-10)
+    # Quantile normal au lieu du quantile de Student : écart relatif < 0,5 % avec 250 points
+    np.testing.assert_allclose(forecast["yhat_upper"].to_numpy(), frame["obs_ci_upper"].to_numpy(), rtol=5e-3)
+
+
+def test_drift_uses_the_end_to_end_slope():
+    close = 50 + 2.0 * np.arange(100) + np.tile([0.0, 0.1], 50)
+    dates = pd.date_range("2026-01-01", periods=5, freq="D")
+    forecast = baselines.drift(close, dates)
+    slope = (close[-1] - close[0]) / 99
+    assert forecast["yhat"].to_numpy() == pytest.approx(close[-1] + slope * np.arange(1, 6), rel=1e-12)
+    spread = (forecast["yhat_upper"] - forecast["yhat"]).to_numpy()
+    assert (np.diff(spread) > 0).all()
+
+
+def _empty_store(tmp_path, monkeypatch):
+    """forecast_store et forecast_service redirigés vers des dossiers vides ; renvoie le chemin du stockage"""
+    import functools
+
+    import forecast_service
+    import forecast_store
+
+    path = str(tmp_path / "forecasts.parquet")
+    for name in ("load_forecast", "forecast_data_version"):
+        monkeypatch.setattr(forecast_store, name, functools.partial(getattr(forecast_store, name), path=path))
+    monkeypatch.setattr(forecast_service, "FORECASTS_DIR", str(tmp_path / "forecasts"))
+    return path
+
+
+def test_tiered_forecast_runs_one_refit_at_a_time(tmp_path, monkeypatch):
+    import threading
+
+    import forecast_service
+
+    _empty_store(tmp_path, monkeypatch)
+    monkeypatch.setattr(baselines, "_refreshing", set())
+    monkeypatch.setattr(baselines, "_attempted", {})
+    release, calls = threading.Event(), []
+
+    def slow_refit(symbol, periods):
+        calls.append(symbol)
+        release.wait(10)
+
+    monkeypatch.setattr(forecast_service, "get_forecast", slow_refit)
+    for _ in range(5):
+        forecast, model = baselines.tiered_forecast("GOLD")
+        assert model == "holt" and len(forecast) == forecast_service.FORECAST_PERIODS
+        baselines.tiered_forecast("BTC")                 # plafond MAX_REFITS atteint : pas de second thread
+    assert calls == ["GOLD"] and baselines.refit_pending("GOLD") and not baselines.refit_pending("BTC")
+
+    release.set()
+    for thread in threading.enumerate():
+        if thread.name == "prophet-GOLD":
+            thread.join(5)
+    assert not baselines.refit_pending("GOLD")
+    baselines.tiered_forecast("GOLD")                    # même version des prix : pas de nouvel essai
+    baselines.tiered_forecast("BTC")
+    assert calls == ["GOLD", "BTC"]
+
+
+def test_tiered_forecast_uses_store_only_for_current_prices(tmp_path, monkeypatch):
+    import forecast_store
+    from price_store import data_version
+
+    path = _empty_store(tmp_path, monkeypatch)
+    monkeypatch.setattr(baselines, "_start_refit", lambda symbol, periods: None)
+    stored = baselines.baseline_forecast("GOLD", "drift", periods=5)
+
+    forecast_store.write_forecasts([stored.assign(symbol="GOLD", model="prophet",
+                                                  data_version=forecast_store.encode_version(("autre", 0, 0)))], path)
+    assert baselines.tiered_forecast("GOLD")[1] == "holt"
+    forecast_store.write_forecasts([stored.assign(symbol="GOLD", model="prophet",
+                                                  data_version=forecast_store.encode_version(data_version("GOLD")))],
+                                   path)
+    forecast, model = baselines.tiered_forecast("GOLD")
+    assert model == "prophet" and len(forecast) == 5
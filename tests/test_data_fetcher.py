@@ -0,0 +1,119 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import data_fetcher
+import price_store
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(price_store, "DATA_DIR", str(tmp_path / "data"))
+    os.makedirs(price_store.DATA_DIR)
+    price_store.invalidate()
+    yield tmp_path
+    price_store.invalidate()
+
+
+def _history(days=60, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2024-01-01", periods=days, freq="B", name="Date")
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, days)))
+    return pd.DataFrame({"Open": close * 0.999, "High": close * 1.01, "Low": close * 0.99,
+                         "Close": close, "Volume": rng.integers(1000, 5000, days).astype(float)}, index=index)
+
+
+def _mirror(directory, ticker, df):
+    os.makedirs(directory, exist_ok=True)
+    df.to_csv(os.path.join(directory, f"{ticker}.csv"))
+    return data_fetcher.CsvSource(str(directory))
+
+
+def _assert_stored(symbol, expected):
+    # Copie binaire et CSV doivent tous deux contenir l'historique attendu
+    pd.testing.assert_frame_equal(price_store.load_prices(symbol), expected, check_freq=False, check_dtype=False)
+    csv = pd.read_csv(price_store.price_path(symbol), index_col=0, parse_dates=True)
+    pd.testing.assert_frame_equal(csv, expected, check_freq=False, check_dtype=False)
+
+
+def test_full_fetch_from_csv_source(data_dir):
+    history = _history()
+    data_fetcher.fetch_data("BTC", source=_mirror(data_dir / "mirror", "BTC-USD", history))
+    _assert_stored("BTC", history)
+
+
+def test_incremental_appends_and_corrects_partial_bar(data_dir):
+    history = _history()
+    partial = history.iloc[:50].copy()
+    partial.iloc[-1, partial.columns.get_loc("Close")] *= 1.03  # barre intrajournalière
+    price_store.save_prices("BTC", partial)
+
+    source = _mirror(data_dir / "mirror", "BTC-USD", history)
+    data_fetcher.fetch_data("BTC", incremental=True, source=source)
+    _assert_stored("BTC", history)
+
+
+def test_incremental_up_to_date_does_not_rewrite(data_dir):
+    history = _history()
+    price_store.save_prices("BTC", history)
+    before = os.stat(price_store.price_path("BTC")).st_mtime_ns
+    data_fetcher.fetch_data("BTC", incremental=True, source=_mirror(data_dir / "mirror", "BTC-USD", history))
+    assert os.stat(price_store.price_path("BTC")).st_mtime_ns == before
+
+
+def test_append_replaces_overlapping_tail(data_dir):
+    history = _history(days=3000)  # plusieurs blocs de lecture de fin de fichier
+    price_store.save_prices("GOLD", history.iloc[:2990])
+    revised = history.iloc[2980:].copy()
+    revised["Close"] += 1.0
+    price_store.append_prices("GOLD", revised)
+    _assert_stored("GOLD", pd.concat([history.iloc[:2980], revised]))
+
+
+class _FlakySource:
+    """Échoue `failures` fois par ticker avant de servir le miroir CSV"""
+
+    def __init__(self, source, failures):
+        self.source = source
+        self.failures = dict(failures)
+        self.calls = []
+
+    def __call__(self, ticker, start=None):
+        self.calls.append(ticker)
+        if self.failures.get(ticker, 0) > 0:
+            self.failures[ticker] -= 1
+            raise ConnectionError("réseau indisponible")
+        return self.source(ticker, start=start)
+
+
+def test_fetch_many_retries_with_backoff(data_dir):
+    mirror = data_dir / "mirror"
+    for symbol, seed in (("BTC", 0), ("SP500", 1), ("GOLD", 2)):
+        _mirror(mirror, data_fetcher.ASSETS[symbol], _history(seed=seed))
+    source = _FlakySource(data_fetcher.CsvSource(str(mirror)), {"^GSPC": 2, "GC=F": 10})
+    sleeps = []
+    report = data_fetcher.fetch_many(max_workers=3, retries=3, backoff=0.5, source=source, sleep=sleeps.append)
+
+    assert set(report) == set(data_fetcher.ASSETS)  # taux de change hors de la liste par défaut
+    assert report["BTC"]["ok"] and report["BTC"]["tentatives"] == 1
+    assert report["SP500"]["ok"] and report["SP500"]["tentatives"] == 3
+    assert not report["GOLD"]["ok"] and report["GOLD"]["tentatives"] == 4
+    assert "ConnectionError" in report["GOLD"]["erreur"]
+    assert sorted(sleeps) == sorted([0.5, 1.0] + [0.5, 1.0, 2.0])
+    _assert_stored("SP500", _history(seed=1))
+
+
+def test_rate_limiter_spaces_calls():
+    now = [0.0]
+
+    def sleep(seconds):
+        now[0] += seconds
+
+    limiter = data_fetcher.RateLimiter(4, clock=lambda: now[0], sleep=sleep)
+    starts = []
+    for _ in range(5):
+        limiter.wait()
+        starts.append(now[0])
+    assert starts == pytest.approx([0.0, 0.25, 0.5, 0.75, 1.0])
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import features
+import price_store
+from price_store import load_prices
+
+
+@pytest.mark.parametrize("symbol", ["BTC", "GOLD", "SP500"])
+@pytest.mark.parametrize("new_bars", [1, 7, 40])
+def test_extension_matches_full_rebuild(symbol, new_bars):
+    df = load_prices(symbol)
+    full, full_state = features.build_features(df)
+    head, state = features.build_features(df.iloc[:-new_bars])
+    extended, extended_state = features.extend_features(head, state, df)
+    pd.testing.assert_frame_equal(extended, full, check_freq=False)
+    # États des EMA : récurrence en flux contre noyau pandas, à l'arrondi près
+    macd, full_macd = extended_state.pop("macd")["state"], full_state.pop("macd")["state"]
+    for name in ("fast", "slow", "signal"):
+        assert macd[name]["value"] == pytest.approx(full_macd[name]["value"], rel=1e-12)
+    assert extended_state == full_state
+
+
+def test_features_use_only_past_bars():
+    df = load_prices("BTC")
+    full, _ = features.build_features(df)
+    cut = 600
+    past, _ = features.build_features(df.iloc[:cut])
+    pd.testing.assert_frame_equal(past[features.FEATURES], full[features.FEATURES].iloc[:cut], check_freq=False)
+    # La cible de la barre t est le rendement de t à t+1
+    expected = np.log(df["Close"].shift(-1) / df["Close"]).to_numpy(dtype=np.float32)
+    np.testing.assert_allclose(full["target_return"].to_numpy(), expected, rtol=1e-6, equal_nan=True)
+    assert (full.dtypes == np.float32).all()
+
+
+def test_load_features_extends_stored_history(tmp_path, monkeypatch):
+    history = load_prices("GOLD")
+    monkeypatch.setattr(price_store, "DATA_DIR", str(tmp_path / "data"))
+    monkeypatch.setattr(features, "FEATURES_DIR", str(tmp_path / "features"))
+    monkeypatch.setattr(features, "_cache", {})
+    (tmp_path / "data").mkdir()
+    price_store.invalidate()
+    price_store.save_prices("GOLD", history.iloc[:-5])
+    features.load_features("GOLD")
+
+    # Nouveau processus : relu depuis results/features puis étendu, sans reconstruction
+    monkeypatch.setattr(features, "_cache", {})
+    price_store.append_prices("GOLD", history.iloc[-5:])
+    calls = []
+    build = features.build_features
+    monkeypatch.setattr(features, "build_features", lambda d: calls.append(len(d)) or build(d))
+    frame = features.load_features("GOLD")
+    assert calls == []
+    expected, _ = build(price_store.load_prices("GOLD"))
+    pd.testing.assert_frame_equal(frame, expected, check_freq=False)
+    assert features.load_features("GOLD") is frame
+    price_store.invalidate()
@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import pytest
+
+import figure_cache
+import price_store
+
+
+def _bars(days=5, close=1.0):
+    index = pd.date_range("2024-01-01", periods=days, freq="D", name="Date")
+    return pd.DataFrame({"Open": close, "High": close, "Low": close, "Close": close, "Volume": 0}, index=index)
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(price_store, "DATA_DIR", str(tmp_path))
+    price_store.invalidate()
+    figure_cache.clear_cache()
+    for symbol in ("BTC", "GOLD"):
+        _bars().to_csv(tmp_path / f"{symbol}.csv")
+    yield tmp_path
+    figure_cache.clear_cache()
+    price_store.invalidate()
+
+
+def _counter():
+    calls = []
+
+    def plot(symbol, points=10):
+        calls.append((symbol, points))
+        return go.Figure(go.Scatter(y=np.zeros(points)))
+    return calls, plot
+
+
+def _delta(before):
+    after = figure_cache.cache_stats()
+    return {key: after[key] - before[key] for key in ("hits", "misses", "evictions")}
+
+
+def test_hit_on_rerun_and_miss_after_data_change(cache):
+    calls, plot = _counter()
+    plot = figure_cache.cached_figure()(plot)
+    before = figure_cache.cache_stats()
+
+    first = plot("BTC")
+    assert plot("BTC") is first                      # rerun Streamlit : même figure, sans recalcul
+    assert plot("BTC", points=20) is not first       # autres paramètres : autre entrée
+    assert len(calls) == 2
+    assert _delta(before) == {"hits": 1, "misses": 2, "evictions": 0}
+
+    _bars(days=6).to_csv(cache / "BTC.csv")          # nouvelles cotations : data_version change
+    assert plot("BTC") is not first
+    assert len(calls) == 3
+    assert _delta(before) == {"hits": 1, "misses": 3, "evictions": 0}
+
+
+def test_multi_asset_key_follows_every_asset(cache):
+    calls, plot = _counter()
+    plot = figure_cache.cached_figure(assets=("BTC", "GOLD"))(plot)
+    plot("all")
+    plot("all")
+    _bars(days=7).to_csv(cache / "GOLD.csv")         # un seul des actifs change
+    plot("all")
+    assert len(calls) == 2
+
+
+def test_lru_eviction_at_capacity(cache, monkeypatch):
+    monkeypatch.setattr(figure_cache, "MAX_ENTRIES", 2)
+    calls, plot = _counter()
+    plot = figure_cache.cached_figure()(plot)
+    before = figure_cache.cache_stats()
+
+    plot("BTC", points=1)
+    plot("BTC", points=2)
+    plot("BTC", points=1)                            # points=1 redevient le plus récent
+    plot("BTC", points=3)                            # évince points=2, le moins récemment utilisé
+    assert figure_cache.cache_stats()["entries"] == 2
+    plot("BTC", points=1)
+    plot("BTC", points=2)
+    assert calls == [("BTC", 1), ("BTC", 2), ("BTC", 3), ("BTC", 2)]
+    assert _delta(before) == {"hits": 2, "misses": 4, "evictions": 2}
+
+
+def test_byte_budget_and_stats(cache, monkeypatch):
+    _, plot = _counter()
+    plot = figure_cache.cached_figure()(plot)
+    plot("BTC", points=100)
+    assert figure_cache.cache_stats()["bytes"] == 100 * 8
+
+    monkeypatch.setattr(figure_cache, "MAX_BYTES", 150 * 8)
+    plot("BTC", points=100)                          # succès : pas d'éviction
+    plot("BTC", points=60)                           # 160 valeurs > budget : la plus ancienne part
+    stats = figure_cache.cache_stats()
+    assert stats["entries"] == 1 and stats["bytes"] == 60 * 8
+
+    figure_cache.clear_cache()
+    assert figure_cache.cache_stats()["entries"] == 0 and figure_cache.cache_stats()["bytes"] == 0
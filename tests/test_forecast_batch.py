@@ -0,0 +1,92 @@
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from conftest import ROOT
+
+SCRIPT = """
+import os
+import subprocess
+import forecast_batch
+
+def slow(symbol, periods, models):
+    subprocess.run(["sleep", "6"])  # ajustement long, dans un processus enfant comme cmdstan
+    return symbol, None, {}
+
+forecast_batch.forecast_symbol = slow
+if __name__ == "__main__":
+    print(forecast_batch.run_batch(["BTC", "SP500", "GOLD"], max_workers=2, deadline=1)[2])
+"""
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="fork et groupes de processus POSIX")
+def test_deadline_stops_workers(tmp_path):
+    script = tmp_path / "batch.py"
+    script.write_text(SCRIPT)
+    start = time.monotonic()
+    result = subprocess.run([sys.executable, str(script)], cwd=ROOT, capture_output=True, text=True,
+                            env={**os.environ, "PYTHONPATH": ROOT}, timeout=30)
+    elapsed = time.monotonic() - start
+    assert result.returncode == 0, result.stderr
+    assert "['BTC', 'SP500', 'GOLD']" in result.stdout
+    # Sans arrêt des processus, la sortie attendait les trois ajustements (≈ 12 s avec 2 processus)
+    assert elapsed < 5
+
+
+def _pid_and_group():
+    return os.getpid(), os.getpgid(0)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="groupes de processus POSIX")
+def test_terminate_stops_published_process_groups():
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    import forecast_batch
+
+    pids = multiprocessing.SimpleQueue()
+    with ProcessPoolExecutor(1, initializer=forecast_batch._limit_worker, initargs=(0, pids)) as pool:
+        pid, group = pool.submit(_pid_and_group).result()
+        assert pid == group                                     # groupe propre au processus
+        assert pids.get() == pid
+        pids.put(pid)
+        forecast_batch._terminate(pids)
+        assert pids.empty()
+        with pytest.raises(Exception):                          # processus arrêté : pool cassé
+            pool.submit(_pid_and_group).result(timeout=10)
+
+    done = subprocess.Popen(["true"], start_new_session=True)
+    done.wait()
+    pids.put(done.pid)                                          # groupe déjà terminé : ignoré
+    forecast_batch._terminate(pids)
+
+
+def _thread_counts():
+    from threadpoolctl import threadpool_info
+
+    return [pool["num_threads"] for pool in threadpool_info()]
+
+
+def test_worker_blas_single_thread():
+    pytest.importorskip("threadpoolctl")
+    from concurrent.futures import ProcessPoolExecutor
+
+    import numpy  # noqa: F401  BLAS chargé avant le fork, comme dans forecast_batch
+
+    import forecast_batch
+
+    with ProcessPoolExecutor(1, initializer=forecast_batch._limit_worker, initargs=(0,)) as pool:
+        assert set(pool.submit(_thread_counts).result()) <= {1}
+
+
+def test_drift_records_the_price_version():
+    import forecast_batch
+    import forecast_store
+    from price_store import data_version
+
+    symbol, frame, errors = forecast_batch.forecast_symbol("GOLD", 5, ("drift",))
+    assert not errors and len(frame) == 5
+    assert set(frame["data_version"]) == {forecast_store.encode_version(data_version("GOLD"))}
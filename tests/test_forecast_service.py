@@ -0,0 +1,107 @@
+import json
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+import forecast_service
+import price_store
+from conftest import ROOT
+from price_store import data_version, load_prices
+
+
+@pytest.fixture
+def dirs(tmp_path, monkeypatch):
+    monkeypatch.setattr(forecast_service, "FORECASTS_DIR", str(tmp_path / "forecasts"))
+    monkeypatch.setattr(forecast_service, "MODELS_DIR", str(tmp_path / "models"))
+    return tmp_path
+
+
+@pytest.fixture
+def data(dirs, monkeypatch):
+    """Copie de data/ (prix et prévisions livrées de GOLD) dans un dossier temporaire"""
+    data_dir = dirs / "data"
+    data_dir.mkdir()
+    for name in ("GOLD.csv", "GOLD_forecast.csv"):
+        shutil.copy(os.path.join(ROOT, "data", name), data_dir / name)
+    monkeypatch.setattr(price_store, "DATA_DIR", str(data_dir))
+    monkeypatch.setattr(forecast_service, "DATA_DIR", str(data_dir))
+    price_store.invalidate()
+    yield data_dir
+    price_store.invalidate()
+
+
+def _forecast(symbol, periods=5):
+    last = load_prices(symbol).index[-1]
+    ds = pd.date_range(last, periods=periods + 1, freq="D")[1:]
+    return pd.DataFrame({"ds": ds, "yhat": 1.0, "yhat_lower": 0.5, "yhat_upper": 1.5})
+
+
+def test_shipped_csv_until_refit(dirs):
+    assert forecast_service.forecast_path("BTC") == os.path.join(forecast_service.DATA_DIR, "BTC_forecast.csv")
+
+    output = dirs / "forecasts" / "BTC.csv"
+    output.parent.mkdir()
+    _forecast("BTC").to_csv(output, index=False)
+    (dirs / "forecasts" / "BTC.json").write_text(json.dumps({"data_version": list(data_version("BTC"))}))
+    assert forecast_service.forecast_path("BTC") == str(output)
+    assert forecast_service.is_fresh("BTC")
+    assert len(forecast_service.load_forecast("BTC")) == 5
+
+    (dirs / "forecasts" / "BTC.json").write_text(json.dumps({"data_version": ["autre"]}))
+    assert not forecast_service.is_fresh("BTC")
+
+
+def test_shipped_csv_is_never_fresh(data):
+    # Un checkout donne au CSV livré une date plus récente que les prix : sans version enregistrée, périmé
+    shipped = data / "GOLD_forecast.csv"
+    later = os.stat(data / "GOLD.csv").st_mtime_ns + 10**12
+    os.utime(shipped, ns=(later, later))
+    assert forecast_service.fitted_version("GOLD") is None
+    assert not forecast_service.is_fresh("GOLD")
+    assert forecast_service.get_forecast("GOLD", refresh=False) is not None
+
+
+def test_refit_records_price_version(data, monkeypatch):
+    fits = []
+
+    def fake_fit(symbol, history, periods):  # remplace Prophet : dernière valeur prolongée
+        fits.append(len(history))
+        ds = pd.date_range(history["ds"].iloc[0], periods=len(history) + periods, freq="D")
+        last = history["y"].iloc[-1]
+        return pd.DataFrame({"ds": ds, "yhat": last, "yhat_lower": last - 1, "yhat_upper": last + 1}), False
+
+    monkeypatch.setattr(forecast_service, "_fit_prophet", fake_fit)
+    forecast = forecast_service.get_forecast("GOLD", periods=5)
+    assert len(forecast) == fits[0] + 5
+    assert forecast_service.fitted_version("GOLD") == list(data_version("GOLD"))
+    assert forecast_service.is_fresh("GOLD")
+    forecast_service.get_forecast("GOLD", periods=5)
+    assert len(fits) == 1                                    # à jour : pas de réajustement
+
+    price_store.save_prices("GOLD", load_prices("GOLD").iloc[:-1])
+    assert not forecast_service.is_fresh("GOLD")
+    forecast_service.get_forecast("GOLD", periods=5)
+    assert fits == [fits[0], fits[0] - 1]
+    assert forecast_service.is_fresh("GOLD")
+
+
+def test_missing_prophet_keeps_stored_forecast(data, monkeypatch):
+    def no_prophet(symbol, history, periods):
+        raise ImportError("prophet")
+
+    monkeypatch.setattr(forecast_service, "_fit_prophet", no_prophet)
+    shipped = pd.read_csv(data / "GOLD_forecast.csv", usecols=forecast_service.FORECAST_COLUMNS, parse_dates=["ds"])
+    pd.testing.assert_frame_equal(forecast_service.get_forecast("GOLD"), shipped)
+
+
+def test_refit_writes_outside_data(dirs):
+    pytest.importorskip("prophet")
+    before = {name: os.stat(os.path.join(forecast_service.DATA_DIR, name)).st_mtime_ns
+              for name in os.listdir(forecast_service.DATA_DIR)}
+    forecast_service.refit("GOLD", periods=5)
+    after = {name: os.stat(os.path.join(forecast_service.DATA_DIR, name)).st_mtime_ns
+             for name in os.listdir(forecast_service.DATA_DIR)}
+    assert before == after
+    assert (dirs / "forecasts" / "GOLD.csv").exists() and (dirs / "models" / "GOLD.json").exists()
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+import forecast_store
+
+
+def _forecast(start, periods, level):
+    ds = pd.date_range(start, periods=periods, freq="D")
+    yhat = level + np.arange(periods, dtype=np.float64)
+    return pd.DataFrame({"ds": ds, "yhat": yhat, "yhat_lower": yhat - 1, "yhat_upper": yhat + 1})
+
+
+def test_round_trip_and_replacement(tmp_path):
+    path = str(tmp_path / "forecasts.parquet")
+    btc, gold = _forecast("2025-01-01", 30, 100.0), _forecast("2025-01-01", 30, 2000.0)
+    forecast_store.write_forecasts([btc.assign(symbol="BTC", model="prophet"),
+                                    gold.assign(symbol="GOLD", model="prophet")], path)
+
+    loaded = forecast_store.load_forecast("BTC", "prophet", path)
+    assert list(loaded.columns) == ["ds"] + forecast_store.VALUE_COLUMNS
+    assert (loaded[forecast_store.VALUE_COLUMNS].dtypes == np.float32).all()
+    pd.testing.assert_frame_equal(loaded, btc.astype({c: np.float32 for c in forecast_store.VALUE_COLUMNS}),
+                                  check_dtype=False)
+
+    # Nouvelle prévision BTC : remplace l'ancienne, GOLD est conservé
+    updated = _forecast("2025-02-01", 10, 150.0)
+    assert forecast_store.write_forecasts([updated.assign(symbol="BTC", model="prophet")], path) == 40
+    assert len(forecast_store.load_forecast("BTC", "prophet", path)) == 10
+    assert forecast_store.load_forecast("BTC", "prophet", path)["ds"].iloc[0] == pd.Timestamp("2025-02-01")
+    assert len(forecast_store.load_forecast("GOLD", "prophet", path)) == 30
+    assert forecast_store.load_forecast("GOLD", "holt", path) is None
+
+    summary = forecast_store.list_forecasts(path).set_index("symbol")
+    assert summary.loc["BTC", "points"] == 10 and summary.loc["GOLD", "points"] == 30
+
+
+def test_missing_store_is_empty(tmp_path):
+    path = str(tmp_path / "absent.parquet")
+    assert forecast_store.read_store(path).empty
+    assert forecast_store.load_forecast("BTC", path=path) is None
+
+
+def test_store_is_read_once_per_version(tmp_path, monkeypatch):
+    path = str(tmp_path / "forecasts.parquet")
+    forecast_store.write_forecasts([_forecast("2025-01-01", 5, 1.0).assign(symbol="BTC", model="prophet")], path)
+    reads = []
+    read_parquet = pd.read_parquet
+    monkeypatch.setattr(pd, "read_parquet", lambda *args, **kwargs: reads.append(1) or read_parquet(*args, **kwargs))
+    forecast_store.read_store(path)
+    forecast_store.read_store(path)
+    assert len(reads) == 1
+
+
+def test_price_version_is_kept_per_forecast(tmp_path):
+    path = str(tmp_path / "forecasts.parquet")
+    version = ("BTC.csv", 123, 456)
+    forecast_store.write_forecasts([
+        _forecast("2025-01-01", 5, 1.0).assign(symbol="BTC", model="prophet",
+                                               data_version=forecast_store.encode_version(version)),
+        _forecast("2025-01-01", 5, 1.0).assign(symbol="GOLD", model="prophet")], path)
+    assert forecast_store.forecast_data_version("BTC", "prophet", path) == list(version)
+    assert forecast_store.forecast_data_version("GOLD", "prophet", path) is None
+    assert forecast_store.forecast_data_version("BTC", "holt", path) is None
+
+    # Stockage écrit avant la colonne data_version : versions inconnues, remplacement inchangé
+    old = str(tmp_path / "old.parquet")
+    forecast_store.read_store(path).drop(columns="data_version").to_parquet(old, index=False)
+    assert forecast_store.forecast_data_version("BTC", "prophet", old) is None
+    forecast_store.write_forecasts([_forecast("2025-02-01", 3, 2.0).assign(
+        symbol="BTC", model="prophet", data_version=forecast_store.encode_version(version))], old)
+    assert forecast_store.forecast_data_version("BTC", "prophet", old) == list(version)
+    assert len(forecast_store.load_forecast("GOLD", "prophet", old)) == 5
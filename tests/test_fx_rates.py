@@ -0,0 +1,103 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import fx_rates
+import price_store
+
+
+def _ohlcv(index, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(size=len(index)))
+    return pd.DataFrame({"Open": close - 0.5, "High": close + 1, "Low": close - 1, "Close": close,
+                         "Volume": rng.integers(1, 100, len(index)).astype(float)}, index=index)
+
+
+def _reference_rates(dates, fx):
+    """Dernier taux connu à chaque date, sinon le premier taux"""
+    fx = fx.dropna().sort_index()
+    rates = []
+    for date in dates:
+        known = fx[fx.index <= date]
+        rates.append(known.iloc[-1] if len(known) else fx.iloc[0])
+    return np.array(rates)
+
+
+def test_as_of_join_matches_reference():
+    prices = _ohlcv(pd.date_range("2024-01-01", periods=120, freq="D"))       # cotation 7 j/7 (crypto)
+    fx_dates = pd.bdate_range("2024-01-10", periods=70)                       # jours ouvrés, démarre plus tard
+    fx = pd.Series(np.linspace(0.9, 0.95, len(fx_dates)), index=fx_dates)
+    fx.iloc[[5, 6, 30]] = np.nan                                              # taux manquants
+    fx = fx.iloc[np.random.default_rng(1).permutation(len(fx))]               # désordonné
+
+    out = fx_rates.convert_prices(prices, fx)
+    rate = _reference_rates(prices.index, fx)
+    for column in fx_rates.PRICE_COLUMNS:
+        np.testing.assert_allclose(out[column].to_numpy(), prices[column].to_numpy() * rate, rtol=1e-15)
+    pd.testing.assert_series_equal(out["Volume"], prices["Volume"])
+    # Samedi et dimanche prennent le taux du vendredi
+    saturday = pd.Timestamp("2024-02-03")
+    assert out.loc[saturday, "Close"] == prices.loc[saturday, "Close"] * fx.loc["2024-02-02"]
+
+
+def test_empty_rates_rejected():
+    prices = _ohlcv(pd.date_range("2024-01-01", periods=5))
+    with pytest.raises(ValueError):
+        fx_rates.convert_prices(prices, pd.Series([np.nan], index=[pd.Timestamp("2024-01-01")]))
+
+
+def test_converted_prices_follow_stored_rates(tmp_path, monkeypatch):
+    monkeypatch.setattr(price_store, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(fx_rates, "_converted", {})
+    price_store.invalidate()
+    index = pd.date_range("2024-01-01", periods=30, freq="D", name="Date")
+    price_store.save_prices("BTC", _ohlcv(index))
+    price_store.save_prices("FX_EUR", _ohlcv(index).assign(Close=0.9))
+
+    first = fx_rates.converted_prices("BTC", "EUR")
+    np.testing.assert_allclose(first["Close"], price_store.load_prices("BTC")["Close"] * 0.9)
+    assert fx_rates.converted_prices("BTC", "EUR") is not first  # vue superficielle du cache
+
+    price_store.save_prices("FX_EUR", _ohlcv(index).assign(Close=0.8))
+    second = fx_rates.converted_prices("BTC", "EUR")
+    np.testing.assert_allclose(second["Close"], price_store.load_prices("BTC")["Close"] * 0.8)
+    price_store.invalidate()
+
+
+
+def test_converted_prices_from_threads(tmp_path, monkeypatch):
+    monkeypatch.setattr(price_store, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(fx_rates, "_converted", {})
+    price_store.invalidate()
+    index = pd.date_range("2024-01-01", periods=30, freq="D", name="Date")
+    for symbol in ("BTC", "GOLD", "SP500"):
+        price_store.save_prices(symbol, _ohlcv(index))
+    price_store.save_prices("FX_EUR", _ohlcv(index).assign(Close=0.9))
+
+    requests = [(symbol, currency) for symbol in ("BTC", "GOLD", "SP500") for currency in ("USD", "EUR")] * 4
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        frames = list(pool.map(lambda args: fx_rates.converted_prices(*args), requests))
+    for (symbol, currency), frame in zip(requests, frames):
+        assert list(frame.columns) == list(price_store.load_prices(symbol).columns)  # même forme en USD et EUR
+        pd.testing.assert_frame_equal(frame, fx_rates.converted_prices(symbol, currency))
+    assert sorted(fx_rates._converted) == [("BTC", "EUR"), ("GOLD", "EUR"), ("SP500", "EUR")]
+    price_store.invalidate()
+
+
+def test_provider_ttl_and_stale_refresh():
+    now = [0.0]
+    source = fx_rates.StaticRateSource({"USD": {"EUR": 0.9}})
+    provider = fx_rates.FxRateProvider(source, ttl=10, max_stale=100, clock=lambda: now[0], background=False)
+    assert provider.get_rate("USD", "EUR") == 0.9 and source.calls == 1
+    now[0] = 5
+    provider.get_rate("USD", "EUR")
+    assert source.calls == 1                       # frais : servi depuis le cache
+    now[0] = 50
+    source.rates["USD"]["EUR"] = 0.95
+    assert provider.get_rate("USD", "EUR") == 0.9  # périmé : servi puis rafraîchi
+    assert source.calls == 2
+    assert provider.get_rate("USD", "EUR") == 0.95
+    with pytest.raises(ValueError):
+        provider.get_rate("USD", "XXX")
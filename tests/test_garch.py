@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import garch
+import price_store
+
+
+def _simulate(n=1500, omega=0.05, alpha=0.08, beta=0.9, mu=0.03, seed=0):
+    rng = np.random.default_rng(seed)
+    returns = np.empty(n)
+    sigma2 = omega / (1 - alpha - beta)
+    for t in range(n):
+        returns[t] = mu + np.sqrt(sigma2) * rng.standard_normal()
+        sigma2 = omega + alpha * (returns[t] - mu) ** 2 + beta * sigma2
+    return returns
+
+
+def _reference_variance(e, omega, alpha, beta):
+    sigma2 = np.empty(len(e))
+    sigma2[0] = garch.backcast(e * e)
+    for t in range(1, len(e)):
+        sigma2[t] = omega + alpha * e[t - 1] ** 2 + beta * sigma2[t - 1]
+    return sigma2
+
+
+def test_variance_filter_matches_recursion():
+    e = _simulate() - 0.03
+    likelihood = garch._Likelihood(e)
+    np.testing.assert_allclose(likelihood.variance(0.05, 0.08, 0.9), _reference_variance(e, 0.05, 0.08, 0.9),
+                               rtol=1e-12)
+
+
+def test_gradient_matches_finite_differences():
+    e = _simulate() - 0.03
+    likelihood = garch._Likelihood(e)
+    theta = np.array([0.05, 0.08, 0.9])
+    step = 1e-6 * theta
+    numeric = [(likelihood.objective(theta + np.eye(3)[i] * step[i])
+                - likelihood.objective(theta - np.eye(3)[i] * step[i])) / (2 * step[i]) for i in range(3)]
+    np.testing.assert_allclose(likelihood.gradient(theta), numeric, rtol=1e-5)
+
+
+def test_fit_recovers_parameters_and_warm_start_agrees():
+    returns = _simulate(n=5000)
+    cold = garch.fit(returns)
+    assert cold["converged"]
+    assert cold["alpha"] == pytest.approx(0.08, abs=0.03)
+    assert cold["beta"] == pytest.approx(0.9, abs=0.04)
+    assert cold["persistence"] < 1
+
+    warm = garch.fit(returns, previous=cold)
+    assert warm["iterations"] <= cold["iterations"]
+    assert warm["loglik"] == pytest.approx(cold["loglik"], rel=1e-8)
+
+
+def test_forecast_variance_matches_recursion():
+    params = {"omega": 0.05, "alpha": 0.08, "beta": 0.9, "last_e2": 4.0, "last_sigma2": 2.0, "mu": 0.0}
+    expected, sigma2 = [], params["omega"] + params["alpha"] * 4.0 + params["beta"] * 2.0
+    for _ in range(10):
+        expected.append(sigma2)
+        sigma2 = params["omega"] + (params["alpha"] + params["beta"]) * sigma2   # E[e2] = sigma2
+    np.testing.assert_allclose(garch.forecast_variance(params, 10), expected, rtol=1e-12)
+
+
+def test_fit_rejects_short_histories():
+    with pytest.raises(ValueError):
+        garch.fit(np.zeros(50))
+
+
+def test_fit_universe_skips_unchanged_symbols(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)                     # data/ et results/garch_params.json dans tmp_path
+    monkeypatch.setattr(garch, "_fits", {})
+    price_store.invalidate()
+    close = 100 * np.exp(np.cumsum(_simulate(n=600) / garch.SCALE))
+    index = pd.date_range("2022-01-01", periods=len(close), freq="D", name="Date")
+    prices = pd.DataFrame({"Open": close, "High": close, "Low": close, "Close": close, "Volume": 0}, index=index)
+    price_store.save_prices("BTC", prices.iloc[:500])
+
+    first, errors = garch.fit_universe(["BTC", "ABSENT"], max_workers=1)
+    assert list(first.index) == ["BTC"] and list(errors) == ["ABSENT"]
+
+    class NoPool:
+        def __init__(self, *args, **kwargs):
+            raise AssertionError("aucun réajustement attendu")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(garch, "ProcessPoolExecutor", NoPool)
+        again, _ = garch.fit_universe(["BTC"])
+    pd.testing.assert_frame_equal(again, first)
+
+    price_store.save_prices("BTC", prices)           # nouvelles barres : réajustement à chaud
+    updated, _ = garch.fit_universe(["BTC"], max_workers=1)
+    assert garch.load_params()["BTC"]["data_version"] == list(price_store.data_version("BTC"))
+    assert updated.loc["BTC", "omega"] != first.loc["BTC", "omega"]
+    price_store.invalidate()
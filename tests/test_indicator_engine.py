@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from indicator_engine import compute_indicators, compute_indicators_wide, ewm_mean
+from price_store import load_prices
+
+
+def _pandas_indicators(close):
+    """Formules pandas d'origine (indicators.py, visualization.py, alerts.py)"""
+    delta = close.diff()
+    gain = delta.where(delta > 0, 0).rolling(window=14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+    macd = close.ewm(span=12, adjust=False).mean() - close.ewm(span=26, adjust=False).mean()
+    sma, std = close.rolling(window=20).mean(), close.rolling(window=20).std()
+    return {
+        "RSI": 100 - 100 / (1 + gain / loss),
+        "MACD": macd,
+        "MACD_Signal": macd.ewm(span=9, adjust=False).mean(),
+        "Upper_Band": sma + 2 * std,
+        "Lower_Band": sma - 2 * std,
+        "Volatility": close.pct_change().rolling(window=30).std() * np.sqrt(252),
+        "Diff": (close - sma) / sma * 100,
+        "EMA_50": close.ewm(span=50, adjust=False).mean(),
+    }
+
+
+@pytest.mark.parametrize("symbol", ["BTC", "GOLD"])
+def test_compute_indicators_matches_pandas(symbol):
+    df = load_prices(symbol)
+    out = compute_indicators(df, ["RSI", "MACD", "BOLLINGER", "VOLATILITY", "DEVIATION", ("EMA", {"window": 50})])
+    assert list(out.columns[:len(df.columns)]) == list(df.columns)
+    for column, expected in _pandas_indicators(df["Close"]).items():
+        np.testing.assert_allclose(out[column], expected, rtol=1e-8, atol=1e-9, err_msg=column)
+
+
+def test_custom_parameters_get_suffixed_columns():
+    df = load_prices("GOLD")
+    out = compute_indicators(df, ["RSI", ("RSI", {"window": 7}), ("BOLLINGER", {"window": 10, "num_std": 3})])
+    assert {"RSI", "RSI_7", "Upper_Band_10", "Lower_Band_10", "SMA_10"} <= set(out.columns)
+    assert not np.allclose(out["RSI"].dropna().iloc[-50:], out["RSI_7"].dropna().iloc[-50:])
+    with pytest.raises(ValueError):
+        compute_indicators(df, ["ICHIMOKU"])
+
+
+def _ewm_reference(x, span):
+    """Récurrence adjust=False écrite barre par barre ; un NaN conserve l'état"""
+    alpha = 2.0 / (span + 1.0)
+    out = np.empty_like(x)
+    state = np.full(x.shape[1], np.nan)
+    for t in range(len(x)):
+        row = x[t]
+        state = np.where(np.isnan(state), row, np.where(np.isnan(row), state, state + alpha * (row - state)))
+        out[t] = state
+    return out
+
+
+def _closes(days=1500, symbols=4, seed=0):
+    rng = np.random.default_rng(seed)
+    return 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (days, symbols)), axis=0))
+
+
+def test_ewm_mean_matches_recurrence():
+    x = _closes()
+    x[:40, 1] = np.nan          # cotation tardive
+    x[500:510, 2] = np.nan      # suspension
+    x[:, 3] = np.nan            # actif sans données
+    for span in (9, 12, 26):
+        expected = _ewm_reference(x, span)
+        result = ewm_mean(x, span)
+        assert np.array_equal(np.isnan(result), np.isnan(expected))
+        assert np.nanmax(np.abs(result - expected)) < 1e-9
+
+
+def test_wide_matches_pandas():
+    closes = _closes()
+    wide = compute_indicators_wide(closes, ["RSI", "MACD", "BOLLINGER", "VOLATILITY"])
+    for j in range(closes.shape[1]):
+        close = pd.Series(closes[:, j])
+        delta = close.diff()
+        gain = delta.where(delta > 0, 0).rolling(window=14).mean()
+        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+        macd = close.ewm(span=12, adjust=False).mean() - close.ewm(span=26, adjust=False).mean()
+        expected = {
+            "RSI": 100 - 100 / (1 + gain / loss),
+            "MACD": macd,
+            "MACD_Signal": macd.ewm(span=9, adjust=False).mean(),
+            "Upper_Band": close.rolling(20).mean() + 2 * close.rolling(20).std(),
+            "Volatility": close.pct_change().rolling(30).std() * np.sqrt(252),
+        }
+        for column, values in expected.items():
+            np.testing.assert_allclose(wide[column][:, j], values, rtol=1e-8, atol=1e-9, err_msg=column)
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import batch_metrics
+import metrics
+from price_store import load_prices
+
+SYMBOLS = ["BTC", "GOLD", "SP500"]
+
+
+def _baseline(df, confidence_level=0.95, risk_free_rate=0.02):
+    """Calculs pandas d'origine de stats_analysis (compute_financial_metrics, compute_var, drawdown)"""
+    returns = df["Close"].pct_change()
+    annual_return = returns.mean() * 252
+    annual_volatility = returns.std() * np.sqrt(252)               # pandas : ddof=1
+    downside_volatility = returns[returns < 0].std() * np.sqrt(252)
+    cumulative = (1 + returns).cumprod()
+    peak = cumulative.cummax()
+    return {
+        "annual_return": annual_return,
+        "annual_volatility": annual_volatility,
+        "sharpe_ratio": (annual_return - risk_free_rate) / annual_volatility,
+        "sortino_ratio": (annual_return - risk_free_rate) / downside_volatility,
+        "var": np.percentile(returns.dropna(), (1 - confidence_level) * 100),
+        "max_drawdown": ((cumulative - peak) / peak).min(),
+        "observations": returns.count(),
+    }
+
+
+@pytest.mark.parametrize("symbol", SYMBOLS)
+def test_compute_metrics_matches_pandas_baseline(symbol):
+    df = load_prices(symbol)
+    result = metrics.compute_metrics(df, confidence_level=0.99)
+    expected = _baseline(df, confidence_level=0.99)
+    assert result.keys() == expected.keys()
+    for name, value in expected.items():
+        assert result[name] == pytest.approx(value, rel=1e-12), name
+
+
+def test_ratios_keep_population_std():
+    # analysis.compute_ratios utilisait np.std (ddof=0) : le Sharpe simplifié reste inchangé
+    returns = load_prices("SP500")["Close"].pct_change().to_numpy()
+    result = metrics.ratios(returns)
+    valid = returns[~np.isnan(returns)]
+    assert result["volatility"] == pytest.approx(np.std(valid) * np.sqrt(252), rel=1e-12)
+    assert result["sharpe_ratio"] == pytest.approx(np.mean(valid) / np.std(valid) * np.sqrt(252), rel=1e-12)
+
+
+def test_flat_prices_give_nan_ratios():
+    result = metrics.compute_metrics(pd.DataFrame({"Close": np.full(30, 100.0)}))
+    assert np.isnan(result["sharpe_ratio"]) and np.isnan(result["sortino_ratio"])
+    assert result["max_drawdown"] == 0.0
+
+
+def test_missing_close_is_rejected():
+    with pytest.raises(ValueError):
+        metrics.compute_metrics(pd.DataFrame({"Open": [1.0, 2.0]}))
+
+
+def test_process_pool_matches_serial_loop():
+    table, errors = batch_metrics.run_batch(SYMBOLS + ["ABSENT"], max_workers=2)
+    serial = {symbol: values for symbol, values, error in map(batch_metrics.compute_symbol, SYMBOLS)}
+    pd.testing.assert_frame_equal(table, pd.DataFrame.from_dict(serial, orient="index"))
+    assert list(errors) == ["ABSENT"] and errors["ABSENT"].startswith("FileNotFoundError")
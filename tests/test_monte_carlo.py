@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+import monte_carlo
+
+ASSETS = ("BTC", "SP500", "GOLD")
+
+
+def test_in_process_matches_process_pool():
+    # Les graines sont tirées par bloc : le résultat ne dépend pas du nombre de processus
+    kwargs = dict(horizon=20, n_paths=6000, seed=7, chunk_size=2000)
+    for method in monte_carlo.METHODS:
+        local = monte_carlo.simulate(ASSETS, method=method, max_workers=1, **kwargs)
+        pooled = monte_carlo.simulate(ASSETS, method=method, max_workers=2, **kwargs)
+        np.testing.assert_array_equal(local["terminal"], pooled["terminal"])
+        np.testing.assert_array_equal(local["fan"], pooled["fan"])
+
+
+@pytest.mark.parametrize("method", monte_carlo.METHODS)
+def test_chunked_matches_unchunked(method):
+    kwargs = dict(horizon=30, n_paths=5500, method=method, seed=11, max_workers=1)
+    whole = monte_carlo.simulate(ASSETS, chunk_size=10_000, **kwargs)
+    for chunk_size in (1000, 2000, 3500):
+        chunked = monte_carlo.simulate(ASSETS, chunk_size=chunk_size, **kwargs)
+        np.testing.assert_array_equal(chunked["terminal"], whole["terminal"])
+        np.testing.assert_array_equal(chunked["fan"], whole["fan"])
+
+
+@pytest.mark.parametrize("method", monte_carlo.METHODS)
+def test_histogram_percentiles_match_exact_paths(method):
+    result = monte_carlo.simulate(ASSETS, horizon=60, n_paths=20_000, method=method, seed=5, max_workers=1)
+    returns, _ = monte_carlo.log_returns(ASSETS)
+    mu, chol = monte_carlo.estimate(returns)
+    grid = monte_carlo.time_grid(60)
+    _, width = monte_carlo._bin_edges(mu, chol, grid)
+
+    log_terminal = np.log(result["terminal"] / result["s0"])
+    fan = np.log(result["fan"][:, -1, :] / result["s0"])
+    exact = np.percentile(log_terminal, result["percentiles"], axis=0)
+    assert (np.abs(fan - exact) <= width[-1]).all()
+
+
+def test_bootstrap_keeps_cross_asset_correlation():
+    returns, _ = monte_carlo.log_returns(ASSETS)
+    result = monte_carlo.simulate(ASSETS, horizon=1, n_paths=50_000, method="bootstrap", seed=3, max_workers=1)
+    simulated = np.corrcoef(np.log(result["terminal"] / result["s0"]), rowvar=False)
+    historical = np.corrcoef(returns, rowvar=False)
+    # Même jour tiré pour tous les actifs : corrélation historique conservée (erreur d'échantillonnage ~0,005)
+    np.testing.assert_allclose(simulated, historical, atol=0.02)
+    assert abs(historical[0, 1]) > 0.05
+
+
+def test_unknown_method_is_rejected():
+    with pytest.raises(ValueError):
+        monte_carlo.simulate(ASSETS, method="heston")
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from indicator_engine import compute_indicators
+from online_indicators import (OnlineBollinger, OnlineEMA, OnlineMACD, OnlineRSI, OnlineSMA, OnlineTrend,
+                               load_state, save_state)
+from price_store import load_prices
+
+
+def _indicators():
+    return {"rsi": OnlineRSI(), "macd": OnlineMACD(), "boll": OnlineBollinger(), "trend": OnlineTrend(),
+            "sma": OnlineSMA(20), "ema": OnlineEMA(20)}
+
+
+def _row(indicators):
+    macd, boll, trend = indicators["macd"].value, indicators["boll"].value, indicators["trend"].value
+    return [indicators["rsi"].value, macd["MACD"], macd["MACD_Signal"], boll["Upper_Band"], boll["Lower_Band"],
+            trend["Diff"], indicators["sma"].value, indicators["ema"].value]
+
+
+COLUMNS = ["RSI", "MACD", "MACD_Signal", "Upper_Band", "Lower_Band", "Diff", "SMA_20", "EMA_20"]
+
+
+def _stream(closes, indicators):
+    rows = []
+    for close in closes:
+        for indicator in indicators.values():
+            indicator.update(close)
+        rows.append(_row(indicators))
+    return np.array(rows, dtype=np.float64)
+
+
+@pytest.mark.parametrize("symbol", ["BTC", "GOLD"])
+def test_stream_matches_batch(symbol):
+    df = compute_indicators(load_prices(symbol), ["RSI", "MACD", "BOLLINGER", "DEVIATION", "EMA"])
+    online = _stream(df["Close"].to_numpy(), _indicators())
+    for i, column in enumerate(COLUMNS):
+        np.testing.assert_allclose(online[:, i], df[column].to_numpy(), rtol=1e-8, atol=1e-9, err_msg=column)
+
+
+def test_state_round_trip(tmp_path):
+    closes = load_prices("SP500")["Close"].to_numpy()
+    reference = _stream(closes, _indicators())
+
+    indicators = _indicators()
+    head = _stream(closes[:700], indicators)
+    path = tmp_path / "state.json"
+    save_state(indicators, path)
+    tail = _stream(closes[700:], load_state(path))
+    np.testing.assert_array_equal(np.vstack([head, tail]), reference)
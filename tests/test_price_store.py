@@ -0,0 +1,66 @@
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+import price_store
+from conftest import ROOT
+
+
+def _bars(start="2024-01-01", days=5):
+    index = pd.date_range(start, periods=days, freq="D", name="Date")
+    return pd.DataFrame({"Open": 1.0, "High": 1.0, "Low": 1.0, "Close": 1.0, "Volume": 0.0}, index=index)
+
+
+def test_list_symbols_skips_forecasts_and_fx(tmp_path, monkeypatch):
+    monkeypatch.setattr(price_store, "DATA_DIR", str(tmp_path))
+    for symbol in ("BTC", "GOLD", "FX_EUR", "FX_GBP"):
+        _bars().to_csv(tmp_path / f"{symbol}.csv")
+    (tmp_path / "BTC_forecast.csv").write_text("ds,yhat\n")
+    assert price_store.list_symbols() == ["BTC", "GOLD"]
+
+
+def test_load_prices_parses_once_per_version(tmp_path, monkeypatch):
+    monkeypatch.setattr(price_store, "DATA_DIR", str(tmp_path))
+    price_store.invalidate()
+    _bars().to_csv(tmp_path / "BTC.csv")
+    parses = price_store.get_stats()["parses"]
+    first = price_store.load_prices("BTC")
+    second = price_store.load_prices("BTC")
+    assert price_store.get_stats()["parses"] == parses + 1
+    assert second is not first
+    with pytest.raises(ValueError):
+        first["Close"].to_numpy()[0] = 2.0  # données partagées en lecture seule
+    second["Extra"] = 1.0  # ajouter une colonne ne touche pas le cache
+    assert "Extra" not in price_store.load_prices("BTC").columns
+
+    _bars(days=6).to_csv(tmp_path / "BTC.csv")
+    assert len(price_store.load_prices("BTC")) == 6
+    price_store.invalidate()
+
+
+@pytest.mark.parametrize("symbol", ["BTC", "GOLD", "SP500"])
+def test_binary_copy_matches_csv(symbol, tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    shutil.copy(os.path.join(ROOT, "data", f"{symbol}.csv"), tmp_path)
+    monkeypatch.setattr(price_store, "DATA_DIR", str(tmp_path))
+    csv = price_store._parse_csv(price_store.price_path(symbol))
+    assert price_store.write_binary(symbol, csv)
+    binary = price_store._parse_binary(price_store.binary_path(symbol))
+    pd.testing.assert_frame_equal(binary, csv, check_freq=False)
+
+
+def test_stale_binary_copy_is_ignored(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    monkeypatch.setattr(price_store, "DATA_DIR", str(tmp_path))
+    price_store.invalidate()
+    price_store.save_prices("BTC", _bars())
+    assert price_store._source("BTC")[0] == price_store.binary_path("BTC")
+
+    # CSV modifié à la main après la copie binaire : le CSV fait foi
+    _bars(days=8).to_csv(tmp_path / "BTC.csv")
+    os.utime(tmp_path / "BTC.csv", ns=(os.stat(price_store.binary_path("BTC")).st_mtime_ns + 1,) * 2)
+    assert price_store._source("BTC")[0] == price_store.price_path("BTC")
+    assert len(price_store.load_prices("BTC")) == 8
+    price_store.invalidate()
@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import garch
+import price_store
+import risk
+
+
+def _returns(seed=0, n=800):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2020-01-01", periods=n, freq="D")
+    returns = pd.DataFrame({"A": rng.standard_t(4, n) * 0.02, "B": rng.normal(0, 0.01, n)}, index=index)
+    returns.iloc[::7, 1] = np.nan          # actif coté en semaine : trous de calendrier
+    returns.iloc[:30, 1] = np.nan          # historique plus court
+    return returns
+
+
+def _reference_tail(returns, level, horizon):
+    """VaR (np.percentile) et ES (moyenne des valeurs sous le quantile) d'un seul actif"""
+    log_returns = np.log1p(returns.dropna().to_numpy())
+    sums = np.convolve(log_returns, np.ones(horizon), mode="valid")
+    ordered = np.sort(np.expm1(sums))
+    lo = int(np.floor((1 - level) * (len(ordered) - 1)))
+    return np.percentile(ordered, (1 - level) * 100), ordered[:lo + 1].mean()
+
+
+def test_historical_matches_per_asset_reference():
+    returns = _returns()
+    result = risk.compute_risk(returns, levels=(0.95, 0.99), horizons=(1, 10))
+    assert result["var"].shape == (2, 2, 2) and result["symbols"] == ["A", "B"]
+    for i, level in enumerate(result["levels"]):
+        for j, horizon in enumerate(result["horizons"]):
+            for k, symbol in enumerate(result["symbols"]):
+                var, es = _reference_tail(returns[symbol], level, horizon)
+                assert result["var"][i, j, k] == pytest.approx(var, rel=1e-12)
+                assert result["es"][i, j, k] == pytest.approx(es, rel=1e-12)
+
+
+def test_gaussian_matches_lognormal_tail_integral():
+    from scipy.integrate import quad
+    from scipy.stats import norm
+
+    returns = _returns()["A"]
+    level, horizon = 0.99, 5
+    result = risk.compute_risk(returns, levels=(level,), horizons=(horizon,), method="gaussian")
+    log_returns = np.log1p(returns.to_numpy())
+    mu, sigma = log_returns.mean() * horizon, log_returns.std(ddof=1) * np.sqrt(horizon)
+    alpha = 1 - level
+    es = quad(lambda u: np.expm1(mu + sigma * norm.ppf(u)), 0, alpha, epsabs=1e-14)[0] / alpha
+    assert result["var"][0, 0, 0] == pytest.approx(np.expm1(mu + sigma * norm.ppf(alpha)), rel=1e-12)
+    assert result["es"][0, 0, 0] == pytest.approx(es, rel=1e-8)
+
+
+def test_monte_carlo_is_reproducible_with_a_seed():
+    returns = _returns()
+    first = risk.compute_risk(returns, method="monte_carlo", n_simulations=2000, seed=3)
+    second = risk.compute_risk(returns, method="monte_carlo", n_simulations=2000, seed=3)
+    np.testing.assert_array_equal(first["var"], second["var"])
+    np.testing.assert_array_equal(first["es"], second["es"])
+
+
+def test_unknown_method_is_rejected():
+    with pytest.raises(ValueError):
+        risk.compute_risk(_returns(), method="parametric")
+
+
+def test_rolling_var_matches_pandas_quantile():
+    returns = _returns()[["A"]].to_numpy()
+    levels = (0.95, 0.99)
+    out = risk.rolling_var(returns, window=60, levels=levels)
+    assert out.shape == (2, len(returns), 1)
+    for i, level in enumerate(levels):
+        expected = pd.Series(returns[:, 0]).rolling(60).quantile(1 - level).to_numpy()
+        np.testing.assert_allclose(out[i, :, 0], expected, rtol=1e-12, equal_nan=True)
+
+
+def test_filtered_historical_reuses_given_garch_fits(monkeypatch):
+    returns = _returns()
+    histories = [np.log1p(returns[symbol].dropna().to_numpy()) * garch.SCALE for symbol in returns.columns]
+    fits = [garch.fit(history) for history in histories]
+    kwargs = dict(levels=(0.99,), horizons=(1, 5), method="filtered_historical", n_simulations=2000, seed=1)
+    fitted_here = risk.compute_risk(returns, **kwargs)
+
+    monkeypatch.setattr(garch, "fit", lambda *args, **kw: pytest.fail("GARCH réajusté"))
+    reused = risk.compute_risk(returns, garch_params=fits, **kwargs)
+    np.testing.assert_allclose(reused["var"], fitted_here["var"], rtol=1e-12)
+    np.testing.assert_allclose(reused["es"], fitted_here["es"], rtol=1e-12)
+
+
+def test_compute_var_is_cached_by_data_version(tmp_path, monkeypatch):
+    pytest.importorskip("streamlit")
+    import stats_analysis
+
+    monkeypatch.setattr(price_store, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(garch, "_fits", {})
+    stats_analysis._cached_var_es.cache_clear()
+    price_store.invalidate()
+    close = 100 * np.exp(np.cumsum(_returns()["A"].to_numpy()))
+    index = pd.date_range("2020-01-01", periods=len(close), freq="D", name="Date")
+    prices = pd.DataFrame({"Open": close, "High": close, "Low": close, "Close": close, "Volume": 0}, index=index)
+    price_store.save_prices("BTC", prices)
+    price_store.save_prices("GOLD", prices.iloc[:2])
+
+    fits = []
+    fit_symbol = garch.fit_symbol
+    monkeypatch.setattr(garch, "fit_symbol", lambda symbol: fits.append(symbol) or fit_symbol(symbol))
+    first = stats_analysis.compute_var("BTC", method="filtered_historical")
+    assert isinstance(first, float) and stats_analysis.compute_var("BTC", method="filtered_historical") == first
+    assert fits == ["BTC"]                           # rerun : ni réajustement ni nouvelle simulation
+
+    price_store.save_prices("BTC", prices.iloc[:-1])  # nouvelles données : recalcul
+    stats_analysis.compute_var("BTC", method="filtered_historical")
+    assert fits == ["BTC", "BTC"]
+
+    missing = stats_analysis.compute_var("GOLD")     # pas assez de données : NaN, même type de retour
+    assert isinstance(missing, float) and np.isnan(missing)
+    stats_analysis._cached_var_es.cache_clear()
+    price_store.invalidate()
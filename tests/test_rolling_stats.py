@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from rolling_stats import CumulativeSums, RollingWindow, rolling_stats
+
+
+def _exact(x, window, stat):
+    """Statistique glissante calculée fenêtre par fenêtre (deux passes)"""
+    out = np.full(len(x), np.nan)
+    windows = sliding_window_view(x, window)
+    out[window - 1:] = windows.mean(axis=1) if stat == "mean" else windows.std(axis=1, ddof=1)
+    return out
+
+
+def test_std_stable_on_long_trend():
+    # Tendance forte et bruit faible : le cas où des sommes cumulées globales perdent la précision
+    rng = np.random.default_rng(0)
+    n = 200_000
+    x = 100 + 0.5 * np.arange(n) + rng.normal(0, 0.05, n)
+    sums = CumulativeSums(x)
+    for window in (20, 250):
+        for stat in ("mean", "std"):
+            np.testing.assert_allclose(getattr(sums, stat)(window), _exact(x, window, stat), rtol=1e-9)
+
+
+def test_matches_pandas_with_missing_values():
+    rng = np.random.default_rng(1)
+    x = 100 + np.cumsum(rng.normal(size=(1000, 3)), axis=0)
+    x[:30, 0] = np.nan
+    x[400:405, 1] = np.nan
+    frame = pd.DataFrame(x)
+    out = rolling_stats(x, windows=(5, 20, 64), stats=("mean", "std", "min", "max"))
+    for (stat, window), values in out.items():
+        expected = getattr(frame.rolling(window), stat)().to_numpy()
+        np.testing.assert_allclose(values, expected, rtol=1e-9, atol=1e-12, err_msg=f"{stat} {window}")
+
+
+def test_rolling_window_matches_batch():
+    rng = np.random.default_rng(2)
+    x = 1e4 + np.cumsum(rng.normal(size=5000))
+    window = RollingWindow(30)
+    online = []
+    for value in x:
+        window.update(value)
+        online.append((window.std(), window.min(), window.max()))
+    online = np.array(online)
+    out = rolling_stats(x, windows=(30,), stats=("std", "min", "max"))
+    for i, stat in enumerate(("std", "min", "max")):
+        np.testing.assert_allclose(online[:, i], out[(stat, 30)], rtol=1e-8, equal_nan=True, err_msg=stat)
+
+
+def test_rolling_window_quantiles_start_on_demand():
+    rng = np.random.default_rng(3)
+    x = rng.normal(size=500)
+    window = RollingWindow(40)
+    quantiles = []
+    for i, value in enumerate(x):
+        window.update(value)
+        # Premier quantile demandé en cours de flux : la copie triée part de la fenêtre courante
+        quantiles.append(window.quantile(0.05) if i >= 100 else np.nan)
+    expected = pd.Series(x).rolling(40).quantile(0.05).to_numpy()
+    np.testing.assert_allclose(quantiles[100:], expected[100:], rtol=1e-12)
+
+    plain = RollingWindow(40)
+    for value in x:
+        plain.update(value)
+    assert plain._sorted is None  # moyenne/écart-type/min/max seuls : aucune copie triée maintenue
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import time_series_cv
+
+
+def test_splits_match_sklearn():
+    sklearn = pytest.importorskip("sklearn.model_selection")
+    for n, k, window, gap in ((100, 5, None, 0), (257, 4, 60, 3), (1000, 10, None, 5)):
+        expected = sklearn.TimeSeriesSplit(n_splits=k, max_train_size=window, gap=gap).split(np.zeros(n))
+        for (train, test), (train_idx, test_idx) in zip(time_series_cv.splits(n, k, window=window, gap=gap), expected):
+            assert np.array_equal(np.arange(n)[train], train_idx)
+            assert np.array_equal(np.arange(n)[test], test_idx)
+
+
+def test_return_scores_use_sign_hit_rate():
+    y_true = np.array([0.01, -0.02, 0.0005, -0.001])
+    y_pred = np.array([0.002, 0.001, 0.0001, -0.003])
+    result = time_series_cv.scores(y_true, y_pred, target_type="return")
+    assert "mape" not in result and "direction" not in result
+    assert result["hit_rate"] == 0.75
+    assert result["mae"] == pytest.approx(np.mean(np.abs(y_pred - y_true)))
+
+
+def test_price_scores_keep_mape_and_direction():
+    y_true = np.array([100.0, 101.0, 99.0, 102.0])
+    y_pred = np.array([100.5, 100.0, 99.5, 103.0])
+    result = time_series_cv.scores(y_true, y_pred)
+    assert result["mape"] == pytest.approx(np.mean(np.abs((y_pred - y_true) / y_true)))
+    assert result["direction"] == pytest.approx(2 / 3)
+    with pytest.raises(ValueError):
+        time_series_cv.scores(y_true, y_pred, target_type="volume")
+
+
+def test_cross_validate_matches_sequential_fits():
+    linear_model = pytest.importorskip("sklearn.linear_model")
+    rng = np.random.default_rng(0)
+    index = pd.date_range("2020-01-01", periods=600, freq="B")
+    X = pd.DataFrame(rng.normal(size=(600, 3)), index=index)
+    y = X @ np.array([0.5, -0.2, 0.1]) + rng.normal(0, 0.1, 600)
+    folds = time_series_cv.cross_validate(linear_model.LinearRegression(), X, y, n_splits=4, window=200,
+                                          n_jobs=2, target_type="return")
+    for row, (train, test) in zip(folds.itertuples(), time_series_cv.splits(600, 4, window=200)):
+        model = linear_model.LinearRegression().fit(X.iloc[train], y.iloc[train])
+        expected = time_series_cv.scores(y.iloc[test].to_numpy(), model.predict(X.iloc[test]), "return")
+        assert row.rmse == pytest.approx(expected["rmse"])
+        assert row.hit_rate == expected["hit_rate"]
+        assert row.test_start == index[test.start]
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import vector_backtest
+from price_store import load_prices
+
+
+def _reference(open_, close, up, down, cash, stake):
+    """Courtier de backtrader barre par barre : ordre à la clôture, exécution à l'ouverture suivante"""
+    fills, equity = [], []
+    position, pending, entry = False, None, None
+    for t in range(len(close)):
+        if pending == "buy":
+            cash -= open_[t] * stake
+            position, entry = True, t
+        elif pending == "sell":
+            cash += open_[t] * stake
+            position = False
+            fills.append((entry, t))
+        pending = None
+        equity.append(cash + (close[t] * stake if position else 0.0))
+        if up[t] and not position and close[t] * stake <= cash:
+            pending = "buy"
+        elif down[t] and position:
+            pending = "sell"
+    if position:
+        fills.append((entry, None))
+    return fills, np.array(equity)
+
+
+def _prices(days, seed):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, days)))
+    open_ = close * np.exp(rng.normal(0, 0.005, days))
+    return open_, close
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("cash, stake", [(10_000.0, 1), (1_000.0, 9)])  # le second rejette des achats
+def test_fills_match_bar_by_bar_broker(seed, cash, stake):
+    open_, close = _prices(1500, seed)
+    up, down = vector_backtest.sma_signals(close, 10, 30)
+    expected_fills, expected_equity = _reference(open_, close, up, down, cash, stake)
+    fills = vector_backtest.simulate(open_, close, up, down, cash, stake)
+    assert fills == expected_fills
+    equity, _ = vector_backtest.equity_curve(open_, close, fills, cash, stake)
+    np.testing.assert_allclose(equity, expected_equity, rtol=1e-12)
+
+
+def test_matches_backtrader():
+    pytest.importorskip("backtrader")
+    from backtest import run_backtest
+
+    for symbol in ("BTC", "GOLD", "SP500"):
+        vectorized = run_backtest(symbol)
+        event = run_backtest(symbol, vectorized=False)
+        assert vectorized.keys() == event.keys()
+        pd.testing.assert_frame_equal(vectorized["trades"], event["trades"])
+        pd.testing.assert_series_equal(vectorized["positions"], event["positions"])
+        np.testing.assert_allclose(vectorized["equity"].to_numpy(), event["equity"].to_numpy(), rtol=1e-12)
+        assert vectorized["stats"] == pytest.approx(event["stats"], rel=1e-9, nan_ok=True)
+
+
+def test_run_vectorized_on_stored_prices():
+    df = load_prices("SP500")
+    result = vector_backtest.run_vectorized(df)
+    up, down = vector_backtest.sma_signals(df["Close"].to_numpy())
+    fills, equity = _reference(df["Open"].to_numpy(), df["Close"].to_numpy(), up, down,
+                               vector_backtest.INITIAL_CASH, vector_backtest.STAKE)
+    assert len(result["trades"]) == len(fills)
+    np.testing.assert_allclose(result["equity"].to_numpy(), equity, rtol=1e-12)
+    assert isinstance(result["equity"].index, pd.DatetimeIndex)
@@ -0,0 +1,128 @@
+import numpy as np
+import pandas as pd
+
+#=========================validation croisée chronologique (origine glissante ou fenêtre croissante)
+# Les plis sont des tranches (slice) : X[train] et X[test] sont des vues de
+# la matrice de variables calculée une seule fois, sans copie. Les plis
+# tournent dans des threads joblib qui partagent ces tableaux ; NumPy et
+# scikit-learn relâchent le GIL pendant les calculs lourds.
+
+
+def splits(n_samples, n_splits=5, test_size=None, window=None, gap=0, min_train=1):
+    """Plis chronologiques (train, test) sous forme de tranches.
+
+    Les `n_splits` blocs de test de `test_size` observations couvrent la
+    fin de l'historique. Sans `window`, l'apprentissage commence toujours à
+    0 (fenêtre croissante) ; avec `window`, il reprend les `window`
+    dernières observations avant le test (origine glissante). `gap`
+    observations sont écartées entre apprentissage et test pour éviter les
+    fuites (ex. variables calculées sur des fenêtres glissantes). Le premier
+    pli doit disposer d'au moins `min_train` observations d'apprentissage.
+    """
+    test_size = test_size or n_samples // (n_splits + 1)
+    first_test = n_samples - n_splits * test_size
+    if test_size < 1 or first_test - gap < min_train:
+        raise ValueError(f"Pas assez d'observations ({n_samples}) pour {n_splits} plis de {test_size}")
+    folds = []
+    for k in range(n_splits):
+        test_start = first_test + k * test_size
+        train_end = test_start - gap
+        train_start = 0 if window is None else max(0, train_end - window)
+        folds.append((slice(train_start, train_end), slice(test_start, test_start + test_size)))
+    return folds
+
+
+TARGET_TYPES = ("price", "return")
+METRICS = ("rmse", "mae", "mape", "r2", "direction", "hit_rate")
+
+
+def scores(y_true, y_pred, target_type="price"):
+    """Scores d'une prévision selon la nature de la cible.
+
+    Niveaux de prix ("price") : RMSE, MAE, MAPE, R² et taux de bonne
+    direction des variations successives. Rendements ("return") : RMSE,
+    MAE, R² et hit_rate, part des signes correctement prévus ; la MAPE n'a
+    pas de sens pour des valeurs proches de zéro et n'est pas calculée.
+    """
+    if target_type not in TARGET_TYPES:
+        raise ValueError(f"Type de cible inconnu : {target_type} (attendu : {', '.join(TARGET_TYPES)})")
+    error = y_pred - y_true
+    total = ((y_true - y_true.mean()) ** 2).sum()
+    result = {
+        "rmse": float(np.sqrt(np.mean(error ** 2))),
+        "mae": float(np.mean(np.abs(error))),
+    }
+    if target_type == "price":
+        with np.errstate(divide="ignore", invalid="ignore"):
+            result["mape"] = float(np.mean(np.abs(error / y_true)))
+    result["r2"] = float(1 - (error ** 2).sum() / total) if total > 0 else np.nan
+    if target_type == "price":
+        result["direction"] = (float(np.mean(np.sign(np.diff(y_pred)) == np.sign(np.diff(y_true))))
+                               if len(y_true) > 1 else np.nan)
+    else:
+        result["hit_rate"] = float(np.mean(np.sign(y_pred) == np.sign(y_true)))
+    return result
+
+
+def _fit_fold(model, X, y, fold, train, test, index, target_type):
+    from sklearn.base import clone
+
+    fitted = clone(model).fit(X[train], y[train])
+    row = {"fold": fold, "n_train": train.stop - train.start, "n_test": test.stop - test.start}
+    if index is not None:
+        row.update(train_start=index[train.start], train_end=index[train.stop - 1],
+                   test_start=index[test.start], test_end=index[test.stop - 1])
+    row.update(scores(y[test], fitted.predict(X[test]), target_type))
+    return row
+
+
+def _as_arrays(X, y):
+    index = X.index if isinstance(X, pd.DataFrame) else None
+    X = np.ascontiguousarray(X, dtype=np.float64)
+    y = np.ascontiguousarray(y, dtype=np.float64)
+    if len(X) != len(y):
+        raise ValueError("X et y n'ont pas le même nombre de lignes")
+    return X, y, index
+
+
+def cross_validate(model, X, y, n_splits=5, test_size=None, window=None, gap=0, n_jobs=-1, target_type="price"):
+    """Évalue un modèle scikit-learn pli par pli, plis en parallèle.
+
+    Renvoie un DataFrame, une ligne par pli : tailles, bornes de dates (si X
+    est un DataFrame indexé par date) et les scores de `target_type` (voir scores).
+    """
+    return evaluate({"data": (X, y)}, {"model": model}, n_splits, test_size, window, gap, n_jobs, target_type) \
+        .drop(columns=["asset", "model"])
+
+
+def evaluate(datasets, models, n_splits=5, test_size=None, window=None, gap=0, n_jobs=-1, target_type="price"):
+    """Sélection de modèles sur plusieurs actifs et jeux de variables en un seul lot.
+
+    `datasets` : {nom: (X, y)}, `models` : {nom: estimateur}. Chaque matrice
+    est convertie une fois en tableau contigu ; toutes les tâches (jeu,
+    modèle, pli) sont réparties ensemble sur `n_jobs` threads, ce qui
+    équilibre la charge même avec peu de plis par actif. Toutes les cibles
+    sont de même nature (`target_type`). Renvoie un DataFrame par pli avec
+    les colonnes asset et model.
+    """
+    from joblib import Parallel, delayed
+
+    tasks, keys = [], []
+    for name, (X, y) in datasets.items():
+        X, y, index = _as_arrays(X, y)
+        for fold, (train, test) in enumerate(splits(len(X), n_splits, test_size, window, gap)):
+            for model_name, model in models.items():
+                tasks.append(delayed(_fit_fold)(model, X, y, fold, train, test, index, target_type))
+                keys.append({"asset": name, "model": model_name})
+    rows = Parallel(n_jobs=n_jobs, prefer="threads")(tasks)
+    return pd.DataFrame([{**key, **row} for key, row in zip(keys, rows)])
+
+
+def summarize(results):
+    """Moyenne et écart-type des scores par (actif, modèle), triés par RMSE moyen"""
+    metrics = [col for col in METRICS if col in results]
+    groups = [col for col in ("asset", "model") if col in results]
+    if not groups:
+        return results[metrics].agg(["mean", "std"])
+    table = results.groupby(groups)[metrics].agg(["mean", "std"])
+    return table.sort_values(("rmse", "mean"))
@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+
+import metrics
+from rolling_stats import rolling_mean
+
+#=========================backtest vectorisé des stratégies à signaux
+
+INITIAL_CASH = 10000.0
+STAKE = 1
+
+
+def sma_signals(close, short_window=20, long_window=50):
+    """États de la stratégie SMA de backtest.MovingAverageStrategy.
+
+    Renvoie (up, down) : SMA courte au-dessus / en dessous de la longue.
+    Avant `long_window` barres les deux sont faux, comme le minperiod de
+    backtrader. Accepte une série ou une matrice (dates × actifs).
+    """
+    close = np.asarray(close, dtype=np.float64)
+    return crossover_states(rolling_mean(close, short_window), rolling_mean(close, long_window))
+
+
+def crossover_states(short, long):
+    """(up, down) à partir de deux moyennes déjà calculées (NaN : ni l'un ni l'autre)"""
+    with np.errstate(invalid="ignore"):
+        return short > long, short < long
+
+
+def _first(mask, start):
+    """Premier indice >= start où mask est vrai, ou None"""
+    hits = np.flatnonzero(mask[start:])
+    return start + hits[0] if hits.size else None
+
+
+def simulate(open_, close, up, down, cash=INITIAL_CASH, stake=STAKE):
+    """Fills d'une stratégie long-only « entrer si up, sortir si down ».
+
+    Reproduit le courtier par défaut de backtrader : ordre au marché passé à
+    la clôture de la barre du signal et exécuté à l'ouverture suivante, sans
+    commission. Un achat dont le coût à la clôture dépasse la trésorerie est
+    rejeté puis retenté aux barres suivantes. Un ordre passé sur la dernière
+    barre n'est jamais exécuté, et une position ouverte le reste.
+
+    La boucle porte sur les transactions, pas sur les barres : chaque entrée
+    ou sortie est trouvée par une recherche vectorisée dans les masques.
+    Renvoie la liste des (barre d'entrée, barre de sortie ou None).
+    """
+    n = len(close)
+    fills = []
+    t = 0
+    while t < n:
+        # Entrée : premier signal haussier dont la clôture est couverte par la trésorerie
+        i = _first(up & (close * stake <= cash), t)
+        if i is None or i >= n - 1:
+            break
+        entry = i + 1
+        cash -= open_[entry] * stake
+
+        # Sortie : premier signal baissier une fois la position ouverte
+        j = _first(down, entry)
+        if j is None or j >= n - 1:
+            fills.append((entry, None))
+            break
+        exit_ = j + 1
+        cash += open_[exit_] * stake
+        fills.append((entry, exit_))
+        t = exit_
+    return fills
+
+
+def equity_curve(open_, close, fills, cash=INITIAL_CASH, stake=STAKE):
+    """Valeur du portefeuille et position barre par barre à partir des fills"""
+    n = len(close)
+    flows = np.zeros(n)
+    position = np.zeros(n)
+    for entry, exit_ in fills:
+        flows[entry] -= open_[entry] * stake
+        position[entry:exit_] = stake
+        if exit_ is not None:
+            flows[exit_] += open_[exit_] * stake
+    return cash + np.cumsum(flows) + position * close, position
+
+
+def summarize(equity, pnl, n_trades, cash=INITIAL_CASH):
+    """Statistiques d'une courbe de valeur, des PnL des trades clôturés et du nombre de trades"""
+    pnl = np.asarray(pnl, dtype=np.float64)
+    final = float(equity[-1]) if len(equity) else cash
+    return {
+        "initial_value": cash,
+        "final_value": final,
+        "total_return": final / cash - 1,
+        "trades": n_trades,
+        "win_rate": float((pnl > 0).mean()) if pnl.size else np.nan,
+        "max_drawdown": metrics.max_drawdown(equity),
+        "sharpe_ratio": metrics.financial_metrics(metrics.daily_returns(equity))["sharpe_ratio"],
+    }
+
+
+def trades_frame(index, open_, fills, stake=STAKE):
+    """Une ligne par transaction (entrée, sortie à l'ouverture, PnL, durée) à partir des fills"""
+    n = len(index)
+    return pd.DataFrame(
+        [{
+            "entry_date": index[entry],
+            "entry_price": open_[entry],
+            "exit_date": index[exit_] if exit_ is not None else pd.NaT,
+            "exit_price": open_[exit_] if exit_ is not None else np.nan,
+            "size": stake,
+            "pnl": (open_[exit_] - open_[entry]) * stake if exit_ is not None else np.nan,
+            "bars": (exit_ if exit_ is not None else n - 1) - entry,
+        } for entry, exit_ in fills],
+        columns=["entry_date", "entry_price", "exit_date", "exit_price", "size", "pnl", "bars"],
+    )
+
+
+def backtest_result(index, equity, position, trades, cash=INITIAL_CASH):
+    """Résultat commun aux deux moteurs de backtest.run_backtest"""
+    return {
+        "equity": pd.Series(equity, index=index, name="Equity"),
+        "positions": pd.Series(position, index=index, name="Position"),
+        "trades": trades,
+        "stats": summarize(equity, trades["pnl"].dropna(), len(trades), cash),
+    }
+
+
+def run_vectorized(df, short_window=20, long_window=50, cash=INITIAL_CASH, stake=STAKE):
+    """Backtest vectorisé du croisement de moyennes mobiles sur un OHLCV.
+
+    Renvoie un dictionnaire : equity et positions (Series indexées par date),
+    trades (DataFrame, une ligne par transaction) et stats (valeur finale,
+    rendement, nombre de trades, taux de réussite, drawdown, Sharpe).
+    """
+    open_ = df["Open"].to_numpy(dtype=np.float64)
+    close = df["Close"].to_numpy(dtype=np.float64)
+    up, down = sma_signals(close, short_window, long_window)
+    fills = simulate(open_, close, up, down, cash, stake)
+    equity, position = equity_curve(open_, close, fills, cash, stake)
+    return backtest_result(df.index, equity, position, trades_frame(df.index, open_, fills, stake), cash)
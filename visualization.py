@@ -1,30 +1,34 @@
-import pandas as pd
+from price_store import load_prices
+from indicator_engine import compute_indicators
 import plotly.express as px
 import streamlit as st
 import plotly.graph_objects as go
 import plotly.subplots as sp
 import numpy as np 
+from figure_cache import cached_figure
+from fx_rates import converted_prices, fx_version
 
-def plot_price_trends(symbol):
-    """Affiche l'évolution des prix avec la moyenne mobile (SMA 20)"""
-    df = pd.read_csv(f"data/{symbol}.csv", index_col=0, parse_dates=True)
-    df["SMA_20"] = df["Close"].rolling(window=20).mean()
+@cached_figure()
+def figure_price_trends(symbol):
+    """Construit l'évolution des prix avec la moyenne mobile (SMA 20)"""
+    df = compute_indicators(load_prices(symbol), [("SMA", {"window": 20})])
 
     # Création du graphique
     fig = px.line(df, x=df.index, y=["Close", "SMA_20"],
                   title=f"Tendances de {symbol}",
                   labels={"value": "Prix", "index": "Date"},
                   template="plotly_dark")
+    return fig
 
-    # Affichage avec Streamlit
-    st.plotly_chart(fig)
-def plot_candlestick(symbol):
-    """Affiche un graphique en chandeliers avec histogramme de volatilité annuelle et annotations temporelles"""
-    df = pd.read_csv(f"data/{symbol}.csv", index_col=0, parse_dates=True)
+def plot_price_trends(symbol):
+    """Affiche l'évolution des prix avec la moyenne mobile (SMA 20)"""
+    st.plotly_chart(figure_price_trends(symbol))
 
-    # Calcul des rendements journaliers et de la volatilité
-    df["Return"] = df["Close"].pct_change()
-    df["Volatility"] = df["Return"].rolling(window=30).std() * np.sqrt(252)
+@cached_figure(versions=lambda symbol, currency="USD": fx_version(currency))
+def plot_candlestick(symbol, currency="USD"):
+    """Affiche un graphique en chandeliers avec histogramme de volatilité annuelle et annotations temporelles"""
+    # Prix convertis dans la devise choisie, puis rendements journaliers et volatilité
+    df = compute_indicators(converted_prices(symbol, currency), [("VOLATILITY", {"window": 30})])
 
     # Création d'un subplot avec deux graphiques
     fig = sp.make_subplots(rows=2, cols=1, shared_xaxes=True, vertical_spacing=0.3, 
@@ -74,21 +78,20 @@ def plot_candlestick(symbol):
     fig.update_layout(
         height=600,  # Ajustement de la hauteur
         xaxis_title="Date",
-        yaxis_title="Prix",
+        yaxis_title=f"Prix ({currency})",
         showlegend=False,
         xaxis_rangeslider_visible=False
     )
 
     return fig
 
-    # Affichage avec Streamlit
-    st.plotly_chart(fig)
-def plot_comparison():
-    """Affiche l'évolution des prix normalisés des 3 actifs avec échelle logarithmique"""
+@cached_figure(assets=("SP500", "BTC", "GOLD"))
+def figure_comparison():
+    """Construit l'évolution des prix normalisés des 3 actifs avec échelle logarithmique"""
     # Chargement des données
-    df_sp500 = pd.read_csv("data/SP500.csv", index_col=0, parse_dates=True)
-    df_btc = pd.read_csv("data/BTC.csv", index_col=0, parse_dates=True)
-    df_gold = pd.read_csv("data/GOLD.csv", index_col=0, parse_dates=True)
+    df_sp500 = load_prices("SP500")
+    df_btc = load_prices("BTC")
+    df_gold = load_prices("GOLD")
 
     # Normalisation des prix pour une comparaison claire
     df_sp500["Normalized"] = df_sp500["Close"] / df_sp500["Close"].iloc[0]
@@ -132,18 +135,21 @@ def plot_comparison():
         template="plotly_white",
         showlegend=False
     )
+    return fig
 
-    # Affichage avec Streamlit
-    st.plotly_chart(fig)
+def plot_comparison():
+    """Affiche l'évolution des prix normalisés des 3 actifs avec échelle logarithmique"""
+    st.plotly_chart(figure_comparison())
 
     
     
-def plot_comparison_percentage():
-    """Affiche l'évolution des prix en pourcentage (%) depuis le premier jour."""
+@cached_figure(assets=("SP500", "BTC", "GOLD"))
+def figure_comparison_percentage():
+    """Construit l'évolution des prix en pourcentage (%) depuis le premier jour."""
     # Chargement des données
-    df_sp500 = pd.read_csv("data/SP500.csv", index_col=0, parse_dates=True)
-    df_btc = pd.read_csv("data/BTC.csv", index_col=0, parse_dates=True)
-    df_gold = pd.read_csv("data/GOLD.csv", index_col=0, parse_dates=True)
+    df_sp500 = load_prices("SP500")
+    df_btc = load_prices("BTC")
+    df_gold = load_prices("GOLD")
 
     # Calcul des performances en pourcentage par rapport au premier jour
     df_sp500["Perf_%"] = (df_sp500["Close"] / df_sp500["Close"].iloc[0] - 1) * 100
@@ -182,54 +188,43 @@ def plot_comparison_percentage():
         template="plotly_white",
         showlegend=False
     )
+    return fig
 
-    # Affichage avec Streamlit
-    st.plotly_chart(fig)
+def plot_comparison_percentage():
+    """Affiche l'évolution des prix en pourcentage (%) depuis le premier jour."""
+    st.plotly_chart(figure_comparison_percentage())
 
 
 
 #=========================fonction de calcul des indicateurs
 
     
-def calculate_indicators(df, filters):
-    """Calcule les indicateurs techniques sélectionnés."""
+def indicator_specs(filters):
+    """Traduit les filtres de l'interface en spécifications pour le moteur d'indicateurs."""
+    specs = []
     if "RSI" in filters:
-        delta = df["Close"].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        df["RSI"] = 100 - (100 / (1 + rs))
-
+        specs.append("RSI")
     if "MACD" in filters:
-        df["EMA_12"] = df["Close"].ewm(span=12, adjust=False).mean()
-        df["EMA_26"] = df["Close"].ewm(span=26, adjust=False).mean()
-        df["MACD"] = df["EMA_12"] - df["EMA_26"]
-        df["MACD_Signal"] = df["MACD"].ewm(span=9, adjust=False).mean()
-
+        specs.append("MACD")
     if "SMA" in filters:
-        df["SMA_50"] = df["Close"].rolling(window=50).mean()
-        df["SMA_100"] = df["Close"].rolling(window=100).mean()
-        df["SMA_200"] = df["Close"].rolling(window=200).mean()
-
+        specs += [("SMA", {"window": w}) for w in (50, 100, 200)]
     if "EMA" in filters:
-        df["EMA_50"] = df["Close"].ewm(span=50, adjust=False).mean()
-        df["EMA_100"] = df["Close"].ewm(span=100, adjust=False).mean()
-        df["EMA_200"] = df["Close"].ewm(span=200, adjust=False).mean()
+        specs += [("EMA", {"window": w}) for w in (50, 100, 200)]
+    return specs
 
-    return df
 
-#===============================================================================================================
-
-def plot_candlestick_2(symbol, filters):
-    """Affiche un graphique en chandeliers avec histogramme de volatilité annuelle et indicateurs techniques sélectionnés."""
-    df = pd.read_csv(f"data/{symbol}.csv", index_col=0, parse_dates=True)
+def calculate_indicators(df, filters):
+    """Calcule les indicateurs techniques sélectionnés."""
+    return compute_indicators(df, indicator_specs(filters))
 
-    # Calcul des rendements et volatilité
-    df["Return"] = df["Close"].pct_change()
-    df["Volatility"] = df["Return"].rolling(window=30).std() * np.sqrt(252)
+#===============================================================================================================
 
-    # Appliquer les calculs des indicateurs techniques
-    df = calculate_indicators(df, filters)
+@cached_figure(versions=lambda symbol, filters, currency="USD": fx_version(currency))
+def figure_candlestick_2(symbol, filters, currency="USD"):
+    """Construit un graphique en chandeliers avec histogramme de volatilité annuelle et indicateurs techniques sélectionnés."""
+    # Rendements, volatilité et indicateurs sélectionnés calculés en un seul passage
+    specs = [("VOLATILITY", {"window": 30})] + indicator_specs(filters)
+    df = compute_indicators(converted_prices(symbol, currency), specs)
 
     # Création d'un subplot
     fig = sp.make_subplots(rows=2, cols=1, shared_xaxes=True, vertical_spacing=0.15,
@@ -278,11 +273,14 @@ def plot_candlestick_2(symbol, filters):
     fig.update_layout(
         height=800,
         xaxis_title="Date",
-        yaxis_title="Prix",
+        yaxis_title=f"Prix ({currency})",
         showlegend=True
     )
+    return fig
 
-    st.plotly_chart(fig) 
+def plot_candlestick_2(symbol, filters, currency="USD"):
+    """Affiche un graphique en chandeliers avec histogramme de volatilité annuelle et indicateurs techniques sélectionnés."""
+    st.plotly_chart(figure_candlestick_2(symbol, filters, currency))
     
 #====================================================fin================================================================
 